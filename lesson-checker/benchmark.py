@@ -0,0 +1,155 @@
+"""Нагрузочная проверка прохода lesson-checker.
+
+Заполняет локальную базу (схема из миграций teachers-api) просроченными
+уроками отдельного учителя и замеряет один проход run_check по этому
+учителю (уроки других учителей не читаются и напоминания по ним не
+уходят):
+
+    python benchmark.py --lessons 100000 --batch-size 500 --concurrency 50
+    python benchmark.py --lessons 100000 --batch-size 100000 --concurrency 1
+
+Второй запуск приближенно повторяет старое поведение (все строки в памяти,
+публикации по одной). Уроки создаются в отдельном процессе (--seed-only),
+чтобы пиковый RSS замера не включал подготовку данных. Нужны Postgres и
+RabbitMQ из config.py.
+"""
+
+import argparse
+import asyncio
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+import resource
+import subprocess
+import sys
+import time
+
+import asyncpg
+
+import main
+from config import settings
+
+BENCHMARK_TG_ID = "lesson-checker-benchmark"
+
+
+async def seed(db_pool: asyncpg.Pool, lessons: int) -> int:
+    """Создает учителя и lessons просроченных уроков, возвращает id учителя"""
+    async with db_pool.acquire() as conn:
+        teacher_id = await conn.fetchval(
+            "SELECT id FROM teachers WHERE tg_id = $1", BENCHMARK_TG_ID
+        )
+        if teacher_id is None:
+            teacher_id = await conn.fetchval(
+                """
+                INSERT INTO teachers (full_name, tg_id, bank_account)
+                VALUES ('Benchmark Teacher', $1, '00000000000000000000')
+                RETURNING id
+                """,
+                BENCHMARK_TG_ID,
+            )
+
+        existing = await conn.fetchval(
+            "SELECT count(*) FROM lessons WHERE teacher_id = $1", teacher_id
+        )
+        start = datetime.now(timezone.utc) - timedelta(days=30)
+        records = [
+            (
+                f"Student {i}",
+                teacher_id,
+                Decimal("1000.00"),
+                start + timedelta(seconds=i),
+                "planned",
+                "regular",
+            )
+            for i in range(existing, lessons)
+        ]
+        if records:
+            await conn.copy_records_to_table(
+                "lessons",
+                records=records,
+                columns=[
+                    "student_name",
+                    "teacher_id",
+                    "price",
+                    "date_time",
+                    "status",
+                    "type",
+                ],
+            )
+        # Каждый запуск должен видеть все уроки как ненапомненные
+        await conn.execute(
+            "UPDATE lessons SET last_reminded_at = NULL WHERE teacher_id = $1",
+            teacher_id,
+        )
+        return teacher_id
+
+
+async def cleanup(db_pool: asyncpg.Pool, teacher_id: int) -> None:
+    async with db_pool.acquire() as conn:
+        await conn.execute("DELETE FROM lessons WHERE teacher_id = $1", teacher_id)
+        await conn.execute("DELETE FROM teachers WHERE id = $1", teacher_id)
+
+
+def peak_rss() -> float:
+    """Пиковый RSS процесса, МиБ (ru_maxrss в Linux — в килобайтах)"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def seed_only(args: argparse.Namespace) -> None:
+    db_pool = await asyncpg.create_pool(settings.database_url)
+    try:
+        await seed(db_pool, args.lessons)
+    finally:
+        await db_pool.close()
+
+
+async def run(args: argparse.Namespace) -> None:
+    subprocess.run(
+        [sys.executable, __file__, "--lessons", str(args.lessons), "--seed-only"],
+        check=True,
+    )
+
+    db_pool = await asyncpg.create_pool(settings.database_url)
+    await main.broker.start()
+    try:
+        teacher_id = await db_pool.fetchval(
+            "SELECT id FROM teachers WHERE tg_id = $1", BENCHMARK_TG_ID
+        )
+
+        rss_before = peak_rss()
+        started = time.perf_counter()
+        reminded = await main.run_check(
+            db_pool, args.batch_size, args.concurrency, teacher_id
+        )
+        elapsed = time.perf_counter() - started
+        rss_after = peak_rss()
+
+        print(f"reminded:    {reminded}")
+        print(f"elapsed:     {elapsed:.2f}s")
+        print(f"throughput:  {reminded / elapsed:.0f} lessons/s")
+        print(f"peak rss:    {rss_after:.1f} MiB")
+        print(f"check rss:   +{rss_after - rss_before:.1f} MiB")
+
+        if args.cleanup:
+            await cleanup(db_pool, teacher_id)
+    finally:
+        await db_pool.close()
+        await main.broker.stop()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Бенчмарк прохода lesson-checker")
+    parser.add_argument("--lessons", type=int, default=100_000)
+    parser.add_argument("--batch-size", type=int, default=settings.CHECK_BATCH_SIZE)
+    parser.add_argument("--concurrency", type=int, default=settings.CHECK_CONCURRENCY)
+    parser.add_argument(
+        "--cleanup", action="store_true", help="удалить тестовые данные после замера"
+    )
+    parser.add_argument(
+        "--seed-only", action="store_true", help="только создать уроки, без замера"
+    )
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    asyncio.run(seed_only(args) if args.seed_only else run(args))
@@ -13,6 +13,16 @@ class Settings(BaseSettings):
     RABBIT_HOST: str
     RABBIT_PORT: int
 
+    # Через сколько секунд после начала урок требует подтверждения
+    CONFIRMATION_DELAY: int = 3600
+    # Повторное напоминание по тому же уроку не чаще, чем раз в REMINDER_INTERVAL
+    REMINDER_INTERVAL: int = 6 * 3600
+    # Период проверки в режиме --serve
+    CHECK_INTERVAL: int = 900
+    # Размер пачки курсора и число одновременных публикаций
+    CHECK_BATCH_SIZE: int = 500
+    CHECK_CONCURRENCY: int = 50
+
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -1,8 +1,9 @@
+import argparse
 import asyncio
 from datetime import datetime, timedelta, timezone
 import logging
 import sys
-from typing import List
+from typing import AsyncIterator, List, Optional
 
 import asyncpg
 from faststream.rabbit import RabbitBroker
@@ -18,15 +19,28 @@ DATABASE_URL = settings.database_url
 RABBITMQ_URL = settings.rabbit_url
 NOTIFICATION_QUEUE = "lesson_notifications"
 
-broker = RabbitBroker(RABBITMQ_URL)
+# С подтверждениями publish завершается после ack брокера
+broker = RabbitBroker(RABBITMQ_URL, publisher_confirms=True)
 
 
-async def get_lessons_needing_confirmation(db_pool: asyncpg.Pool) -> List[dict]:
+async def iter_lessons_needing_confirmation(
+    db_pool: asyncpg.Pool,
+    now: datetime,
+    batch_size: int,
+    teacher_id: Optional[int] = None,
+) -> AsyncIterator[List[dict]]:
     """
-    Получает уроки, которые начались более часа назад и требуют подтверждения
+    Получает уроки, которые начались более CONFIRMATION_DELAY назад, требуют
+    подтверждения и по которым еще не напоминали или интервал напоминания истек.
+    Условие status = 'planned' попадает в частичный индекс ix_lessons_planned_date_time.
+
+    Строки читаются серверным курсором пачками по batch_size, поэтому
+    в памяти находится не больше одной пачки. teacher_id ограничивает
+    проход одним учителем (для бенчмарка).
     """
-    one_hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
-    
+    overdue_before = now - timedelta(seconds=settings.CONFIRMATION_DELAY)
+    remind_before = now - timedelta(seconds=settings.REMINDER_INTERVAL)
+
     query = """
     SELECT 
         l.id,
@@ -41,11 +55,37 @@ async def get_lessons_needing_confirmation(db_pool: asyncpg.Pool) -> List[dict]:
     JOIN teachers t ON l.teacher_id = t.id
     WHERE l.date_time <= $1
     AND l.status = 'planned' and l.type = 'regular'
+    AND (l.last_reminded_at IS NULL OR l.last_reminded_at <= $2)
     """
-    
+    params = [overdue_before, remind_before]
+    if teacher_id is not None:
+        query += "AND l.teacher_id = $3\n"
+        params.append(teacher_id)
+    query += "ORDER BY l.date_time"
+
     async with db_pool.acquire() as conn:
-        rows = await conn.fetch(query, one_hour_ago)
-        return [dict(row) for row in rows]
+        # Курсоры asyncpg работают только внутри транзакции
+        async with conn.transaction(readonly=True):
+            cursor = await conn.cursor(query, *params)
+            while True:
+                rows = await cursor.fetch(batch_size)
+                if not rows:
+                    break
+                yield [dict(row) for row in rows]
+
+
+async def mark_reminded(db_pool: asyncpg.Pool, lesson_ids: List[int], now: datetime):
+    """
+    Запоминает время напоминания, чтобы следующий проход не повторял его
+    """
+    if not lesson_ids:
+        return
+    async with db_pool.acquire() as conn:
+        await conn.execute(
+            "UPDATE lessons SET last_reminded_at = $1 WHERE id = ANY($2::int[])",
+            now,
+            lesson_ids,
+        )
 
 
 async def send_notification(lesson: dict):
@@ -65,12 +105,64 @@ async def send_notification(lesson: dict):
     }
     
     await broker.publish(message, NOTIFICATION_QUEUE)
-    logger.info(f"Отправлено уведомление для урока {lesson['id']}")
+    logger.debug(f"Отправлено уведомление для урока {lesson['id']}")
+
+
+async def publish_batch(lessons: List[dict], semaphore: asyncio.Semaphore) -> List[int]:
+    """
+    Отправляет уведомления пачки параллельно (не больше concurrency
+    неподтвержденных публикаций одновременно) и возвращает id отправленных уроков
+    """
+
+    async def publish(lesson: dict) -> bool:
+        async with semaphore:
+            try:
+                await send_notification(lesson)
+                return True
+            except Exception as e:
+                logger.error(f"Ошибка при обработке урока {lesson['id']}: {e}")
+                return False
+
+    results = await asyncio.gather(*(publish(lesson) for lesson in lessons))
+    return [lesson["id"] for lesson, sent in zip(lessons, results) if sent]
+
+
+async def run_check(
+    db_pool: asyncpg.Pool,
+    batch_size: int = settings.CHECK_BATCH_SIZE,
+    concurrency: int = settings.CHECK_CONCURRENCY,
+    teacher_id: Optional[int] = None,
+) -> int:
+    """
+    Один проход проверки: отправляет напоминания и возвращает их число
+    """
+    now = datetime.now(timezone.utc)
+    semaphore = asyncio.Semaphore(concurrency)
+    found = 0
+    reminded = 0
+
+    async for lessons in iter_lessons_needing_confirmation(
+        db_pool, now, batch_size, teacher_id
+    ):
+        found += len(lessons)
+        sent_ids = await publish_batch(lessons, semaphore)
+        await mark_reminded(db_pool, sent_ids, now)
+        reminded += len(sent_ids)
 
+    logger.info(f"Найдено {found} уроков, требующих подтверждения, отправлено {reminded}")
+    return reminded
 
-async def check_lessons():
+
+async def check_lessons(
+    serve: bool = False,
+    batch_size: int = settings.CHECK_BATCH_SIZE,
+    concurrency: int = settings.CHECK_CONCURRENCY,
+):
     """
-    Основная функция проверки уроков
+    Основная функция проверки уроков.
+
+    Без serve выполняет один проход (для CronJob). С serve держит пул
+    соединений и брокер открытыми и проверяет уроки каждые CHECK_INTERVAL секунд.
     """
     try:
         # Подключение к базе данных
@@ -80,28 +172,58 @@ async def check_lessons():
         # Подключение к RabbitMQ
         await broker.start()
         logger.info("Подключение к RabbitMQ установлено")
-        
-        # Получаем уроки, требующие подтверждения
-        lessons = await get_lessons_needing_confirmation(db_pool)
-        logger.info(f"Найдено {len(lessons)} уроков, требующих подтверждения")
-        
-        # Отправляем уведомления для каждого урока
-        for lesson in lessons:
+    except Exception as e:
+        logger.error(f"Критическая ошибка при проверке уроков: {e}")
+        sys.exit(1)
+
+    try:
+        while True:
             try:
-                await send_notification(lesson)
-                logger.info(f"Уведомление отправлено для урока {lesson['id']}")
+                await run_check(db_pool, batch_size, concurrency)
             except Exception as e:
-                logger.error(f"Ошибка при обработке урока {lesson['id']}: {e}")
-        
+                if not serve:
+                    logger.error(f"Критическая ошибка при проверке уроков: {e}")
+                    sys.exit(1)
+                logger.error(f"Ошибка при проверке уроков: {e}")
+
+            if not serve:
+                logger.info("Проверка уроков завершена успешно")
+                break
+            await asyncio.sleep(settings.CHECK_INTERVAL)
+    finally:
         # Закрываем соединения
         await db_pool.close()
         await broker.stop()
-        logger.info("Проверка уроков завершена успешно")
-        
-    except Exception as e:
-        logger.error(f"Критическая ошибка при проверке уроков: {e}")
-        sys.exit(1)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Напоминания о неподтвержденных уроках")
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="работать постоянно, проверяя уроки каждые CHECK_INTERVAL секунд",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=settings.CHECK_BATCH_SIZE,
+        help="сколько строк читать из курсора за раз",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.CHECK_CONCURRENCY,
+        help="сколько публикаций может ждать подтверждения брокера одновременно",
+    )
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    asyncio.run(check_lessons())
+    args = parse_args()
+    asyncio.run(
+        check_lessons(
+            serve=args.serve,
+            batch_size=args.batch_size,
+            concurrency=args.concurrency,
+        )
+    )
@@ -10,6 +10,14 @@ class Settings(BaseSettings):
     redis_db: int = 1
     redis_password: str | None = None
 
+    # Лимит Telegram для групп — около 20 сообщений в минуту на чат
+    delivery_per_chat_rate: float = 20 / 60
+    delivery_per_chat_burst: int = 3
+    delivery_global_rate: float = 25.0
+    delivery_coalesce_window: float = 2.0
+    delivery_max_retries: int = 5
+    rabbitmq_prefetch: int = 50
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
 
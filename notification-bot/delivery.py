@@ -0,0 +1,195 @@
+"""Доставка сообщений в Telegram с ограничением скорости.
+
+Сообщения для одного чата копятся coalesce_window секунд и уходят одним
+сообщением (в пределах лимита длины Telegram); если Telegram отклоняет
+склейку, ее части отправляются по одной. Каждый чат ограничен
+своим token bucket, все чаты вместе — общим. На 429 отправка ждет
+retry_after из ответа Telegram. Вызов send завершается только после
+доставки, поэтому RabbitMQ не получает ack раньше времени, и при
+ограниченном prefetch всплески остаются в очереди.
+"""
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramNetworkError,
+    TelegramRetryAfter,
+    TelegramServerError,
+)
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_MESSAGE_LIMIT = 4096
+MESSAGE_SEPARATOR = "\n\n"
+
+
+class DeliveryError(Exception):
+    """Telegram недоступен дольше, чем позволяют повторы"""
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """Не выдавать токены ближайшие seconds секунд"""
+        self._tokens = 0
+        self._updated = time.monotonic() + seconds
+
+
+@dataclass
+class _Pending:
+    text: str
+    future: asyncio.Future = field(
+        default_factory=lambda: asyncio.get_running_loop().create_future()
+    )
+
+
+class DeliveryEngine:
+    def __init__(
+        self,
+        bot: Bot,
+        per_chat_rate: float,
+        per_chat_burst: int,
+        global_rate: float,
+        coalesce_window: float,
+        max_retries: int,
+    ):
+        self.bot = bot
+        self.per_chat_rate = per_chat_rate
+        self.per_chat_burst = per_chat_burst
+        self.coalesce_window = coalesce_window
+        self.max_retries = max_retries
+        self._global_bucket = TokenBucket(global_rate, max(1, int(global_rate)))
+        self._buckets: dict[int | str, TokenBucket] = {}
+        self._pending: dict[int | str, list[_Pending]] = {}
+        self._workers: dict[int | str, asyncio.Task] = {}
+
+    async def send(self, chat_id: int | str, text: str) -> bool:
+        """Ставит сообщение в очередь чата и ждет его отправки.
+
+        Возвращает False, если Telegram отклонил сообщение, и бросает
+        DeliveryError, если Telegram так и не стал доступен.
+        """
+        item = _Pending(text)
+        self._pending.setdefault(chat_id, []).append(item)
+        if chat_id not in self._workers:
+            self._workers[chat_id] = asyncio.create_task(self._drain(chat_id))
+        return await item.future
+
+    def _bucket(self, chat_id: int | str) -> TokenBucket:
+        if chat_id not in self._buckets:
+            self._buckets[chat_id] = TokenBucket(
+                self.per_chat_rate, self.per_chat_burst
+            )
+        return self._buckets[chat_id]
+
+    def _take_batch(self, chat_id: int | str) -> list[_Pending]:
+        """Забирает из очереди сообщения, помещающиеся в одно сообщение Telegram"""
+        pending = self._pending[chat_id]
+        batch = [pending.pop(0)]
+        length = len(batch[0].text)
+        while pending:
+            length += len(MESSAGE_SEPARATOR) + len(pending[0].text)
+            if length > TELEGRAM_MESSAGE_LIMIT:
+                break
+            batch.append(pending.pop(0))
+        return batch
+
+    async def _drain(self, chat_id: int | str) -> None:
+        bucket = self._bucket(chat_id)
+        try:
+            while self._pending.get(chat_id):
+                # Пока ждем окно и токен, в очередь успевают прийти соседние сообщения
+                await asyncio.sleep(self.coalesce_window)
+                await bucket.acquire()
+                await self._send_batch(chat_id, self._take_batch(chat_id), bucket)
+        finally:
+            # Без await между проверкой очереди и удалением воркера,
+            # поэтому новое сообщение не останется без обработчика
+            self._workers.pop(chat_id, None)
+            for item in self._pending.pop(chat_id, []):
+                if not item.future.done():
+                    item.future.cancel()
+
+    async def _send_batch(
+        self, chat_id: int | str, batch: list[_Pending], bucket: TokenBucket
+    ) -> None:
+        """Отправляет batch одним сообщением и завершает ожидания его частей"""
+        text = MESSAGE_SEPARATOR.join(item.text for item in batch)
+        try:
+            delivered = await self._send_with_retry(chat_id, text, bucket)
+        except DeliveryError as e:
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+        if not delivered and len(batch) > 1:
+            # Склейку могла испортить одна часть: по одному Telegram
+            # отклонит только ее, а не все сообщения пачки
+            logger.warning(
+                "Склеенное сообщение в чат %s отклонено, отправка по одному", chat_id
+            )
+            for item in batch:
+                await bucket.acquire()
+                await self._send_batch(chat_id, [item], bucket)
+            return
+        for item in batch:
+            if not item.future.done():
+                item.future.set_result(delivered)
+
+    async def _send_with_retry(
+        self, chat_id: int | str, text: str, bucket: TokenBucket
+    ) -> bool:
+        for attempt in range(self.max_retries + 1):
+            await self._global_bucket.acquire()
+            try:
+                await self.bot.send_message(chat_id=chat_id, text=text)
+                return True
+            except TelegramRetryAfter as e:
+                logger.warning(
+                    "Telegram просит подождать %s с для чата %s", e.retry_after, chat_id
+                )
+                bucket.pause(e.retry_after)
+                await bucket.acquire()
+            except (TelegramNetworkError, TelegramServerError) as e:
+                delay = min(30, 2**attempt)
+                logger.warning(
+                    "Ошибка отправки в чат %s: %s, повтор через %s с", chat_id, e, delay
+                )
+                await asyncio.sleep(delay)
+            except Exception as e:
+                # Ошибки запроса (например, некорректная разметка) не исправятся повтором
+                logger.error("Сообщение в чат %s отклонено: %s", chat_id, e)
+                return False
+
+        raise DeliveryError(
+            f"Сообщение в чат {chat_id} не отправлено после {self.max_retries + 1} попыток"
+        )
+
+    async def close(self) -> None:
+        workers = list(self._workers.values())
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
@@ -10,6 +10,8 @@ from aiogram.fsm.storage.redis import RedisStorage
 from redis.asyncio import Redis
 
 from config import settings
+from delivery import DeliveryEngine
+from templates import render_event
 
 from faststream.rabbit import RabbitBroker
 
@@ -31,15 +33,37 @@ RABBITMQ_USER = os.getenv("RABBITMQ_USER", "guest")
 RABBITMQ_PASSWORD = os.getenv("RABBITMQ_PASSWORD", "guest")
 RABBITMQ_QUEUE = os.getenv("RABBITMQ_QUEUE", "scrapers")
 
-broker = RabbitBroker(url=f"amqp://{RABBITMQ_USER}:{RABBITMQ_PASSWORD}@{RABBITMQ_HOST}:{RABBITMQ_PORT}/")
+# max_consumers задает prefetch канала: пока сообщения не доставлены,
+# остальные ждут в RabbitMQ, а не в памяти бота
+broker = RabbitBroker(
+    url=f"amqp://{RABBITMQ_USER}:{RABBITMQ_PASSWORD}@{RABBITMQ_HOST}:{RABBITMQ_PORT}/",
+    max_consumers=settings.rabbitmq_prefetch,
+)
+delivery = DeliveryEngine(
+    bot,
+    per_chat_rate=settings.delivery_per_chat_rate,
+    per_chat_burst=settings.delivery_per_chat_burst,
+    global_rate=settings.delivery_global_rate,
+    coalesce_window=settings.delivery_coalesce_window,
+    max_retries=settings.delivery_max_retries,
+)
 
 
-@broker.subscriber("scrapers")
-async def handle_orders_and_send_message(data: str):
-    await bot.send_message(
-        chat_id=settings.chat_id,
-        text=data,
-    )
+# retry=True возвращает сообщение в очередь, если Telegram недоступен (DeliveryError)
+@broker.subscriber("scrapers", retry=True)
+async def handle_orders_and_send_message(data: dict | str):
+    # Скраперы присылают готовый текст, teachers-api — конверты событий
+    if isinstance(data, dict):
+        text = render_event(data)
+        if text is None:
+            logging.warning(
+                "Пропущено событие %s версии %s", data.get("type"), data.get("version")
+            )
+            return
+    else:
+        text = data
+
+    await delivery.send(settings.chat_id, text)
 
 
 async def main() -> None:
@@ -47,6 +71,7 @@ async def main() -> None:
         await broker.start()
         logging.info("Брокер стартовал")
         await dp.start_polling(bot)
+        await delivery.close()
     logging.info("Все закончилось...")
 
 
@@ -0,0 +1,111 @@
+"""Шаблоны уведомлений о событиях teachers-api.
+
+Шаблоны собираются один раз при импорте; на каждое событие остается
+только подстановка экранированных значений из payload.
+"""
+
+from datetime import datetime
+from html import escape
+from string import Template
+from typing import Any, Callable, Dict
+
+SUPPORTED_EVENT_VERSION = 1
+
+LESSON_CREATED = Template(
+    "🎯 <b>Новый урок создан</b>\n\n"
+    "👤 Ученик: $student_name\n"
+    "📅 Дата и время: $date_time\n"
+    "💰 Цена: $price руб\n"
+    "📝 Тип: $type\n"
+    "🆔 ID урока: $id"
+)
+
+LESSON_CONFIRMED = Template(
+    "✅ <b>Урок подтвержден</b>\n\n"
+    "👤 Ученик: $student_name\n"
+    "📅 Дата и время: $date_time\n"
+    "💰 Цена: $price руб\n"
+    "🆔 ID урока: $id"
+)
+
+LESSON_CANCELLED = Template(
+    "❌ <b>Урок отменен</b>\n\n"
+    "👤 Ученик: $student_name\n"
+    "📅 Дата и время: $date_time\n"
+    "📝 Причина: $reason\n"
+    "🆔 ID урока: $id"
+)
+
+LESSON_UPDATED = Template(
+    "✏️ <b>Урок обновлен</b>\n\n"
+    "👤 Ученик: $student_name\n"
+    "🆔 ID урока: $id\n\n"
+    "📝 <b>Изменения:</b>\n$changes"
+)
+
+INVOICE_PAID = Template(
+    "💸 <b>Счет оплачен</b>\n\n"
+    "🧾 ID счета: $id\n"
+    "📚 ID урока: $lesson_id\n"
+    "📅 Дата оплаты: $paid_at"
+)
+
+TEACHER_REGISTERED = Template(
+    "🎉 <b>Новый преподаватель зарегистрирован</b>\n\n"
+    "👨‍🏫 ФИО: $full_name\n"
+    "📧 Email: $email\n"
+    "🆔 Telegram ID: $tg_id\n"
+    "🆔 ID преподавателя: $id"
+)
+
+
+def _fields(payload: Dict[str, Any]) -> Dict[str, str]:
+    return {key: escape(str(value)) for key, value in payload.items()}
+
+
+def _render_lesson_cancelled(payload: Dict[str, Any]) -> str:
+    fields = _fields(payload)
+    fields.setdefault("reason", "Причина не указана")
+    return LESSON_CANCELLED.safe_substitute(fields)
+
+
+def _render_lesson_updated(payload: Dict[str, Any]) -> str:
+    fields = _fields(payload)
+    fields["changes"] = "\n".join(
+        f"• {escape(str(key))}: {escape(str(value))}"
+        for key, value in payload.get("changes", {}).items()
+    )
+    return LESSON_UPDATED.safe_substitute(fields)
+
+
+def _render_invoice_paid(payload: Dict[str, Any]) -> str:
+    fields = _fields(payload)
+    paid_at = payload.get("paid_at")
+    if paid_at:
+        fields["paid_at"] = datetime.fromisoformat(paid_at).strftime("%d.%m.%Y %H:%M")
+    return INVOICE_PAID.safe_substitute(fields)
+
+
+def _simple(template: Template) -> Callable[[Dict[str, Any]], str]:
+    return lambda payload: template.safe_substitute(_fields(payload))
+
+
+RENDERERS: Dict[str, Callable[[Dict[str, Any]], str]] = {
+    "lesson_created": _simple(LESSON_CREATED),
+    "lesson_confirmed": _simple(LESSON_CONFIRMED),
+    "lesson_cancelled": _render_lesson_cancelled,
+    "lesson_updated": _render_lesson_updated,
+    "invoice_paid": _render_invoice_paid,
+    "teacher_registered": _simple(TEACHER_REGISTERED),
+}
+
+
+def render_event(event: Dict[str, Any]) -> str | None:
+    """Текст уведомления для конверта события или None, если событие
+    неизвестного типа или версии"""
+    if event.get("version") != SUPPORTED_EVENT_VERSION:
+        return None
+    renderer = RENDERERS.get(event.get("type"))
+    if renderer is None:
+        return None
+    return renderer(event.get("payload") or {})
@@ -0,0 +1,56 @@
+"""Пропускная способность отправки сообщений в RabbitMQ.
+
+    docker compose up -d rabbitmq
+    python -m benchmarks.broker --messages 2000
+
+before — прежний send_message: соединение открывается и закрывается на
+каждое сообщение, сообщения уходят по одному. after — Publisher с одним
+соединением, очередью и пачками; время включает close (досылку очереди).
+Настройки подключения берутся из core.config (rabbitmq_*).
+"""
+
+import argparse
+import asyncio
+import time
+
+import benchmarks.fixtures  # noqa: F401  (переменные окружения для настроек)
+from core.broker import broker, publisher
+from core.config import settings
+
+
+async def before(messages: list[str]) -> None:
+    for message in messages:
+        async with broker:
+            await broker.publish(message, settings.rabbitmq_queue)
+
+
+async def after(messages: list[str]) -> None:
+    for message in messages:
+        await publisher.send(message)
+    await publisher.close()
+
+
+async def measure(name: str, send, messages: list[str]) -> float:
+    started = time.perf_counter()
+    await send(messages)
+    elapsed = time.perf_counter() - started
+    rate = len(messages) / elapsed
+    print(f"{name:<7} {len(messages)} messages in {elapsed:.2f}s ({rate:.0f} msg/s)")
+    return rate
+
+
+async def run(args: argparse.Namespace) -> None:
+    messages = [f"benchmark message {index}" for index in range(args.messages)]
+    before_rate = await measure("before", before, messages)
+    after_rate = await measure("after", after, messages)
+    print(f"speedup: {after_rate / before_rate:.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=1000)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
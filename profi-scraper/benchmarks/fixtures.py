@@ -0,0 +1,90 @@
+"""Снимки доски для бенчмарков.
+
+Можно передать записанные с живой доски HTML и JSON (--html/--json),
+иначе генерируется синтетическая доска с теми же классами, что ищет
+Selector, и соответствующая ей JSON-лента.
+"""
+
+import json
+import os
+from pathlib import Path
+
+# Selector и Order читают настройки при импорте
+os.environ.setdefault("PROFI_LOGIN", "benchmark")
+os.environ.setdefault("PROFI_PASSWORD", "benchmark")
+
+ORDER_SNIPPET = """
+<div class="OrderSnippetContainerStyles__Container-sc-1qf4h1o-0 kXjRbN">
+  <a class="SnippetBodyStyles__Container-sc-tnih0-2 dWfJtB" id="{id}" href="/backoffice/n.php?o={id}">
+    <div class="SubjectAndPriceStyles__Container-sc-18v5hu8-0">
+      <span class="SubjectAndPriceStyles__SubjectsText-sc-18v5hu8-1 fHqLbm">{subject}</span>
+      <span class="SubjectAndPriceStyles__PriceValue-sc-18v5hu8-5 cUzXbW">{price}</span>
+    </div>
+    <div class="SnippetBodyStyles__MainInfo-sc-tnih0-6 jRmnBd">{description}</div>
+    <div class="StatusAndClientInfoStyles__Container-sc-xp6j2r-0">
+      <span class="StatusAndClientInfoStyles__Name-sc-xp6j2r-9 ihShvN">{client_name}</span>
+      <span class="Date__DateText-sc-e1f8oi-1 bKqNvE">{time_info}</span>
+    </div>
+  </a>
+</div>
+"""
+
+BOARD_PAGE = """<!DOCTYPE html>
+<html lang="ru">
+<head><meta charset="utf-8"><title>Профи — заказы</title>{styles}</head>
+<body>
+<div class="NavigationBarStyles__Container-sc-qnnk0q-0">
+  <div class="global-badge NavigationBarStyles__NavigationBarBadge-sc-qnnk0q-4 WYxvL">{unviewed}</div>
+</div>
+<div class="Message__Container-sc-1njfbi7-0">
+  <div class="Message__ResponseLimit-sc-1njfbi7-9 hHkWqb">{response_limit}</div>
+</div>
+<div id="BOARD_GRID_CONTAINER_ID">{snippets}</div>
+</body>
+</html>
+"""
+
+
+def _order(index: int) -> dict:
+    return {
+        "id": f"{70000000 + index}",
+        "subject": f"Английский язык, уровень B{index % 2 + 1}",
+        "price": f"{1500 + index * 10} ₽ за 60 мин.",
+        "description": "Подготовка к собеседованию на английском. "
+        "Нужны регулярные занятия два раза в неделю, онлайн. " * 3,
+        "client_name": f"Клиент {index}",
+        "time_info": "сегодня в 12:34",
+    }
+
+
+def synthetic_board(
+    orders: int = 40, unviewed: int = 3, start: int = 0
+) -> tuple[str, str]:
+    """HTML доски и JSON ленты с одинаковыми заказами (номера с start)"""
+    items = [_order(index) for index in range(start, start + orders)]
+    # Стили и скрипты реальной страницы занимают большую часть документа
+    styles = "<style>" + ".x{color:red}" * 5000 + "</style>"
+    html = BOARD_PAGE.format(
+        styles=styles,
+        unviewed=unviewed,
+        response_limit=12,
+        snippets="".join(ORDER_SNIPPET.format(**item) for item in items),
+    )
+    feed = json.dumps(
+        {
+            "orders": [
+                {**item, "url": f"/backoffice/n.php?o={item['id']}"} for item in items
+            ]
+        },
+        ensure_ascii=False,
+    )
+    return html, feed
+
+
+def load_board(html_path: str | None, json_path: str | None) -> tuple[str, str]:
+    html, feed = synthetic_board()
+    if html_path:
+        html = Path(html_path).read_text(encoding="utf-8")
+    if json_path:
+        feed = Path(json_path).read_text(encoding="utf-8")
+    return html, feed
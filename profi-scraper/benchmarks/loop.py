@@ -0,0 +1,266 @@
+"""Полные циклы process_orders и accept против локальной копии доски.
+
+    docker compose up -d redis
+    python -m benchmarks.loop --orders 40 --new 5 --cycles 20
+    python -m benchmarks.loop --mode html --html board.html --json board.json
+
+Доска, лента и страницы заказов отдаются локальным HTTP-сервером:
+запросы Chromium к profi.ru перехватываются и пересылаются на него,
+так что внешняя сеть не нужна. Запросы ленты через APIRequestContext
+мимо перехвата не идут, поэтому перехваченная лента перенаправляется на
+сервер напрямую. Синтетическая доска в каждом цикле сдвигает номера
+заказов на --new, и в каждом цикле появляется --new новых заказов.
+Записанные снимки (--html/--json) не меняются, поэтому для них
+просмотренные заказы и BoardDiffer сбрасываются перед каждым циклом.
+--no-diff отключает BoardDiffer, как было до него.
+
+Redis нужен настоящий (по настройкам redis_*). Все ключи живут под
+отдельным логином и удаляются в конце. Сообщения в RabbitMQ не
+отправляются, а только считаются: брокер меряется в benchmarks.broker.
+
+На цикл выводятся время, CPU процесса скрапера, CPU браузера и
+пиковый RSS (скрапер + Chromium).
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from benchmarks.fixtures import synthetic_board
+from benchmarks.resources import browser_usage
+from core.broker import publisher
+from core.config import settings, use_settings
+from core.redis import client
+
+ORDER_PAGE = """<!DOCTYPE html>
+<html lang="ru">
+<head><meta charset="utf-8"><title>Заказ</title></head>
+<body>
+<div class="ClientSummaryBlock__Container-sc-17uaovi-0">
+  <div class="ClientSummaryBlock__Text-sc-17uaovi-2">На Профи.ру
+    <span class="ClientSummaryBlock__Description-sc-17uaovi-4">с 12 марта 2020</span>
+  </div>
+</div>
+<div class="Tariffs__Container-sc-1x0u3ef-0">
+  <div class="Tariffs__Item-sc-1x0u3ef-1"><div><span>Комиссия</span></div></div>
+  <button class="Tariffs__Button-sc-1x0u3ef-2">Откликнуться</button>
+</div>
+<div class="order-card-bid-window-screen__body-content">
+  <textarea class="TextAreaStyles__StyledTextArea-sc-1b3ssn1-0"></textarea>
+  <input class="backoffice-common-input__input">
+  <button class="ButtonStyles__Container-sc-1ohnzue-0 PaymentMethodsFormStyles__ButtonWide-sc-9xbrs0-3">
+    Отправить
+  </button>
+</div>
+</body>
+</html>
+"""
+
+# Доска запрашивает ленту сама, чтобы OrderFeed мог ее перехватить
+FEED_PATH = "/backoffice/api/board/orders"
+FEED_SCRIPT = f"<script>fetch('{FEED_PATH}')</script>"
+
+
+class Board:
+    """Содержимое стенда: синтетическая доска со сдвигом или снимки"""
+
+    def __init__(self, orders: int, new: int, html: str | None, feed: str | None):
+        self.orders = orders
+        self.new = new
+        self.recorded = (html, feed) if html or feed else None
+        # Номер цикла выставляет бенчмарк: доска и лента внутри цикла совпадают
+        self.generation = 0
+        self.requests = 0
+
+    def documents(self) -> tuple[str, str]:
+        self.requests += 1
+        html, feed = synthetic_board(self.orders, start=self.generation * self.new)
+        if self.recorded is not None:
+            return self.recorded[0] or html, self.recorded[1] or feed
+        return html, feed
+
+
+def serve(board: Board) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, body: str, content_type: str) -> None:
+            payload = body.encode()
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def do_GET(self) -> None:
+            path = urlsplit(self.path).path
+            if path == FEED_PATH:
+                self._send(board.documents()[1], "application/json")
+            elif path == "/backoffice/n.php":
+                self._send(ORDER_PAGE, "text/html; charset=utf-8")
+            elif path.startswith("/backoffice"):
+                html = board.documents()[0].replace("</body>", FEED_SCRIPT + "</body>")
+                self._send(html, "text/html; charset=utf-8")
+            else:
+                self.send_error(404)
+
+        do_POST = do_GET
+
+        def log_message(self, *args) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def process_rss() -> int:
+    pages = int(Path("/proc/self/statm").read_text().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE")
+
+
+async def _cleanup(login: str) -> None:
+    keys = [key async for key in client.client.scan_iter(match=f"*{login}*")]
+    if keys:
+        await client.client.delete(*keys)
+
+
+async def run(args: argparse.Namespace) -> None:
+    from playwright.async_api import async_playwright
+
+    from src.orders.actions.accept import accept, create_accept_pool
+    from src.orders.actions.fetch import process_orders
+    from src.orders.feed import OrderFeed
+    from src.orders.page import BACKOFFICE_URL
+    from src.orders.selector import BoardDiffer
+    from core.resources import open_page
+    from src.scraper.browser import launch_args
+
+    login = f"benchmark-{os.getpid()}"
+    use_settings(
+        settings.for_tenant(
+            {
+                "profi_login": login,
+                "poll_mode": args.mode,
+                "html_parser": args.parser,
+                "mac_concurrent_pages": args.pages,
+            }
+        )
+    )
+
+    messages = 0
+
+    async def count_message(message: str) -> None:
+        nonlocal messages
+        messages += 1
+
+    publisher.send = count_message
+
+    html = Path(args.html).read_text(encoding="utf-8") if args.html else None
+    feed_json = Path(args.json).read_text(encoding="utf-8") if args.json else None
+    board = Board(args.orders, args.new, html, feed_json)
+    server = serve(board)
+    origin = f"http://127.0.0.1:{server.server_address[1]}"
+
+    class LocalFeed(OrderFeed):
+        async def _on_response(self, response) -> None:
+            await super()._on_response(response)
+            if self.captured:
+                parts = urlsplit(self._request["url"])
+                query = f"?{parts.query}" if parts.query else ""
+                self._request["url"] = f"{origin}{parts.path}{query}"
+
+    async def forward(route) -> None:
+        parts = urlsplit(route.request.url)
+        query = f"?{parts.query}" if parts.query else ""
+        response = await route.fetch(url=f"{origin}{parts.path}{query}")
+        await route.fulfill(response=response)
+
+    await client.update_response_limit(10**6)
+    poll_times, accept_times = [], []
+    scraper_cpu, chromium_cpu = [], []
+    peak_rss = 0
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(args=launch_args())
+            context = await browser.new_context(
+                viewport={"width": settings.viewport_width, "height": settings.viewport_height}
+            )
+            await context.route("https://profi.ru/**", forward)
+
+            page = await open_page(context)
+            feed = LocalFeed() if args.mode == "feed" else None
+            if feed is not None:
+                feed.attach(page)
+            await page.goto(BACKOFFICE_URL)
+            pool = create_accept_pool(context)
+            differ = None if args.no_diff else BoardDiffer()
+
+            for cycle in range(args.warmup + args.cycles):
+                board.generation = cycle + 1
+                if board.recorded is not None:
+                    await client.client.delete(f"viewed_orders:{login}")
+                    if differ is not None:
+                        differ.reset()
+                refresh_html = cycle % settings.feed_html_refresh_every == 0
+
+                cpu, chromium = time.process_time(), browser_usage()[0]
+                started = time.perf_counter()
+                orders = await process_orders(page, feed, refresh_html, differ)
+                polled = time.perf_counter()
+                if orders:
+                    await accept(pool, orders)
+                finished = time.perf_counter()
+
+                if cycle >= args.warmup:
+                    poll_times.append(polled - started)
+                    accept_times.append(finished - polled)
+                    scraper_cpu.append(time.process_time() - cpu)
+                    chromium_cpu.append(browser_usage()[0] - chromium)
+                    peak_rss = max(peak_rss, process_rss() + browser_usage()[1])
+
+            await pool.close()
+            await context.close()
+            await browser.close()
+    finally:
+        server.shutdown()
+        await _cleanup(login)
+        await client.client.aclose()
+
+    def ms(values: list[float]) -> str:
+        return f"{statistics.mean(values) * 1000:8.1f} ms"
+
+    print(
+        f"mode={args.mode} parser={args.parser} diff={not args.no_diff} "
+        f"orders={args.orders} "
+        f"new={args.new} cycles={args.cycles} board requests={board.requests} "
+        f"messages={messages}"
+    )
+    print(f"process_orders wall/cycle {ms(poll_times)}")
+    print(f"accept wall/cycle         {ms(accept_times)}")
+    print(f"scraper cpu/cycle         {ms(scraper_cpu)}")
+    print(f"chromium cpu/cycle        {ms(chromium_cpu)}")
+    print(f"peak rss                  {peak_rss / 2**20:8.1f} MiB")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--orders", type=int, default=40, help="заказов на доске")
+    parser.add_argument("--new", type=int, default=5, help="новых заказов за цикл")
+    parser.add_argument("--cycles", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--mode", choices=["feed", "html"], default=settings.poll_mode)
+    parser.add_argument("--parser", default=settings.html_parser)
+    parser.add_argument("--pages", type=int, default=settings.mac_concurrent_pages)
+    parser.add_argument("--html", help="записанный HTML доски")
+    parser.add_argument("--json", help="записанный ответ ленты доски")
+    parser.add_argument("--no-diff", action="store_true", help="без BoardDiffer")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""CPU на один опрос доски: HTML-путь против JSON-ленты.
+
+    python -m benchmarks.polling --iterations 200
+    python -m benchmarks.polling --html board.html --json board.json
+
+HTML-путь повторяет PWPage.get_board без кэша (один разбор страницы
+настроенным html_parser), JSON-путь — OrderFeed.fetch после получения
+тела ответа.
+Сетевое время и рендер браузера не учитываются, замеряется только
+процессорное время процесса скрапера.
+"""
+
+import argparse
+import json
+import time
+
+from benchmarks.fixtures import load_board
+from src.orders.feed import parse_feed
+from src.orders.selector import Selector
+
+
+def html_poll(html: str) -> int:
+    return len(Selector(html).extract().orders)
+
+
+def feed_poll(feed: str) -> int:
+    return len(parse_feed(json.loads(feed)))
+
+
+def measure(name: str, poll, document: str, iterations: int) -> float:
+    orders = poll(document)
+    started = time.process_time()
+    for _ in range(iterations):
+        poll(document)
+    per_poll = (time.process_time() - started) / iterations
+    print(f"{name:<6} orders={orders:<4} cpu/poll={per_poll * 1000:8.3f} ms")
+    return per_poll
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--html", help="записанный HTML доски")
+    parser.add_argument("--json", help="записанный ответ ленты доски")
+    args = parser.parse_args()
+
+    html, feed = load_board(args.html, args.json)
+    html_cpu = measure("html", html_poll, html, args.iterations)
+    feed_cpu = measure("feed", feed_poll, feed, args.iterations)
+    print(f"speedup: {html_cpu / feed_cpu:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
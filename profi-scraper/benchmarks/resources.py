@@ -0,0 +1,175 @@
+"""Вес опроса доски с блокировкой ресурсов и без нее.
+
+HAR записывается работающим скрапером: har_record_path=/tmp/board.har
+в .env, затем несколько опросов и остановка (HAR пишется при закрытии
+контекста).
+
+    python -m benchmarks.resources --har board.har
+    python -m benchmarks.resources --har board.har --live --polls 10
+
+Без --live считаются байты на опрос по записям HAR: все запросы против
+тех, что пропускает ResourcePolicy из настроек. С --live Chromium
+проигрывает HAR (сеть не используется) с настройками по умолчанию и с
+флагами и окном из src.scraper.browser и блокировкой из core.resources;
+замеряются время CPU и пиковый RSS процессов браузера и полученные байты.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+from collections import defaultdict
+from pathlib import Path
+
+import benchmarks.fixtures  # noqa: F401  (переменные окружения для настроек)
+from core.resources import ResourcePolicy, open_page, resource_policy
+from src.scraper.browser import launch_args
+
+MIME_RESOURCE_TYPES = (
+    ("text/html", "document"),
+    ("text/css", "stylesheet"),
+    ("javascript", "script"),
+    ("image/", "image"),
+    ("font", "font"),
+    ("video/", "media"),
+    ("audio/", "media"),
+    ("json", "xhr"),
+)
+
+
+def _resource_type(entry: dict) -> str:
+    if entry.get("_resourceType"):
+        return entry["_resourceType"]
+    mime = entry["response"].get("content", {}).get("mimeType", "")
+    for fragment, resource_type in MIME_RESOURCE_TYPES:
+        if fragment in mime:
+            return resource_type
+    return "other"
+
+
+def _size(entry: dict) -> int:
+    response = entry["response"]
+    body = response.get("bodySize", -1)
+    if body < 0:
+        body = response.get("content", {}).get("size", 0)
+    return max(body, 0) + max(response.get("headersSize", 0), 0)
+
+
+def har_report(har_path: str, policy: ResourcePolicy) -> str:
+    entries = json.loads(Path(har_path).read_text(encoding="utf-8"))["log"]["entries"]
+    polls = sum(1 for entry in entries if _resource_type(entry) == "document") or 1
+
+    total = defaultdict(int)
+    kept = defaultdict(int)
+    for entry in entries:
+        resource_type = _resource_type(entry)
+        size = _size(entry)
+        total[resource_type] += size
+        if not policy.should_block(resource_type, entry["request"]["url"]):
+            kept[resource_type] += size
+
+    print(f"{'type':<12}{'all KiB/poll':>14}{'kept KiB/poll':>15}")
+    for resource_type in sorted(total, key=total.get, reverse=True):
+        print(
+            f"{resource_type:<12}{total[resource_type] / polls / 1024:>14.1f}"
+            f"{kept[resource_type] / polls / 1024:>15.1f}"
+        )
+    all_bytes, kept_bytes = sum(total.values()), sum(kept.values())
+    print(
+        f"{'total':<12}{all_bytes / polls / 1024:>14.1f}{kept_bytes / polls / 1024:>15.1f}"
+    )
+    board_url = next(
+        entry["request"]["url"]
+        for entry in entries
+        if _resource_type(entry) == "document"
+    )
+    return board_url
+
+
+def _descendants() -> list[int]:
+    parents = {}
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            stat = Path(f"/proc/{pid}/stat").read_text()
+        except OSError:
+            continue
+        parents[int(pid)] = int(stat.rsplit(")", 1)[1].split()[1])
+    found, frontier = [], [os.getpid()]
+    while frontier:
+        parent = frontier.pop()
+        children = [pid for pid, ppid in parents.items() if ppid == parent]
+        found.extend(children)
+        frontier.extend(children)
+    return found
+
+
+def browser_usage() -> tuple[float, int]:
+    """CPU (с) и RSS (байты) всех дочерних процессов"""
+    ticks = os.sysconf("SC_CLK_TCK")
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    cpu, rss = 0.0, 0
+    for pid in _descendants():
+        try:
+            fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+        except OSError:
+            continue
+        cpu += (int(fields[11]) + int(fields[12])) / ticks
+        rss += int(fields[21]) * page_size
+    return cpu, rss
+
+
+async def live_run(har_path: str, board_url: str, polls: int, tuned: bool) -> None:
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as playwright:
+        browser = await playwright.chromium.launch(
+            args=launch_args() if tuned else None
+        )
+        context = await browser.new_context(
+            viewport={"width": 1280, "height": 720} if tuned else None
+        )
+        await context.route_from_har(har_path, not_found="abort")
+
+        page = await open_page(context) if tuned else await context.new_page()
+        received = 0
+
+        async def count(response):
+            nonlocal received
+            try:
+                received += len(await response.body())
+            except Exception:
+                pass
+
+        page.on("response", lambda response: asyncio.ensure_future(count(response)))
+
+        cpu_before, _ = browser_usage()
+        peak_rss = 0
+        for _ in range(polls):
+            await page.goto(board_url, wait_until="load")
+            peak_rss = max(peak_rss, browser_usage()[1])
+        cpu_after, _ = browser_usage()
+        await browser.close()
+
+    name = "tuned" if tuned else "default"
+    print(
+        f"{name:<8} cpu/poll={(cpu_after - cpu_before) / polls * 1000:7.1f} ms "
+        f"peak rss={peak_rss / 2**20:7.1f} MiB "
+        f"received/poll={received / polls / 1024:8.1f} KiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--har", required=True, help="HAR, записанный скрапером")
+    parser.add_argument("--live", action="store_true", help="проиграть HAR в Chromium")
+    parser.add_argument("--polls", type=int, default=10)
+    args = parser.parse_args()
+
+    board_url = har_report(args.har, resource_policy)
+    if args.live:
+        for tuned in (False, True):
+            asyncio.run(live_run(args.har, board_url, args.polls, tuned))
+
+
+if __name__ == "__main__":
+    main()
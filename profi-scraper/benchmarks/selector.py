@@ -0,0 +1,83 @@
+"""Разбор доски разными движками Selector.
+
+    python -m benchmarks.selector --iterations 100
+    python -m benchmarks.selector --html board.html
+
+legacy — прежний путь: html.parser и отдельный разбор для заказов и для
+счетчика сообщений. single — один проход Selector.extract для каждого
+движка. memo — повторный parse_board того же HTML (попадание в кэш).
+diff — BoardDiffer на доске, где с прошлого опроса появилось 5 заказов
+(только для синтетической доски).
+"""
+
+import argparse
+import itertools
+import time
+
+from benchmarks.fixtures import load_board, synthetic_board
+from src.orders import selector
+from src.orders.selector import BACKENDS, BoardDiffer, Selector, parse_board
+
+
+def legacy(html: str):
+    orders = Selector(html, "html.parser").get_orders()
+    Selector(html, "html.parser").unviewed_messages
+    return orders
+
+
+def single(backend: str):
+    return lambda html: Selector(html, backend).extract().orders
+
+
+def memo(html: str):
+    return parse_board(html).orders
+
+
+def diff(html: str, shifted: str):
+    differ = BoardDiffer()
+    differ.diff(shifted)
+    boards = itertools.cycle([html, shifted])
+    return lambda _: differ.diff(next(boards)).orders
+
+
+def measure(name: str, parse, html: str, iterations: int, baseline: float | None):
+    orders = parse(html)
+    started = time.perf_counter()
+    for _ in range(iterations):
+        parse(html)
+    per_call = (time.perf_counter() - started) / iterations
+    speedup = f"{baseline / per_call:8.1f}x" if baseline else ""
+    print(f"{name:<20} orders={len(orders):<4} {per_call * 1000:9.3f} ms {speedup}")
+    return per_call, orders
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--html", help="записанный HTML доски")
+    args = parser.parse_args()
+
+    html, _ = load_board(args.html, None)
+    baseline, expected = measure("legacy html.parser", legacy, html, args.iterations, None)
+
+    for backend in BACKENDS:
+        try:
+            _, orders = measure(
+                f"single {backend}", single(backend), html, args.iterations, baseline
+            )
+        except ImportError as e:
+            print(f"single {backend:<13} skipped: {e}")
+            continue
+        if orders != expected:
+            print(f"  warning: {backend} extracted different orders")
+
+    selector._board_cache.clear()
+    measure("memo hit", memo, html, args.iterations, baseline)
+
+    if not args.html:
+        shifted, _ = synthetic_board(start=5)
+        measure("diff 5 new", diff(html, shifted), html, args.iterations, baseline)
+
+
+if __name__ == "__main__":
+    main()
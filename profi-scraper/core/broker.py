@@ -1,5 +1,10 @@
+import asyncio
+
 from faststream.rabbit import RabbitBroker
 from core.config import settings
+from core.logger import get_logger
+
+logger = get_logger(__name__, settings.log_level)
 
 
 broker = RabbitBroker(
@@ -7,9 +12,81 @@ broker = RabbitBroker(
 )
 
 
+class Publisher:
+    """Отправляет сообщения через одно соединение на все время работы.
+
+    send только кладет сообщение во внутреннюю очередь; фоновая задача
+    забирает из нее пачки до publisher_batch_size сообщений и публикует
+    их параллельно по общему каналу. close дожидается, пока очередь
+    опустеет, и закрывает соединение.
+    """
+
+    def __init__(self):
+        self._queue: asyncio.Queue[str] | None = None
+        self._task: asyncio.Task | None = None
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+    async def start(self) -> None:
+        async with self._lock:
+            if self._task is not None or self._closed:
+                return
+            await broker.connect()
+            self._queue = asyncio.Queue(maxsize=settings.publisher_queue_size)
+            self._task = asyncio.create_task(self._run())
+
+    async def send(self, message: str) -> None:
+        await self.start()
+        if self._closed:
+            # После close соединение не открывается заново
+            logger.warning(f"Publisher is closed, message dropped: {message[:100]}")
+            return
+        await self._queue.put(message)
+
+    async def _publish(self, message: str) -> None:
+        try:
+            await broker.publish(message, settings.rabbitmq_queue)
+        except Exception as e:
+            logger.error(f"Failed to publish message: {e}")
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while (
+                len(batch) < settings.publisher_batch_size and not self._queue.empty()
+            ):
+                batch.append(self._queue.get_nowait())
+            try:
+                await asyncio.gather(*(self._publish(message) for message in batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def close(self) -> None:
+        async with self._lock:
+            self._closed = True
+            if self._task is None:
+                return
+            try:
+                await asyncio.wait_for(
+                    self._queue.join(), timeout=settings.publisher_drain_timeout
+                )
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Publisher closed with {self._queue.qsize()} undelivered messages"
+                )
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            self._queue = None
+            await broker.stop()
+
+
+publisher = Publisher()
+
+
 async def send_message(message: str):
-    async with broker:
-        await broker.publish(message, settings.rabbitmq_queue)
+    await publisher.send(message)
 
 
 async def send_messages(messages: list[str]) -> None:
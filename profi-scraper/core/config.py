@@ -1,3 +1,6 @@
+from contextvars import ContextVar
+
+from pydantic import model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -15,9 +18,23 @@ class Settings(BaseSettings):
     rabbitmq_password: str = "guest"
     rabbitmq_port: str = "5672"
     rabbitmq_queue: str = "scrapers"
+    publisher_queue_size: int = 1000
+    publisher_batch_size: int = 50
+    publisher_drain_timeout: float = 10.0
+
+    # Обязательны, если не задан multi_tenant: в мультиаккаунтном режиме
+    # логин и пароль берутся из конфигов аккаунтов
+    profi_login: str = ""
+    profi_password: str = ""
 
-    profi_login: str
-    profi_password: str
+    # Один браузер на все аккаунты из ключей tenant_config_prefix* в Redis
+    multi_tenant: bool = False
+    tenant_config_prefix: str = "scraper:config:"
+    # Как часто перечитывать конфиги аккаунтов (секунды)
+    tenant_refresh_interval: int = 30
+    max_tenants: int = 20
+    # Сколько аккаунтов опрашивают доску одновременно
+    tenant_poll_concurrency: int = 2
 
     headless: bool = True
     proxy_host: str | None = None
@@ -25,8 +42,27 @@ class Settings(BaseSettings):
     proxy_password: str | None = None
     proxy_port: str | None = None
 
+    # Типы ресурсов и сторонние домены, которые браузер не загружает (через запятую)
+    blocked_resource_types: str = "image,media,font"
+    blocked_domains: str = (
+        "mc.yandex.ru,an.yandex.ru,yandex.ru/ads,google-analytics.com,"
+        "googletagmanager.com,doubleclick.net,top-fwz1.mail.ru,vk.com/rtrg"
+    )
+    viewport_width: int = 1280
+    viewport_height: int = 720
+    # Записывать HAR доски для бенчмарков (путь к файлу)
+    har_record_path: str | None = None
+
     page_refresh_min: int = 5
     page_refresh_max: int = 15
+    # Адаптивный опрос: после новых заказов интервал держится у
+    # page_refresh_min poll_hot_window секунд, на пустой доске растет в
+    # poll_backoff раз за опрос — до page_refresh_max в активные часы и до
+    # poll_idle_max в самые тихие (по профилю активности из Redis)
+    poll_backoff: float = 1.5
+    poll_idle_max: int = 120
+    poll_hot_window: int = 300
+    poll_jitter: float = 0.2
     accept: bool = True
     accept_text: str = """
     Здравствуйте!
@@ -44,6 +80,47 @@ class Settings(BaseSettings):
     redis_password: str | None = None
 
     mac_concurrent_pages: int = 5
+    # Таймаут обработки одного заказа и через сколько заказов пересоздавать вкладку
+    accept_order_timeout: float = 120.0
+    accept_page_recycle_after: int = 20
+    # Через сколько секунд неподтвержденный резерв отклика возвращается в бюджет
+    response_reservation_ttl: int = 300
+
+    # html — перезагрузка страницы, feed — опрос XHR-ленты доски с откатом
+    # на HTML (формат ленты угадывается, поэтому включается явно)
+    poll_mode: str = "html"
+    orders_feed_pattern: str = r"profi\.ru/backoffice/.*(orders|board|snippets)"
+    # Раз в сколько опросов в режиме feed все равно перезагружать доску
+    # (счетчик сообщений есть только в HTML)
+    feed_html_refresh_every: int = 10
+
+    # Искать стоп-слова по основе (без окончания), а не по точной форме
+    stop_words_stemming: bool = True
+
+    # Разборщик HTML: selectolax, lxml или html.parser (BeautifulSoup)
+    html_parser: str = "selectolax"
+    # Сколько последних разобранных страниц доски держать в памяти
+    board_cache_size: int = 8
+
+    # Сколько помнить просмотренные заказы (секунды)
+    viewed_orders_ttl: int = 14 * 24 * 3600
+
+    # Сколько замеров стадий держать в стриме Redis и в памяти до отправки
+    metrics_spans_maxlen: int = 100_000
+    metrics_buffer_size: int = 10_000
+
+    # Сколько живет сохраненная сессия (storage_state) в Redis
+    session_ttl: int = 7 * 24 * 3600
+
+    @property
+    def blocked_resource_types_list(self) -> list[str]:
+        items = self.blocked_resource_types.split(",")
+        return [item.strip() for item in items if item.strip()]
+
+    @property
+    def blocked_domains_list(self) -> list[str]:
+        items = self.blocked_domains.split(",")
+        return [item.strip() for item in items if item.strip()]
 
     @property
     def admin_ids_list(self) -> list[int]:
@@ -51,7 +128,52 @@ class Settings(BaseSettings):
             return []
         return [int(idx) for idx in self.admin_ids.split(",")]
 
+    @model_validator(mode="after")
+    def _require_credentials(self) -> "Settings":
+        if not self.multi_tenant and not (self.profi_login and self.profi_password):
+            raise ValueError(
+                "profi_login and profi_password are required unless multi_tenant is set"
+            )
+        return self
+
+    def for_tenant(self, config: dict) -> "Settings":
+        """Копия настроек с полями из конфига аккаунта (scrapers-api)"""
+        config = dict(config)
+        if "max_concurrent_pages" in config:
+            config.setdefault("mac_concurrent_pages", config.pop("max_concurrent_pages"))
+        overrides = {
+            name: value
+            for name, value in config.items()
+            if name in type(self).model_fields and value is not None
+        }
+        return type(self).model_validate({**self.model_dump(), **overrides})
+
     model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
 
-settings = Settings()
+_current_settings: ContextVar[Settings | None] = ContextVar(
+    "current_settings", default=None
+)
+
+
+class _SettingsProxy:
+    """Настройки текущего аккаунта.
+
+    Вне задач аккаунтов это настройки процесса; задачи мультиаккаунтного
+    режима подменяют их через use_settings, и подмена наследуется всеми
+    задачами, созданными внутри.
+    """
+
+    def __init__(self, default: Settings):
+        self._default = default
+
+    def __getattr__(self, name: str):
+        return getattr(_current_settings.get() or self._default, name)
+
+
+def use_settings(tenant_settings: Settings) -> None:
+    """Задает настройки для текущей задачи и ее потомков"""
+    _current_settings.set(tenant_settings)
+
+
+settings = _SettingsProxy(Settings())
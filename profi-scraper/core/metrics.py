@@ -0,0 +1,160 @@
+"""Длительность стадий опроса доски и отклика на заказ.
+
+Стадии размечаются через metrics.span("stage"); длительности копятся в
+гистограммах по аккаунтам и раз в цикл опроса уходят в Redis: снимки
+гистограмм — в хеш metrics:stages:{login}, отдельные замеры — в стрим
+metrics:spans:{login}, из которого строится отчет.
+
+    python -m core.metrics export --login user --minutes 60 --out run.jsonl
+    python -m core.metrics report run.jsonl
+    python -m core.metrics report --login user --minutes 60
+"""
+
+import argparse
+import asyncio
+import bisect
+import json
+import statistics
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from core.config import settings
+
+# Границы корзин, секунды: от разбора HTML до отклика на заказ
+STAGE_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 20, 30, 60, 120
+)
+
+
+class LatencyHistogram:
+    def __init__(self, buckets: tuple[float, ...] = STAGE_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, seconds)] += 1
+        self.total += seconds
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        labels = [f"le_{bound}" for bound in self.buckets] + ["le_inf"]
+        return {
+            "buckets": dict(zip(labels, self.counts)),
+            "count": self.count,
+            "sum": round(self.total, 3),
+        }
+
+
+class StageMetrics:
+    """Гистограммы и несохраненные замеры стадий по логинам аккаунтов"""
+
+    def __init__(self):
+        self.histograms: dict[str, dict[str, LatencyHistogram]] = defaultdict(dict)
+        self._pending: dict[str, list[tuple[str, float, float]]] = defaultdict(list)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        login = settings.profi_login
+        histograms = self.histograms[login]
+        if stage not in histograms:
+            histograms[stage] = LatencyHistogram()
+        histograms[stage].observe(seconds)
+        # Если Redis недоступен, лишние замеры отбрасываются
+        pending = self._pending[login]
+        if len(pending) < settings.metrics_buffer_size:
+            pending.append((stage, seconds, time.time()))
+
+    @contextmanager
+    def span(self, stage: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    async def flush(self) -> None:
+        """Отправляет в Redis замеры текущего аккаунта"""
+        from core.redis import client
+
+        login = settings.profi_login
+        samples, self._pending[login] = self._pending[login], []
+        snapshots = {
+            stage: histogram.snapshot()
+            for stage, histogram in self.histograms[login].items()
+        }
+        try:
+            await client.save_stage_metrics(snapshots, samples)
+        except Exception:
+            self._pending[login] = samples + self._pending[login]
+            raise
+
+
+metrics = StageMetrics()
+
+
+def percentiles(values: list[float]) -> tuple[float, float, float]:
+    if len(values) == 1:
+        return values[0], values[0], values[0]
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+def print_report(samples: list[dict]) -> None:
+    by_stage = defaultdict(list)
+    for sample in samples:
+        by_stage[sample["stage"]].append(float(sample["seconds"]))
+
+    print(f"{'stage':<24}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}{'total':>12}")
+    for stage, values in sorted(
+        by_stage.items(), key=lambda item: sum(item[1]), reverse=True
+    ):
+        p50, p95, p99 = percentiles(values)
+        print(
+            f"{stage:<24}{len(values):>8}{p50:>10.3f}{p95:>10.3f}{p99:>10.3f}"
+            f"{sum(values):>12.1f}"
+        )
+
+
+async def _read_spans(login: str, minutes: float | None) -> list[dict]:
+    from core.config import use_settings
+    from core.redis import client
+
+    use_settings(settings.for_tenant({"profi_login": login}))
+    since = time.time() - minutes * 60 if minutes else None
+    return await client.get_stage_spans(since)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser("export", help="сохранить замеры из Redis в JSONL")
+    export.add_argument("--login", required=True)
+    export.add_argument("--minutes", type=float, default=None)
+    export.add_argument("--out", required=True)
+
+    report = commands.add_parser("report", help="p50/p95/p99 по стадиям")
+    report.add_argument("path", nargs="?", help="JSONL из export")
+    report.add_argument("--login")
+    report.add_argument("--minutes", type=float, default=None)
+
+    args = parser.parse_args()
+    if args.command == "export":
+        samples = asyncio.run(_read_spans(args.login, args.minutes))
+        with open(args.out, "w", encoding="utf-8") as f:
+            for sample in samples:
+                f.write(json.dumps(sample) + "\n")
+        print(f"{len(samples)} spans written to {args.out}")
+    elif args.path:
+        with open(args.path, encoding="utf-8") as f:
+            print_report([json.loads(line) for line in f if line.strip()])
+    elif args.login:
+        print_report(asyncio.run(_read_spans(args.login, args.minutes)))
+    else:
+        parser.error("report needs a JSONL file or --login")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,69 @@
+import json
+import statistics
+import time
+import uuid
+from dataclasses import dataclass
+
 from redis.asyncio import Redis
 from core.config import settings
 from src.orders.schema import Order
 
+# Резервы, не подтвержденные до истечения срока (например, под упавшим
+# подом), возвращаются в бюджет при следующем резервировании
+TRY_RESERVE_SCRIPT = """
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', ARGV[2])
+for _, id in ipairs(expired) do
+    local count = tonumber(redis.call('HGET', KEYS[3], id) or '0')
+    redis.call('INCRBY', KEYS[1], count)
+    redis.call('HDEL', KEYS[3], id)
+    redis.call('ZREM', KEYS[2], id)
+end
+local available = tonumber(redis.call('GET', KEYS[1]) or '0')
+local granted = math.min(tonumber(ARGV[1]), available)
+if granted <= 0 then
+    return 0
+end
+redis.call('DECRBY', KEYS[1], granted)
+redis.call('ZADD', KEYS[2], ARGV[3], ARGV[4])
+redis.call('HSET', KEYS[3], ARGV[4], granted)
+return granted
+"""
+
+# Подтверждает used из резерва, остаток возвращает в бюджет
+COMMIT_SCRIPT = """
+local count = tonumber(redis.call('HGET', KEYS[3], ARGV[1]) or '-1')
+if count < 0 then
+    return -1
+end
+local unused = count - math.min(tonumber(ARGV[2]), count)
+if unused > 0 then
+    redis.call('INCRBY', KEYS[1], unused)
+end
+redis.call('HDEL', KEYS[3], ARGV[1])
+redis.call('ZREM', KEYS[2], ARGV[1])
+return unused
+"""
+
+# Лимит с сайта учитывает только подтвержденные отклики, поэтому
+# доступный бюджет — это лимит минус еще не подтвержденные резервы
+SET_LIMIT_SCRIPT = """
+local reserved = 0
+for _, count in ipairs(redis.call('HVALS', KEYS[3])) do
+    reserved = reserved + tonumber(count)
+end
+redis.call('SET', KEYS[1], tonumber(ARGV[1]) - reserved)
+return tonumber(ARGV[1]) - reserved
+"""
+
+# Общее множество просмотренных заказов до ключей по логинам
+LEGACY_VIEWED_ORDERS_KEY = "viewed_orders"
+
+
+@dataclass
+class Reservation:
+    id: str
+    count: int
+
 
 class RedisClient:
     def __init__(self):
@@ -12,20 +74,243 @@ class RedisClient:
             password=settings.redis_password,
             decode_responses=True,
         )
+        self._try_reserve = self.client.register_script(TRY_RESERVE_SCRIPT)
+        self._commit = self.client.register_script(COMMIT_SCRIPT)
+        self._set_limit = self.client.register_script(SET_LIMIT_SCRIPT)
+
+    @property
+    def _viewed_orders_key(self) -> str:
+        return f"viewed_orders:{settings.profi_login}"
+
+    @property
+    def _response_limit_key(self) -> str:
+        return f"response_limit:{settings.profi_login}"
 
-    async def get_viewed_orders(self) -> set:
-        return await self.client.smembers("viewed_orders") or set()
+    async def get_viewed_orders(self, order_ids: list[str]) -> set:
+        """Какие из order_ids уже просмотрены (проверяются только они)"""
+        if not order_ids:
+            return set()
+        scores = await self.client.zmscore(self._viewed_orders_key, order_ids)
+        return {
+            order_id
+            for order_id, score in zip(order_ids, scores)
+            if score is not None
+        }
+
+    @property
+    def _budget_keys(self) -> list[str]:
+        return [
+            self._response_limit_key,
+            f"response_limit:reservations:{settings.profi_login}",
+            f"response_limit:reserved:{settings.profi_login}",
+        ]
 
     async def get_response_limit(self) -> int:
-        limit = await self.client.get("response_limit")
+        """Доступный бюджет откликов (без учета выданных резервов)"""
+        limit = await self.client.get(self._response_limit_key)
         return int(limit) if limit is not None else 0
 
     async def update_response_limit(self, limit: int) -> None:
-        await self.client.set("response_limit", str(limit))
+        """Выставляет лимит, полученный с сайта"""
+        await self._set_limit(keys=self._budget_keys, args=[limit])
+
+    async def try_reserve(self, count: int = 1) -> Reservation | None:
+        """Атомарно резервирует до count откликов; None, если бюджет исчерпан"""
+        now = time.time()
+        reservation_id = uuid.uuid4().hex
+        granted = await self._try_reserve(
+            keys=self._budget_keys,
+            args=[count, now, now + settings.response_reservation_ttl, reservation_id],
+        )
+        if not granted:
+            return None
+        return Reservation(id=reservation_id, count=int(granted))
+
+    async def commit(self, reservation: Reservation, used: int | None = None) -> None:
+        """Списывает used откликов из резерва (по умолчанию весь), остаток возвращает"""
+        if used is None:
+            used = reservation.count
+        await self._commit(keys=self._budget_keys, args=[reservation.id, used])
+
+    async def release(self, reservation: Reservation) -> None:
+        """Возвращает резерв в бюджет целиком"""
+        await self.commit(reservation, used=0)
+
+    @property
+    def _storage_state_key(self) -> str:
+        return f"storage_state:{settings.profi_login}"
+
+    async def get_storage_state(self) -> dict | None:
+        state = await self.client.get(self._storage_state_key)
+        return json.loads(state) if state else None
+
+    async def save_storage_state(self, state: dict) -> None:
+        await self.client.set(
+            self._storage_state_key, json.dumps(state), ex=settings.session_ttl
+        )
+
+    async def delete_storage_state(self) -> None:
+        await self.client.delete(self._storage_state_key)
+
+    async def save_accept_latency(self, stats: dict) -> None:
+        """Гистограммы длительности отклика по воркерам пула"""
+        if not stats:
+            return
+        await self.client.hset(
+            f"metrics:accept_latency:{settings.profi_login}",
+            mapping={worker: json.dumps(snapshot) for worker, snapshot in stats.items()},
+        )
+
+    @property
+    def _activity_key(self) -> str:
+        return f"activity:{settings.profi_login}"
+
+    @property
+    def _order_latency_key(self) -> str:
+        return f"metrics:order_to_accept:{settings.profi_login}"
+
+    async def record_poll(self, hour: int, new_orders: int) -> None:
+        """Учитывает опрос и число новых заказов в профиле активности по часам"""
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.hincrby(self._activity_key, f"{hour}:polls", 1)
+            if new_orders:
+                pipe.hincrby(self._activity_key, f"{hour}:orders", new_orders)
+            await pipe.execute()
+
+    async def get_activity_profile(self) -> dict[int, float]:
+        """Среднее число новых заказов за опрос по часам суток"""
+        counters = await self.client.hgetall(self._activity_key)
+        profile = {}
+        for hour in range(24):
+            polls = int(counters.get(f"{hour}:polls", 0))
+            if polls:
+                profile[hour] = int(counters.get(f"{hour}:orders", 0)) / polls
+        return profile
+
+    async def record_order_latency(self, seconds: float) -> None:
+        """Время от появления заказа в разборе до отклика (последние 1000)"""
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.lpush(self._order_latency_key, round(seconds, 3))
+            pipe.ltrim(self._order_latency_key, 0, 999)
+            await pipe.execute()
+
+    async def get_poll_metrics(self) -> dict:
+        """Опросов на новый заказ и медиана задержки до отклика"""
+        counters = await self.client.hgetall(self._activity_key)
+        polls = sum(int(v) for k, v in counters.items() if k.endswith(":polls"))
+        orders = sum(int(v) for k, v in counters.items() if k.endswith(":orders"))
+        latencies = [
+            float(value)
+            for value in await self.client.lrange(self._order_latency_key, 0, -1)
+        ]
+        return dict(
+            polls=polls,
+            new_orders=orders,
+            polls_per_order=polls / orders if orders else None,
+            median_order_to_accept=statistics.median(latencies) if latencies else None,
+        )
+
+    async def get_tenant_configs(self) -> dict[str, str]:
+        """Конфиги аккаунтов мультиаккаунтного режима: job_id -> JSON"""
+        prefix = settings.tenant_config_prefix
+        keys = [key async for key in self.client.scan_iter(match=f"{prefix}*")]
+        if not keys:
+            return {}
+        values = await self.client.mget(keys)
+        return {
+            key[len(prefix):]: value
+            for key, value in zip(keys, values)
+            if value is not None
+        }
+
+    async def save_stage_metrics(
+        self, snapshots: dict, samples: list[tuple[str, float, float]]
+    ) -> None:
+        """Снимки гистограмм стадий и отдельные замеры одним round trip"""
+        if not snapshots and not samples:
+            return
+        login = settings.profi_login
+        async with self.client.pipeline(transaction=False) as pipe:
+            if snapshots:
+                pipe.hset(
+                    f"metrics:stages:{login}",
+                    mapping={
+                        stage: json.dumps(snapshot)
+                        for stage, snapshot in snapshots.items()
+                    },
+                )
+            for stage, seconds, at in samples:
+                pipe.xadd(
+                    f"metrics:spans:{login}",
+                    {"stage": stage, "seconds": round(seconds, 6), "at": round(at, 3)},
+                    maxlen=settings.metrics_spans_maxlen,
+                    approximate=True,
+                )
+            await pipe.execute()
+
+    async def get_stage_spans(self, since: float | None = None) -> list[dict]:
+        """Замеры стадий из стрима, начиная с момента since (unix time)"""
+        start = f"{int(since * 1000)}-0" if since else "-"
+        entries = await self.client.xrange(f"metrics:spans:{settings.profi_login}", start)
+        return [
+            {
+                "stage": fields["stage"],
+                "seconds": float(fields["seconds"]),
+                "at": float(fields["at"]),
+            }
+            for _, fields in entries
+        ]
 
     async def add_viewed_orders(self, orders: list[Order]) -> None:
-        for order in orders:
-            await self.client.sadd("viewed_orders", order.id)
+        """Отмечает заказы просмотренными одним round trip.
+
+        Просмотренные хранятся в sorted set со временем просмотра, и записи
+        старше viewed_orders_ttl удаляются при каждой записи, так что
+        множество не растет бесконечно.
+        """
+        if not orders:
+            return
+        now = time.time()
+        async with self.client.pipeline(transaction=False) as pipe:
+            pipe.zadd(self._viewed_orders_key, {order.id: now for order in orders})
+            pipe.zremrangebyscore(
+                self._viewed_orders_key, "-inf", now - settings.viewed_orders_ttl
+            )
+            pipe.expire(self._viewed_orders_key, settings.viewed_orders_ttl)
+            await pipe.execute()
+
+    async def import_legacy_viewed_orders(self) -> int:
+        """Один раз переносит заказы из общего множества viewed_orders,
+        которым пользовались до ключей по логинам, в viewed_orders:{login}.
+
+        Без этого после обновления все заказы с доски считались бы новыми и
+        снова проходили бы проверку и отклик. При первом переносе старое
+        множество получает TTL viewed_orders_ttl: к его истечению
+        перенесенные записи устаревают и в новых ключах.
+        """
+        marker = f"viewed_orders_imported:{settings.profi_login}"
+        ttl = settings.viewed_orders_ttl
+        if await self.client.exists(marker):
+            return 0
+        now = time.time()
+        imported = 0
+        batch: dict[str, float] = {}
+        legacy_ids = self.client.sscan_iter(LEGACY_VIEWED_ORDERS_KEY, count=1000)
+        async for order_id in legacy_ids:
+            batch[order_id] = now
+            if len(batch) >= 1000:
+                imported += await self.client.zadd(
+                    self._viewed_orders_key, batch, nx=True
+                )
+                batch = {}
+        if batch:
+            imported += await self.client.zadd(self._viewed_orders_key, batch, nx=True)
+        if imported:
+            await self.client.expire(self._viewed_orders_key, ttl)
+            await self.client.expire(LEGACY_VIEWED_ORDERS_KEY, ttl, nx=True)
+        # Метка ставится после переноса: прерванный перенос повторится
+        await self.client.set(marker, 1, ex=ttl)
+        return imported
 
 
 client = RedisClient()
@@ -0,0 +1,81 @@
+"""Блокировка ресурсов страниц без перехвата запросов.
+
+context.route отключает HTTP-кэш браузера и гоняет каждый запрос через
+Python, поэтому запреты передаются Chromium через CDP
+(Network.setBlockedURLs) при открытии вкладки, а картинки отключаются
+флагом запуска (см. launch_args в src.scraper.browser).
+"""
+
+from urllib.parse import urlsplit
+
+from playwright.async_api import BrowserContext, Page
+
+from core.config import settings
+
+# Расширения файлов по типам ресурсов: CDP блокирует по шаблонам URL,
+# а не по типу запроса
+RESOURCE_EXTENSIONS = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "svg", "ico", "avif"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "media": ("mp4", "webm", "mp3", "ogg", "m4a", "m3u8"),
+}
+
+
+class ResourcePolicy:
+    """Решает, какие запросы страницы не выполнять"""
+
+    def __init__(self, resource_types: list[str], domains: list[str]):
+        self.resource_types = set(resource_types)
+        # Записи вида "host" или "host/path": host совпадает с доменом
+        # запроса или его родителем, path — с началом пути
+        self.domains = [
+            (host, f"/{path}" if path else "")
+            for host, _, path in (domain.partition("/") for domain in domains)
+        ]
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.resource_types or self.domains)
+
+    def should_block(self, resource_type: str, url: str) -> bool:
+        if resource_type in self.resource_types:
+            return True
+        parts = urlsplit(url)
+        hostname = parts.hostname or ""
+        return any(
+            (hostname == host or hostname.endswith(f".{host}"))
+            and parts.path.startswith(path)
+            for host, path in self.domains
+        )
+
+    def blocked_urls(self) -> list[str]:
+        """Шаблоны для Network.setBlockedURLs ("*" — любая подстрока)"""
+        urls = [
+            f"*.{extension}*"
+            for resource_type in sorted(self.resource_types)
+            for extension in RESOURCE_EXTENSIONS.get(resource_type, ())
+        ]
+        for host, path in self.domains:
+            urls += [f"*://{host}{path}*", f"*://*.{host}{path}*"]
+        return urls
+
+    async def apply(self, page: Page) -> None:
+        if not self.enabled:
+            return
+        session = await page.context.new_cdp_session(page)
+        await session.send("Network.enable")
+        await session.send("Network.setBlockedURLs", {"urls": self.blocked_urls()})
+
+
+resource_policy = ResourcePolicy(
+    settings.blocked_resource_types_list, settings.blocked_domains_list
+)
+
+
+async def open_page(
+    context: BrowserContext, policy: ResourcePolicy = resource_policy
+) -> Page:
+    """Новая вкладка контекста с блокировкой ресурсов по policy"""
+    page = await context.new_page()
+    await policy.apply(page)
+    return page
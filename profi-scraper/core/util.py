@@ -1,7 +1,5 @@
-import random
 import json
 import os
-import asyncio
 
 from core.broker import send_message
 from core.config import settings
@@ -48,16 +46,13 @@ def check_input_date(date_str: str) -> bool:
     return input_date >= yesterday
 
 
-async def sleep_random_time():
-    duration = random.randint(settings.page_refresh_min, settings.page_refresh_max)
-    logger.debug(f"Sleeping {duration} seconds")
-    await asyncio.sleep(duration)
+WORDS_PATH = "/app/config/words.json"
 
 
-def _load_words() -> list[str]:
+def _load_words(path: str = WORDS_PATH) -> list[str]:
     try:
-        if os.path.exists("/app/config/words.json"):
-            with open("/app/config/words.json") as f:
+        if os.path.exists(path):
+            with open(path) as f:
                 words = json.load(f)
                 return words if isinstance(words, list) else []
         else:
@@ -1,9 +1,19 @@
 import asyncio
-from src.scraper import Scraper
+import signal
 
+from core.config import settings
+from src.scraper import Scraper, TenantRuntime
 
-scraper = Scraper()
+
+scraper = TenantRuntime() if settings.multi_tenant else Scraper()
+
+
+async def main():
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGTERM, signal.SIGINT):
+        loop.add_signal_handler(sig, lambda: asyncio.create_task(scraper.stop()))
+    await scraper.run()
 
 
 if __name__ == "__main__":
-    asyncio.run(scraper.run())
+    asyncio.run(main())
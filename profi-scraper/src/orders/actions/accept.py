@@ -1,71 +1,82 @@
 import asyncio
+import time
+
 from core.logger import get_logger
+from core.metrics import metrics
 from src.orders.schema import Order
 from core.redis import client
-from src.orders.page import PWPage, with_new_page
+from src.orders.page import PWPage
+from src.orders.pool import PagePool
 from playwright.async_api import BrowserContext
 from core.config import settings
 from core.broker import send_message
 
 logger = get_logger(__name__, settings.log_level)
 
-MAX_CONCURRENT_PAGES = settings.mac_concurrent_pages
-
 
-@with_new_page
 async def _accept_order(page: PWPage, order: Order) -> bool:
-    accepted, reason = await page.accept_order(order.link, order.client_name)
+    with metrics.span("accept_order"):
+        accepted, reason = await page.accept_order(order.link, order.client_name)
     if accepted:
-        await send_message(order.get_message(accepted=accepted))
-    else:
-        await send_message(order.get_message(reason=reason))
+        order_to_accept = time.time() - order.seen_at
+        metrics.observe("order_to_accept", order_to_accept)
+        await client.record_order_latency(order_to_accept)
+    with metrics.span("accept_notify"):
+        if accepted:
+            await send_message(order.get_message(accepted=accepted))
+        else:
+            await send_message(order.get_message(reason=reason))
     return accepted
 
 
-async def _get_orders_to_process(
-    orders: list[Order], response_limit: int
-) -> list[Order]:
-    return orders[:response_limit]
+async def _accept_with_budget(page: PWPage, order: Order) -> bool:
+    """Принимает заказ, если удалось зарезервировать отклик.
+
+    Резерв берется до открытия страницы заказа и подтверждается только
+    при успешном отклике, иначе возвращается в бюджет, поэтому
+    параллельные воркеры и поды одного аккаунта не тратят лишнего.
+    """
+    with metrics.span("redis_reserve"):
+        reservation = await client.try_reserve(1)
+    if reservation is None:
+        return False
+    accepted = False
+    try:
+        accepted = await _accept_order(page, order)
+    finally:
+        with metrics.span("redis_commit"):
+            await client.commit(reservation, used=int(accepted))
+    return accepted
 
 
-async def _process_orders(
-    context: BrowserContext, orders: list[Order], semaphore: asyncio.Semaphore
-) -> int:
-    async def process_order(order: Order) -> bool:
-        async with semaphore:
-            return await _accept_order(context, order)
+def create_accept_pool(context: BrowserContext) -> PagePool:
+    # Настройки читаются при создании: у каждого аккаунта они свои
+    return PagePool(
+        context,
+        _accept_with_budget,
+        size=settings.mac_concurrent_pages,
+        order_timeout=settings.accept_order_timeout,
+        recycle_after=settings.accept_page_recycle_after,
+    )
 
-    tasks = [process_order(order) for order in orders]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
-    return sum(1 for result in results if result is True)
 
+async def accept(pool: PagePool, orders: list[Order]) -> None:
+    if await client.get_response_limit() <= 0:
+        await send_message("Закончились комиссионные отклики")
+        return
+
+    logger.info(f"Processing {len(orders)} orders")
 
-async def _update_and_notify_response_limit(
-    successful_accepts: int, current_limit: int
-) -> None:
-    new_limit = current_limit - successful_accepts
-    await client.update_response_limit(new_limit)
-    logger.info(f"Updated response limit: {new_limit}")
-    await send_message(f"Оставшееся кол-во откликов: {new_limit}")
+    results = await asyncio.gather(
+        *(pool.submit(order) for order in orders), return_exceptions=True
+    )
+    successful_accepts = sum(1 for result in results if result is True)
 
+    await client.save_accept_latency(pool.stats())
 
-async def accept(context: BrowserContext, orders: list[Order]) -> None:
     response_limit = await client.get_response_limit()
+    if successful_accepts:
+        logger.info(f"Accepted {successful_accepts} orders, limit left: {response_limit}")
+        await send_message(f"Оставшееся кол-во откликов: {response_limit}")
     if response_limit <= 0:
         await send_message("Закончились комиссионные отклики")
-        return
-
-    orders_to_process = await _get_orders_to_process(orders, response_limit)
-    logger.info(f"Processing {len(orders_to_process)} orders")
-
-    semaphore = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
-
-    for i in range(0, len(orders_to_process), MAX_CONCURRENT_PAGES):
-        batch = orders_to_process[i : i + MAX_CONCURRENT_PAGES]
-        logger.info(f"Processing batch of {len(batch)} orders")
-        successful_accepts = await _process_orders(context, batch, semaphore)
-        await _update_and_notify_response_limit(successful_accepts, response_limit)
-        response_limit -= successful_accepts
-        if response_limit <= 0:
-            await send_message("Закончились комиссионные отклики")
-            break
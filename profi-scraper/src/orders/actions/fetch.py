@@ -2,41 +2,65 @@ from playwright.async_api import Page
 
 from core.config import settings
 from core.logger import get_logger
+from core.metrics import metrics
 from core.broker import send_messages, send_message
 from core.redis import client
+from src.orders.feed import OrderFeed
 from src.orders.schema import Order
 from src.orders.services import is_valid_order
 from src.orders.page import PWPage
+from src.orders.selector import BoardDiffer
 
 logger = get_logger(__name__, settings.log_level)
 
 
-async def process_orders(page: Page):
-    page = PWPage(page)
+async def process_orders(
+    page: Page,
+    feed: OrderFeed | None = None,
+    refresh_html: bool = True,
+    differ: BoardDiffer | None = None,
+):
+    """Получает новые заказы с доски.
 
-    orders = await page.get_orders()
-    unviewed_messages = await page.get_unviewed_messages()
-    if unviewed_messages:
-        logger.info(f"{settings.profi_login}: {unviewed_messages} unviewed messages")
-        await send_message(f"🔔 У вас есть непрочитанные сообщения: {unviewed_messages}")
+    Если лента перехвачена и перезагрузка не требуется, заказы берутся из
+    JSON-ленты; иначе доска перезагружается и разбирается HTML (при этом
+    лента перехватывается заново). С differ дальше идут только заказы,
+    которых не было в прошлом опросе.
+    """
+    orders = None
+    if feed is not None and not refresh_html:
+        with metrics.span("feed_fetch"):
+            orders = await feed.fetch(page.context)
+        if orders is not None and differ is not None:
+            orders = differ.only_new(orders)
+
+    if orders is None:
+        board = await PWPage(page).get_board(differ)
+        orders = board.orders
+        if board.unviewed_messages:
+            logger.info(f"{settings.profi_login}: {board.unviewed_messages} unviewed messages")
+            await send_message(f"🔔 У вас есть непрочитанные сообщения: {board.unviewed_messages}")
     validated_orders = await _validate_orders(orders)
 
-    await client.add_viewed_orders(validated_orders)
+    with metrics.span("redis_mark_viewed"):
+        await client.add_viewed_orders(validated_orders)
 
     return validated_orders
 
 
 async def _validate_orders(orders: list[Order]):
     if not orders:
-        logger.info(f"{settings.profi_login}: No containers found")
+        logger.info(f"{settings.profi_login}: No new orders")
         return []
 
-    viewed_orders = await client.get_viewed_orders()
+    with metrics.span("redis_viewed"):
+        viewed_orders = await client.get_viewed_orders([order.id for order in orders])
 
-    valid_orders = [
-        order
-        for order in orders
-        if await is_valid_order(order) and order.id not in viewed_orders
-    ]
+    with metrics.span("validate"):
+        valid_orders = [
+            order
+            for order in orders
+            if await is_valid_order(order) and order.id not in viewed_orders
+        ]
 
     return valid_orders
@@ -1,22 +1,28 @@
 from playwright.async_api import BrowserContext, Page
 from core.config import settings
+from core.logger import get_logger
 from core.redis import client
-from src.orders.page import PWPage, BACKOFFICE_URL, with_new_page
+from core.resources import open_page
+from src.orders.page import PWPage, with_new_page
 
+logger = get_logger(__name__, settings.log_level)
 
-async def login(context: BrowserContext) -> Page:
-    await _login(context)
-    await _get_response_limit(context)
 
-    order_page = await context.new_page()
-    await order_page.goto(BACKOFFICE_URL)
+async def login(context: BrowserContext) -> Page:
+    """Открывает доску заказов; логинится через форму, только если
+    восстановленная из Redis сессия не подошла"""
+    order_page = PWPage(await open_page(context))
 
-    return order_page
+    if await order_page.is_logged_in():
+        logger.info(f"{settings.profi_login}: session restored")
+    else:
+        await client.delete_storage_state()
+        await order_page.login()
+        await client.save_storage_state(await context.storage_state())
 
+    await _get_response_limit(context)
 
-@with_new_page
-async def _login(page: PWPage) -> None:
-    await page.login()
+    return order_page.page
 
 
 @with_new_page
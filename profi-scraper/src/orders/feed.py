@@ -0,0 +1,141 @@
+import json
+import re
+
+import playwright.async_api
+from playwright.async_api import BrowserContext, Page, Response
+
+from core.config import settings
+from core.logger import get_logger
+from src.orders.schema import Order, order_id_from_link
+
+PROFI_URL = "https://profi.ru"
+
+# Ключи, под которыми лента доски может отдавать список заказов
+FEED_ORDER_KEYS = ("orders", "items", "snippets", "data", "result")
+
+# Заголовки, которые APIRequestContext выставляет сам (куки берутся из контекста)
+SKIPPED_HEADERS = {"cookie", "content-length", "host", "accept-encoding"}
+
+
+def _find_order_items(payload) -> list[dict] | None:
+    if isinstance(payload, list):
+        if payload and all(isinstance(item, dict) for item in payload):
+            return payload
+        return None
+    if isinstance(payload, dict):
+        for key in FEED_ORDER_KEYS:
+            if key in payload:
+                items = _find_order_items(payload[key])
+                if items is not None:
+                    return items
+    return None
+
+
+def _order_from_item(item: dict) -> Order | None:
+    link = item.get("url") or item.get("link")
+    if not isinstance(link, str):
+        return None
+    # Только ссылки на карточку заказа: по ним id совпадает с HTML-доской
+    order_id = order_id_from_link(link)
+    if order_id is None:
+        return None
+    if link.startswith("/"):
+        link = f"{PROFI_URL}{link}"
+
+    client = item.get("client")
+    client_name = client.get("name", "") if isinstance(client, dict) else ""
+
+    return Order(
+        id=str(order_id),
+        link=link,
+        subject=item.get("subject") or "Без темы",
+        description=item.get("description") or "Без описания",
+        price=item.get("price") or "Цена не указана",
+        time_info=item.get("date") or item.get("time_info") or "Время не указано",
+        client_name=item.get("client_name") or client_name,
+    )
+
+
+def parse_feed(payload) -> list[Order] | None:
+    """Заказы из JSON ленты доски или None, если формат не распознан"""
+    items = _find_order_items(payload)
+    if items is None:
+        return None
+    orders = [_order_from_item(item) for item in items]
+    orders = [order for order in orders if order is not None]
+    if items and not orders:
+        return None
+    return orders
+
+
+class OrderFeed:
+    """Опрос доски через ее XHR-ленту вместо перезагрузки страницы.
+
+    При перезагрузке доски перехватывает первый JSON-ответ, URL которого
+    подходит под settings.orders_feed_pattern и из которого разбираются
+    заказы, и запоминает запрос. Дальше лента запрашивается напрямую
+    через APIRequestContext с куками контекста, без рендера и разбора DOM.
+    Если запрос или разбор не удался, лента сбрасывается, и вызывающий
+    код возвращается к HTML.
+    """
+
+    def __init__(self):
+        self.pattern = re.compile(settings.orders_feed_pattern)
+        self.logger = get_logger(__name__, settings.log_level)
+        self._request: dict | None = None
+
+    @property
+    def captured(self) -> bool:
+        return self._request is not None
+
+    def attach(self, page: Page) -> None:
+        page.on("response", self._on_response)
+
+    def reset(self) -> None:
+        self._request = None
+
+    async def _on_response(self, response: Response) -> None:
+        if self.captured or not self.pattern.search(response.url):
+            return
+        if "json" not in response.headers.get("content-type", ""):
+            return
+        try:
+            payload = await response.json()
+        except Exception:
+            return
+        if parse_feed(payload) is None:
+            return
+
+        request = response.request
+        self._request = {
+            "url": request.url,
+            "method": request.method,
+            "headers": {
+                name: value
+                for name, value in request.headers.items()
+                if name.lower() not in SKIPPED_HEADERS
+            },
+            "data": request.post_data,
+        }
+        self.logger.info(f"Orders feed captured: {request.method} {request.url}")
+
+    async def fetch(self, context: BrowserContext) -> list[Order] | None:
+        if not self.captured:
+            return None
+        try:
+            response = await context.request.fetch(
+                self._request["url"],
+                method=self._request["method"],
+                headers=self._request["headers"],
+                data=self._request["data"],
+            )
+            if not response.ok:
+                raise ValueError(f"feed returned {response.status}")
+            orders = parse_feed(json.loads(await response.body()))
+            if orders is None:
+                raise ValueError("unknown feed format")
+            return orders
+        except (playwright.async_api.Error, ValueError) as e:
+            self.logger.warning(f"Orders feed failed, falling back to HTML: {e}")
+            self.reset()
+            return None
@@ -3,8 +3,10 @@ from playwright.async_api import Page
 
 from core.config import settings
 from core.logger import get_logger
+from core.metrics import metrics
+from core.resources import open_page
 from core.util import check_input_date
-from .selector import Selector
+from .selector import BoardDiffer, BoardSnapshot, Selector, parse_board
 from functools import wraps
 from playwright.async_api import BrowserContext
 from typing import Callable, TypeVar, Any
@@ -44,6 +46,19 @@ class PWPage:
             self.logger.error(f"Unexpected error during login: {str(e)}")
             raise
 
+    async def is_logged_in(self) -> bool:
+        """Открывает доску заказов и проверяет, что сессия еще действует"""
+        self.logger.debug("Probing session on backoffice")
+        try:
+            await self.page.goto(BACKOFFICE_URL, wait_until="commit")
+            await self.page.wait_for_selector(
+                "#BOARD_GRID_CONTAINER_ID, .login-form__input-login"
+            )
+            return await self.page.locator("#BOARD_GRID_CONTAINER_ID").count() > 0
+        except playwright.async_api.TimeoutError:
+            self.logger.warning("Timeout while probing session")
+            return False
+
     async def update_response_limit(self) -> int:
         self.logger.info("Fetching response limit page content")
         html = await self.get_response_limit_page_content()
@@ -61,21 +76,26 @@ class PWPage:
         reason = ""
         try:
             self.logger.debug(f"Navigating to order URL: {order_url}")
-            await self.page.goto(order_url, wait_until="commit")
-
-            opened = await self._click_open_order_popup()
+            with metrics.span("accept_open"):
+                await self.page.goto(order_url, wait_until="commit")
+                opened = await self._click_open_order_popup()
 
             if opened:
                 self.logger.debug("Order popup opened, waiting for order details")
-                await self._wait_order_details_page()
-                if await self.validate_client():
+                with metrics.span("accept_details"):
+                    await self._wait_order_details_page()
+                with metrics.span("accept_validate_client"):
+                    client_valid = await self.validate_client()
+                if client_valid:
                     self.logger.debug("Client validated, filling order details")
                     accept_text = settings.accept_text.replace("__name__", client_name)
                     self.logger.debug(f"Accept text: {accept_text}")
-                    await self._fill_order_details_text(accept_text)
-                    await self._fill_price_details_text(settings.accept_price)
+                    with metrics.span("accept_fill"):
+                        await self._fill_order_details_text(accept_text)
+                        await self._fill_price_details_text(settings.accept_price)
                     self.logger.debug("Attempting to accept order")
-                    accepted = await self._click_accept_order()
+                    with metrics.span("accept_click"):
+                        accepted = await self._click_accept_order()
                     if accepted:
                         self.logger.info("Order accepted successfully")
                     else:
@@ -205,17 +225,19 @@ class PWPage:
             self.logger.error(f"Error waiting for order details page: {str(e)}")
             raise
 
-    async def get_orders(self):
-        await self.page.reload(timeout=1 * 60000, wait_until="commit")
-        await self._wait_orders_in_page()
-        html = await self.page.content()
-        selector = Selector(html)
-        return selector.get_orders()
+    async def get_board(self, differ: BoardDiffer | None = None) -> BoardSnapshot:
+        """Перезагружает доску; с differ в снимке только новые заказы"""
+        with metrics.span("board_reload"):
+            await self.page.reload(timeout=1 * 60000, wait_until="commit")
+            await self._wait_orders_in_page()
+        with metrics.span("board_content"):
+            html = await self.page.content()
+        with metrics.span("board_parse"):
+            return differ.diff(html) if differ is not None else parse_board(html)
 
-    async def get_unviewed_messages(self) -> int | None:
-        html = await self.page.content()
-        selector = Selector(html)
-        return selector.unviewed_messages
+    async def get_orders(self):
+        board = await self.get_board()
+        return board.orders
 
     async def _wait_orders_in_page(self):
         self.logger.debug("Waiting for orders in page")
@@ -233,7 +255,7 @@ class PWPage:
 def with_new_page(func: Callable[..., T]) -> Callable[..., T]:
     @wraps(func)
     async def wrapper(context: BrowserContext, *args: Any, **kwargs: Any) -> T:
-        page = PWPage(await context.new_page())
+        page = PWPage(await open_page(context))
         try:
             result = await func(page, *args, **kwargs)
             return result
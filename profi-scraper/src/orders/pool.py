@@ -0,0 +1,133 @@
+import asyncio
+from typing import Awaitable, Callable
+
+from playwright.async_api import BrowserContext
+
+from core.config import settings
+from core.logger import get_logger
+from core.metrics import LatencyHistogram
+from core.resources import open_page
+from src.orders.page import PWPage
+from src.orders.schema import Order
+
+# Границы корзин гистограммы длительности обработки заказа, секунды
+LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 20, 30, 60, 120)
+
+
+class PagePool:
+    """Пул из size постоянных вкладок, разбирающих заказы из общей очереди.
+
+    Каждый воркер держит свою открытую вкладку и берет следующий заказ,
+    как только освободится, так что медленный заказ не задерживает
+    остальных. Заказ ограничен order_timeout; после таймаута или
+    recycle_after заказов вкладка закрывается и открывается заново.
+    """
+
+    def __init__(
+        self,
+        context: BrowserContext,
+        handler: Callable[[PWPage, Order], Awaitable[bool]],
+        size: int = settings.mac_concurrent_pages,
+        order_timeout: float = settings.accept_order_timeout,
+        recycle_after: int = settings.accept_page_recycle_after,
+    ):
+        self.context = context
+        self.handler = handler
+        self.size = size
+        self.order_timeout = order_timeout
+        self.recycle_after = recycle_after
+        self.logger = get_logger(__name__, settings.log_level)
+        self.histograms = {
+            f"worker-{index}": LatencyHistogram(LATENCY_BUCKETS)
+            for index in range(size)
+        }
+        self._queue: asyncio.Queue[tuple[Order, asyncio.Future]] = asyncio.Queue()
+        self._workers: list[asyncio.Task] = []
+        # submit вызывается для всей пачки заказов сразу: без блокировки
+        # каждый вызов открыл бы свой набор вкладок
+        self._lock = asyncio.Lock()
+
+    async def start(self) -> None:
+        async with self._lock:
+            if self._workers:
+                return
+            pages = [PWPage(await open_page(self.context)) for _ in range(self.size)]
+            self._workers = [
+                self._spawn(name, page) for name, page in zip(self.histograms, pages)
+            ]
+
+    def _spawn(self, name: str, page: PWPage | None) -> asyncio.Task:
+        task = asyncio.create_task(self._work(name, page))
+        task.add_done_callback(lambda done: self._restart(name, done))
+        return task
+
+    def _restart(self, name: str, task: asyncio.Task) -> None:
+        """Заменяет упавший воркер новым, чтобы пул не терял вкладки"""
+        if task.cancelled() or task not in self._workers:
+            return
+        self.logger.error(f"{name}: worker crashed: {task.exception()}, restarting")
+        self._workers[self._workers.index(task)] = self._spawn(name, None)
+
+    async def submit(self, order: Order) -> bool:
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((order, future))
+        return await future
+
+    async def _work(self, name: str, page: PWPage | None) -> None:
+        histogram = self.histograms[name]
+        uses = 0
+        try:
+            while True:
+                order, future = await self._queue.get()
+                started = asyncio.get_running_loop().time()
+                recycle = False
+                try:
+                    # Заказ уже взят из очереди: ошибка открытия вкладки
+                    # должна дойти до submit, а не завершить воркер
+                    if page is None:
+                        page = PWPage(await open_page(self.context))
+                        uses = 0
+                    result = await asyncio.wait_for(
+                        self.handler(page, order), self.order_timeout
+                    )
+                    if not future.done():
+                        future.set_result(result)
+                except asyncio.TimeoutError:
+                    self.logger.warning(f"{name}: order {order.id} timed out")
+                    recycle = True
+                    if not future.done():
+                        future.set_result(False)
+                except Exception as e:
+                    recycle = True
+                    if not future.done():
+                        future.set_exception(e)
+                finally:
+                    histogram.observe(asyncio.get_running_loop().time() - started)
+                    self._queue.task_done()
+
+                uses += 1
+                if page is not None and (recycle or uses >= self.recycle_after):
+                    await self._close_page(page)
+                    page = None
+        finally:
+            if page is not None:
+                await self._close_page(page)
+
+    async def _close_page(self, page: PWPage) -> None:
+        try:
+            await page.page.close()
+        except Exception as e:
+            self.logger.debug(f"Failed to close page: {e}")
+
+    def stats(self) -> dict:
+        return {
+            name: histogram.snapshot() for name, histogram in self.histograms.items()
+        }
+
+    async def close(self) -> None:
+        async with self._lock:
+            for task in self._workers:
+                task.cancel()
+            await asyncio.gather(*self._workers, return_exceptions=True)
+            self._workers = []
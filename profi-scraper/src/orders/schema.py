@@ -1,5 +1,18 @@
+import time
+from urllib.parse import parse_qs, urlsplit
+
 from core.config import settings
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+
+
+def order_id_from_link(link: str) -> str | None:
+    """Номер заказа из параметра o ссылки (/backoffice/n.php?o=...).
+
+    HTML-доска и JSON-лента берут id отсюда, чтобы просмотренные заказы
+    совпадали между ними.
+    """
+    values = parse_qs(urlsplit(link).query).get("o")
+    return values[0] if values and values[0] else None
 
 
 @dataclass
@@ -11,6 +24,8 @@ class Order:
     price: str = ""
     time_info: str = ""
     client_name: str = ""
+    # Когда заказ впервые попал в разбор доски (для задержки до отклика)
+    seen_at: float = field(default_factory=time.time, compare=False, repr=False)
 
     def get_message(self, accepted: bool = False, reason: str = None):
         message = str(self)
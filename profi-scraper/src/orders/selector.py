@@ -1,107 +1,286 @@
-from bs4 import BeautifulSoup
-from src.orders.schema import Order
+import hashlib
+from collections import OrderedDict
+from dataclasses import dataclass, field
 
+from core.config import settings
+from core.logger import get_logger
+from src.orders.schema import Order, order_id_from_link
+
+CONTAINER = ".OrderSnippetContainerStyles__Container-sc-1qf4h1o-0"
+ORDER_LINK = 'a[class*="SnippetBodyStyles__Container-sc-tnih0-2"]'
+SUBJECT = ".SubjectAndPriceStyles__SubjectsText-sc-18v5hu8-1"
+DESCRIPTION = ".SnippetBodyStyles__MainInfo-sc-tnih0-6"
+PRICE = ".SubjectAndPriceStyles__PriceValue-sc-18v5hu8-5"
+TIME_INFO = ".Date__DateText-sc-e1f8oi-1"
+CLIENT_NAME = ".StatusAndClientInfoStyles__Name-sc-xp6j2r-9.ihShvN"
+RESPONSE_LIMIT = ".Message__ResponseLimit-sc-1njfbi7-9"
+UNVIEWED_BADGE = "div.global-badge.NavigationBarStyles__NavigationBarBadge-sc-qnnk0q-4.WYxvL"
+CLIENT_SUMMARY = ".ClientSummaryBlock__Text-sc-17uaovi-2"
+CLIENT_SUMMARY_DESCRIPTION = ".ClientSummaryBlock__Description-sc-17uaovi-4"
+REVIEW_ITEM = "div.styled__Container-sc-s63p74-0.fBVcag.Reviews__ReviewItem-sc-z9lvv3-2.hfuzQq"
+
+logger = get_logger(__name__, settings.log_level)
+
+
+class _SoupBackend:
+    """BeautifulSoup с html.parser — медленный, но без дополнительных зависимостей"""
+
+    def __init__(self, html: str):
+        from bs4 import BeautifulSoup
+
+        self.root = BeautifulSoup(html, "html.parser")
+
+    def select(self, node, css: str) -> list:
+        return node.select(css)
+
+    def select_one(self, node, css: str):
+        return node.select_one(css)
+
+    def text(self, node) -> str:
+        return node.get_text()
+
+    def attr(self, node, name: str) -> str | None:
+        return node.get(name)
+
+
+class _SelectolaxBackend:
+    """selectolax (Lexbor) — разбор и CSS-селекторы на C"""
 
-class Selector:
     def __init__(self, html: str):
-        self.soup: BeautifulSoup = BeautifulSoup(html, "html.parser")
+        from selectolax.lexbor import LexborHTMLParser
+
+        self.root = LexborHTMLParser(html)
+
+    def select(self, node, css: str) -> list:
+        return node.css(css)
+
+    def select_one(self, node, css: str):
+        return node.css_first(css)
+
+    def text(self, node) -> str:
+        return node.text()
+
+    def attr(self, node, name: str) -> str | None:
+        return node.attributes.get(name)
+
+
+class _LxmlBackend:
+    """lxml.html с cssselect"""
+
+    def __init__(self, html: str):
+        import lxml.html
+
+        self.root = lxml.html.fromstring(html)
+
+    def select(self, node, css: str) -> list:
+        return node.cssselect(css)
+
+    def select_one(self, node, css: str):
+        found = node.cssselect(css)
+        return found[0] if found else None
+
+    def text(self, node) -> str:
+        return node.text_content()
+
+    def attr(self, node, name: str) -> str | None:
+        return node.get(name)
+
+
+BACKENDS = {
+    "html.parser": _SoupBackend,
+    "selectolax": _SelectolaxBackend,
+    "lxml": _LxmlBackend,
+}
+
+
+@dataclass
+class BoardSnapshot:
+    orders: list[Order] = field(default_factory=list)
+    unviewed_messages: int | None = None
+    response_limit: int = 0
+
+
+class Selector:
+    def __init__(self, html: str, backend: str | None = None):
+        self.backend = BACKENDS[backend or settings.html_parser](html)
+        self.root = self.backend.root
 
     def _safe_text(self, element, default=""):
         """Безопасно извлекает текст из элемента"""
         if element is None:
             return default
-        return element.text.strip() if element.text else default
+        text = self.backend.text(element)
+        return text.strip() if text else default
+
+    def _select_text(self, node, css: str, default=""):
+        return self._safe_text(self.backend.select_one(node, css), default)
 
     @property
     def containers(self):
-        return self.soup.select(".OrderSnippetContainerStyles__Container-sc-1qf4h1o-0")
+        return self.backend.select(self.root, CONTAINER)
 
     @property
     def response_limit(self) -> int:
-        element = self.soup.select_one(".Message__ResponseLimit-sc-1njfbi7-9")
-        return int(element.text.strip()) if element else 0
+        element = self.backend.select_one(self.root, RESPONSE_LIMIT)
+        return int(self._safe_text(element)) if element is not None else 0
 
     @property
     def order_user_info(self) -> dict:
-        title_block = self.soup.select_one("span:-soup-contains('На Профи.ру')")
         created_at = None
 
-        if title_block:
-            parent = title_block.find_parent(
-                class_="ClientSummaryBlock__Text-sc-17uaovi-2"
-            )
-            if parent:
-                date_span = parent.select_one(
-                    ".ClientSummaryBlock__Description-sc-17uaovi-4"
-                )
-                if date_span:
-                    created_at = date_span.text.strip()
-
-        reviews = self.soup.select(
-            "div.styled__Container-sc-s63p74-0.fBVcag.Reviews__ReviewItem-sc-z9lvv3-2.hfuzQq"
-        )
+        for block in self.backend.select(self.root, CLIENT_SUMMARY):
+            if "На Профи.ру" not in self.backend.text(block):
+                continue
+            date_span = self.backend.select_one(block, CLIENT_SUMMARY_DESCRIPTION)
+            if date_span is not None:
+                created_at = self._safe_text(date_span)
+                break
+
+        reviews = self.backend.select(self.root, REVIEW_ITEM)
 
         return dict(created_at=created_at, reviews=len(reviews))
 
     @property
     def unviewed_messages(self) -> int | None:
-        message_count = self.soup.select_one("div.global-badge.NavigationBarStyles__NavigationBarBadge-sc-qnnk0q-4.WYxvL")
-        if message_count:
-            int_message_count = int(message_count.text)
+        message_count = self.backend.select_one(self.root, UNVIEWED_BADGE)
+        if message_count is not None:
+            int_message_count = int(self._safe_text(message_count))
             return int_message_count if int_message_count > 0 else None
         return None
 
+    def _order_link(self, container):
+        # Безопасно извлекаем href
+        href_element = self.backend.select_one(container, ORDER_LINK)
+        if href_element is None or not self.backend.attr(href_element, "href"):
+            return None
+        return href_element
+
+    def _order_id(self, href_element) -> str:
+        # Как в JSON-ленте: из ссылки, атрибут id — только запасной вариант
+        href = self.backend.attr(href_element, "href")
+        return order_id_from_link(href) or self.backend.attr(href_element, "id") or ""
+
+    def _order(self, container, href_element=None) -> Order | None:
+        if href_element is None:
+            href_element = self._order_link(container)
+            if href_element is None:
+                return None
+        href = self.backend.attr(href_element, "href")
+
+        return Order(
+            id=self._order_id(href_element),
+            link=f"https://profi.ru{href}",
+            subject=self._select_text(container, SUBJECT, "Без темы"),
+            description=self._select_text(container, DESCRIPTION, "Без описания"),
+            price=self._select_text(container, PRICE, "Цена не указана"),
+            time_info=self._select_text(container, TIME_INFO, "Время не указано"),
+            client_name=self._select_text(container, CLIENT_NAME),
+        )
+
     def get_orders(self) -> list[Order]:
         orders = list()
         for container in self.containers:
             try:
-                # Безопасно извлекаем href
-                href_element = container.select_one('a[class*="SnippetBodyStyles__Container-sc-tnih0-2"]')
-                if not href_element or not href_element.get("href"):
-                    continue
-                
-                href = href_element["href"]
-                
-                order_id = href_element.get("id", "")
-                
-                subject = self._safe_text(
-                    container.select_one(".SubjectAndPriceStyles__SubjectsText-sc-18v5hu8-1"),
-                    "Без темы"
-                )
-                
-                description = self._safe_text(
-                    container.select_one(".SnippetBodyStyles__MainInfo-sc-tnih0-6"),
-                    "Без описания"
-                )
-                
-                price = self._safe_text(
-                    container.select_one(".SubjectAndPriceStyles__PriceValue-sc-18v5hu8-5"),
-                    "Цена не указана"
-                )
-                
-                time_info = self._safe_text(
-                    container.select_one(".Date__DateText-sc-e1f8oi-1"),
-                    "Время не указано"
-                )
-
-                client_name = self._safe_text(
-                    container.select_one(".StatusAndClientInfoStyles__Name-sc-xp6j2r-9.ihShvN")
-                )
-                
-                order = Order(
-                    id=order_id,
-                    link=f"https://profi.ru{href}",
-                    subject=subject,
-                    description=description,
-                    price=price,
-                    time_info=time_info,
-                    client_name=client_name
-                )
-                orders.append(order)
-                
+                order = self._order(container)
+                if order is not None:
+                    orders.append(order)
             except Exception as e:
                 # Логируем ошибку и продолжаем
-                print(f"Ошибка при обработке заказа: {e}")
+                logger.warning(f"Ошибка при обработке заказа: {e}")
                 continue
-                
+
         return orders
+
+    def get_new_orders(self, known_ids: set[str]) -> tuple[list[Order], set[str]]:
+        """Заказы, id которых нет в known_ids, и id всех карточек доски.
+
+        У известных карточек читается только ссылка, остальные поля не
+        извлекаются.
+        """
+        orders = list()
+        ids = set()
+        for container in self.containers:
+            try:
+                href_element = self._order_link(container)
+                if href_element is None:
+                    continue
+                order_id = self._order_id(href_element)
+                ids.add(order_id)
+                if order_id not in known_ids:
+                    orders.append(self._order(container, href_element))
+            except Exception as e:
+                logger.warning(f"Ошибка при обработке заказа: {e}")
+                continue
+
+        return orders, ids
+
+    def extract(self) -> BoardSnapshot:
+        """Заказы, счетчик сообщений и лимит откликов из одного разбора"""
+        return BoardSnapshot(
+            orders=self.get_orders(),
+            unviewed_messages=self.unviewed_messages,
+            response_limit=self.response_limit,
+        )
+
+
+# Последние разобранные страницы: доска часто не меняется между опросами
+_board_cache: OrderedDict[bytes, BoardSnapshot] = OrderedDict()
+
+
+def parse_board(html: str) -> BoardSnapshot:
+    """Разбирает доску, повторно используя результат для того же HTML"""
+    key = hashlib.blake2b(html.encode(), digest_size=16).digest()
+    snapshot = _board_cache.get(key)
+    if snapshot is None:
+        snapshot = Selector(html).extract()
+        _board_cache[key] = snapshot
+        if len(_board_cache) > settings.board_cache_size:
+            _board_cache.popitem(last=False)
+    else:
+        _board_cache.move_to_end(key)
+    return BoardSnapshot(
+        orders=list(snapshot.orders),
+        unviewed_messages=snapshot.unviewed_messages,
+        response_limit=snapshot.response_limit,
+    )
+
+
+class BoardDiffer:
+    """Отдает только заказы, которых не было на доске в прошлом опросе.
+
+    Помнит id карточек прошлого опроса и хеш его HTML: если страница не
+    изменилась, она не разбирается вовсе, иначе полностью извлекаются
+    только карточки с новыми id. Хранит одну доску, поэтому у каждого
+    аккаунта свой экземпляр.
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self._key: bytes | None = None
+        self._ids: set[str] = set()
+        self._unviewed_messages: int | None = None
+        self._response_limit = 0
+
+    def diff(self, html: str) -> BoardSnapshot:
+        key = hashlib.blake2b(html.encode(), digest_size=16).digest()
+        if key != self._key:
+            selector = Selector(html)
+            orders, self._ids = selector.get_new_orders(self._ids)
+            self._key = key
+            self._unviewed_messages = selector.unviewed_messages
+            self._response_limit = selector.response_limit
+        else:
+            orders = []
+        return BoardSnapshot(
+            orders=orders,
+            unviewed_messages=self._unviewed_messages,
+            response_limit=self._response_limit,
+        )
+
+    def only_new(self, orders: list[Order]) -> list[Order]:
+        """То же для заказов из JSON-ленты, уже разобранных целиком"""
+        known_ids = self._ids
+        self._ids = {order.id for order in orders}
+        return [order for order in orders if order.id not in known_ids]
@@ -1,17 +1,115 @@
+import os
+import re
+from contextvars import ContextVar
+
+from core.config import settings
 from src.orders.schema import Order
-from core.util import _load_words
+from core.util import WORDS_PATH, _load_words
+
+# Окончания, которые отбрасываются у стоп-слов: поиск идет по вхождению,
+# поэтому основа «немецк» находит и «немецкий», и «немецкого»
+RUSSIAN_ENDINGS = sorted(
+    "ого его ому ему ыми ими ами ями ый ий ой ая яя ое ее ые ие ых их "
+    "ов ев ах ях ом ем ам ям ую юю а я ы и у ю е о ь".split(),
+    key=len,
+    reverse=True,
+)
+MIN_STEM_LENGTH = 4
+
+
+def normalize_text(text: str) -> str:
+    return text.casefold().replace("ё", "е")
+
+
+def stem_word(word: str) -> str:
+    """Отбрасывает окончание, если основа остается не короче MIN_STEM_LENGTH"""
+    for ending in RUSSIAN_ENDINGS:
+        if word.endswith(ending) and len(word) - len(ending) >= MIN_STEM_LENGTH:
+            return word[: -len(ending)]
+    return word
+
+
+def _trie_pattern(words: list[str]) -> str:
+    """Регулярное выражение по префиксному дереву слов.
+
+    Альтернативы с общим префиксом сливаются, поэтому в каждой позиции
+    текста проверяется не больше символов, чем в самом длинном слове,
+    независимо от размера списка. Если одно слово — префикс другого,
+    остается короткое: для поиска вхождения длинное уже не нужно.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = True
+
+    def build(node: dict) -> str:
+        if "" in node:
+            return ""
+        branches = [
+            re.escape(char) + build(child) for char, child in sorted(node.items())
+        ]
+        if len(branches) == 1:
+            return branches[0]
+        return "(?:" + "|".join(branches) + ")"
+
+    return build(trie)
+
+
+class StopWords:
+    """Стоп-слова из words.json, скомпилированные в одно выражение.
+
+    Файл перечитывается, только когда меняется его mtime. Если слова
+    переданы списком (конфиг аккаунта), файл не читается.
+    """
+
+    def __init__(self, path: str = WORDS_PATH, words: list[str] | None = None):
+        self.path = path
+        self.words = words
+        self._mtime: float | None = None
+        self._pattern: re.Pattern | None = None
+
+    def _current_mtime(self) -> float | None:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def matcher(self) -> re.Pattern | None:
+        # Список из конфига не меняется: компилируется при первом вызове
+        mtime = self._current_mtime() if self.words is None else 0.0
+        if mtime != self._mtime:
+            self._mtime = mtime
+            source = self.words if self.words is not None else _load_words(self.path)
+            words = {normalize_text(str(word)).strip() for word in source}
+            if settings.stop_words_stemming:
+                words = {stem_word(word) for word in words}
+            words.discard("")
+            self._pattern = re.compile(_trie_pattern(sorted(words))) if words else None
+        return self._pattern
+
+
+stop_words = StopWords()
+
+_current_stop_words: ContextVar[StopWords | None] = ContextVar(
+    "current_stop_words", default=None
+)
+
+
+def use_stop_words(words: StopWords) -> None:
+    """Стоп-слова аккаунта для текущей задачи и ее потомков"""
+    _current_stop_words.set(words)
 
 
 async def is_valid_order(order: Order):
-    words = _load_words()
-    
-    if not words:
+    matcher = (_current_stop_words.get() or stop_words).matcher()
+
+    if matcher is None:
         return True
-        
-    if any(bad_word.lower() in order.subject.lower() for bad_word in words):
+
+    if matcher.search(normalize_text(order.subject)):
         return False
-    if any(
-            bad_word.lower() in order.description.lower() for bad_word in words
-    ):
+    if matcher.search(normalize_text(order.description)):
         return False
     return True
@@ -1 +1,2 @@
 from .scraper import Scraper
+from .tenants import TenantRuntime
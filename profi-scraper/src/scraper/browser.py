@@ -1,17 +1,80 @@
-from playwright.async_api import Playwright, Browser as PlaywrightBrowser
+from playwright.async_api import (
+    Browser as PlaywrightBrowser,
+    BrowserContext,
+    Playwright,
+)
 
 from core.config import settings
+from core.logger import get_logger
+from core.redis import client
+from core.resources import ResourcePolicy, resource_policy
+
+logger = get_logger(__name__, settings.log_level)
+
+# Флаги для подов с 1 CPU и 1Gi: без GPU, фоновых сервисов и /dev/shm
+CHROMIUM_ARGS = [
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--metrics-recording-only",
+    "--mute-audio",
+    "--no-first-run",
+]
+
+
+def launch_args(policy: ResourcePolicy = resource_policy) -> list[str]:
+    """CHROMIUM_ARGS и отключение картинок, если они блокируются: так
+    их не запрашивают и CSS-фоны без расширения в URL"""
+    if "image" in policy.resource_types:
+        return [*CHROMIUM_ARGS, "--blink-settings=imagesEnabled=false"]
+    return CHROMIUM_ARGS
+
+
+def _proxy() -> dict | None:
+    if not settings.proxy_host:
+        return None
+    return {
+        "server": f"http://{settings.proxy_host}:{settings.proxy_port}",
+        "username": settings.proxy_user,
+        "password": settings.proxy_password,
+    }
 
 
 async def launch_browser(playwright: Playwright) -> PlaywrightBrowser:
-    proxy = None
-    if settings.proxy_host:
-        proxy = {
-            "server": f"http://{settings.proxy_host}:{settings.proxy_port}",
-            "username": settings.proxy_user,
-            "password": settings.proxy_password,
-        }
     return await playwright.chromium.launch(
         headless=settings.headless,
-        proxy=proxy,
+        proxy=_proxy(),
+        args=launch_args(),
     )
+
+
+async def new_context(browser: PlaywrightBrowser) -> BrowserContext:
+    """Новый контекст с куками последней сохраненной сессии, если она есть,
+    и уменьшенным окном. Ресурсы блокируются при открытии вкладок
+    (core.resources.open_page).
+
+    Прокси задается и на контекст: в мультиаккаунтном режиме у аккаунтов
+    одного браузера он может быть разным.
+    """
+    storage_state = await client.get_storage_state()
+    context = await browser.new_context(
+        storage_state=storage_state,
+        proxy=_proxy(),
+        viewport={"width": settings.viewport_width, "height": settings.viewport_height},
+        record_har_path=settings.har_record_path,
+    )
+    return context
+
+
+async def close_context(context: BrowserContext) -> None:
+    try:
+        # Куки могли обновиться, сохраняем их перед закрытием
+        await client.save_storage_state(await context.storage_state())
+    except Exception as e:
+        # Без сохраненной сессии следующий запуск логинится заново
+        logger.warning(f"{settings.profi_login}: failed to save session: {e}")
+    await context.close()
@@ -0,0 +1,95 @@
+import asyncio
+import random
+import time
+
+from core.config import settings
+from core.logger import get_logger
+from core.redis import client
+
+# Как часто перечитывать профиль активности из Redis (секунды)
+PROFILE_REFRESH = 3600
+# Дальше интервал все равно упирается в верхнюю границу
+MAX_BACKOFF_STEPS = 32
+
+
+class PollScheduler:
+    """Интервал между опросами доски по недавним заказам и часу суток.
+
+    Пока новые заказы появлялись в последние poll_hot_window секунд,
+    доска опрашивается раз в page_refresh_min. Каждый пустой опрос после
+    этого увеличивает интервал в poll_backoff раз. Верхняя граница зависит
+    от активности текущего часа относительно самого активного: в пиковые
+    часы это page_refresh_max, в часы без заказов — poll_idle_max.
+    К интервалу добавляется джиттер ±poll_jitter, границы сохраняются.
+    """
+
+    def __init__(self):
+        self.logger = get_logger(__name__, settings.log_level)
+        self.idle_polls = 0
+        self.last_orders_at: float | None = None
+        self._profile: dict[int, float] = {}
+        self._profile_loaded_at: float | None = None
+
+    async def _activity(self, hour: int) -> float:
+        """Активность часа от 0 до 1; для часа без данных — 1"""
+        now = time.monotonic()
+        loaded_at = self._profile_loaded_at
+        if loaded_at is None or now - loaded_at > PROFILE_REFRESH:
+            self._profile = await client.get_activity_profile()
+            self._profile_loaded_at = now
+        busiest = max(self._profile.values(), default=0)
+        if not busiest or hour not in self._profile:
+            return 1.0
+        return self._profile[hour] / busiest
+
+    async def record(self, new_orders: int) -> None:
+        now = time.time()
+        await client.record_poll(time.localtime(now).tm_hour, new_orders)
+        if new_orders:
+            self.idle_polls = 0
+            self.last_orders_at = now
+        else:
+            self.idle_polls += 1
+
+    async def next_interval(self) -> float:
+        now = time.time()
+        low = settings.page_refresh_min
+        activity = await self._activity(time.localtime(now).tm_hour)
+        high = max(
+            low,
+            settings.page_refresh_max
+            + (settings.poll_idle_max - settings.page_refresh_max) * (1 - activity),
+        )
+
+        hot = (
+            self.last_orders_at is not None
+            and now - self.last_orders_at < settings.poll_hot_window
+        )
+        if hot:
+            interval = low
+        else:
+            interval = low * settings.poll_backoff ** min(
+                self.idle_polls, MAX_BACKOFF_STEPS
+            )
+        interval *= random.uniform(1 - settings.poll_jitter, 1 + settings.poll_jitter)
+        return min(max(interval, low), high)
+
+    async def report(self) -> str:
+        metrics = await client.get_poll_metrics()
+        per_order = metrics["polls_per_order"]
+        latency = metrics["median_order_to_accept"]
+        per_order = f"{per_order:.1f}" if per_order is not None else "n/a"
+        latency = f"{latency:.1f}s" if latency is not None else "n/a"
+        return f"polls per new order: {per_order}, median order-to-accept: {latency}"
+
+    async def sleep(self, wakeup: asyncio.Event | None = None) -> None:
+        """Ждет следующего опроса; установленный wakeup прерывает ожидание"""
+        duration = await self.next_interval()
+        self.logger.debug(f"Sleeping {duration:.1f} seconds")
+        if wakeup is None:
+            await asyncio.sleep(duration)
+            return
+        try:
+            await asyncio.wait_for(wakeup.wait(), duration)
+        except asyncio.TimeoutError:
+            pass
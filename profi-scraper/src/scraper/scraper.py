@@ -1,53 +1,111 @@
+import asyncio
+
 import playwright
 from playwright.async_api import async_playwright, Browser as PlaywrightBrowser
 
 from core.config import settings
 from core.redis import client
-from .browser import launch_browser
+from .browser import close_context, launch_browser, new_context
+from .schedule import PollScheduler
 
 from core.logger import get_logger
-from core.util import sleep_random_time
-from core.broker import send_message
-from src.orders.actions.accept import accept
+from core.metrics import metrics
+from core.broker import publisher, send_message
+from src.orders.actions.accept import accept, create_accept_pool
 from src.orders.actions.fetch import process_orders
 from src.orders.actions.login import login
-
-
-async def close_all_context(browser: PlaywrightBrowser):
-    for ctx in browser.contexts:
-        await ctx.close()
+from src.orders.feed import OrderFeed
+from src.orders.selector import BoardDiffer
 
 
 class Scraper:
-    def __init__(self):
+    def __init__(self, poll_slots: asyncio.Semaphore | None = None):
         self.is_running = True
+        self._stopping = asyncio.Event()
         self.logger = get_logger(__name__, settings.log_level)
+        self.feed = OrderFeed() if settings.poll_mode == "feed" else None
+        # Общий для аккаунтов одного браузера лимит одновременных опросов
+        self.poll_slots = poll_slots or asyncio.Semaphore(1)
+        self.scheduler = PollScheduler()
+        self.differ = BoardDiffer()
 
-    async def run(self):
-        await send_message(f"Scraper is running: {settings.profi_login}")
-        async with async_playwright() as p:
-            browser: PlaywrightBrowser = await launch_browser(p)
-            context = await browser.new_context()
+    def _watch_feed(self, order_page) -> None:
+        if self.feed is not None:
+            self.feed.reset()
+            self.feed.attach(order_page)
 
+    async def _open(self, browser: PlaywrightBrowser):
+        context = await new_context(browser)
+        async with self.poll_slots:
             order_page = await login(context)
+        self._watch_feed(order_page)
+        # Заказы, увиденные до сбоя, могли не дойти до обработки
+        self.differ.reset()
+        return context, order_page, create_accept_pool(context)
+
+    async def _flush_metrics(self) -> None:
+        try:
+            await metrics.flush()
+        except Exception as e:
+            self.logger.warning(f"Failed to flush stage metrics: {e}")
+
+    async def serve(self, browser: PlaywrightBrowser):
+        """Опрашивает доску аккаунта в отдельном контексте уже запущенного браузера"""
+        await send_message(f"Scraper is running: {settings.profi_login}")
+        imported = await client.import_legacy_viewed_orders()
+        if imported:
+            self.logger.info(
+                f"{settings.profi_login}: imported {imported} legacy viewed orders"
+            )
+        context, order_page, pool = await self._open(browser)
+        polls = 0
 
+        try:
             while self.is_running:
                 try:
-                    valid_orders = await process_orders(order_page)
+                    refresh_html = polls % settings.feed_html_refresh_every == 0
+                    polls += 1
+                    async with self.poll_slots:
+                        with metrics.span("poll"):
+                            valid_orders = await process_orders(
+                                order_page, self.feed, refresh_html, self.differ
+                            )
+                    await self.scheduler.record(len(valid_orders))
                     response_limit = await client.get_response_limit()
                     if valid_orders and settings.accept and response_limit > 0:
-                        await accept(context, valid_orders)
-                    await sleep_random_time()
+                        with metrics.span("accept_batch"):
+                            await accept(pool, valid_orders)
+                        self.logger.info(
+                            f"{settings.profi_login}: {await self.scheduler.report()}"
+                        )
+                    await self._flush_metrics()
+                    await self.scheduler.sleep(self._stopping)
                 except playwright.async_api.TimeoutError as ex:
                     self.logger.warning(
-                        f"TimeoutError: close all context and login {ex}"
+                        f"TimeoutError: reopen context from saved session {ex}"
                     )
-                    await close_all_context(browser)
-                    context = await browser.new_context()
-                    order_page = await login(context)
+                    await pool.close()
+                    await close_context(context)
+                    context, order_page, pool = await self._open(browser)
+                    polls = 0
+        finally:
+            await pool.close()
+            await close_context(context)
+
+    async def run(self):
+        async with async_playwright() as p:
+            browser: PlaywrightBrowser = await launch_browser(p)
+            await self.serve(browser)
             await browser.close()
+        await send_message(f"Scraper is closed: {settings.profi_login}")
+        # Досылаем накопленные сообщения один раз, после выхода из цикла
+        await publisher.close()
 
-    async def stop(self):
+    def request_stop(self) -> None:
+        """Завершает цикл после текущего опроса, прерывая ожидание"""
         self.is_running = False
+        self._stopping.set()
+
+    async def stop(self):
         self.logger.info("Scraper is stopping")
-        await send_message(f"Scraper is closed: {settings.profi_login}")
+        self.request_stop()
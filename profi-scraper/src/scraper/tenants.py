@@ -0,0 +1,144 @@
+import asyncio
+import json
+from dataclasses import dataclass, field
+
+from playwright.async_api import async_playwright, Browser as PlaywrightBrowser
+
+from core.broker import publisher, send_message
+from core.config import Settings, settings, use_settings
+from core.logger import get_logger
+from core.redis import client
+from src.orders.services import StopWords, use_stop_words
+from .browser import launch_browser
+from .scraper import Scraper
+
+# Сколько ждать, пока аккаунт доработает текущий опрос, перед отменой
+TENANT_STOP_TIMEOUT = 60
+
+
+@dataclass
+class Tenant:
+    job_id: str
+    raw_config: str
+    settings: Settings
+    task: asyncio.Task | None = None
+    scraper: Scraper | None = field(default=None, repr=False)
+
+
+class TenantRuntime:
+    """Несколько аккаунтов profi в одном процессе Chromium.
+
+    Конфиги аккаунтов берутся из ключей scraper:config:* (их пишет
+    scrapers-api) и перечитываются каждые tenant_refresh_interval секунд:
+    новый ключ запускает аккаунт, удаленный или измененный — останавливает
+    или перезапускает его. У каждого аккаунта свой BrowserContext
+    (куки, прокси, вкладки) и свои настройки: задача аккаунта видит их
+    через use_settings. Опросы доски и логины идут через общий семафор
+    на tenant_poll_concurrency мест; он отдает места в порядке очереди,
+    поэтому аккаунты опрашиваются по кругу и ни один не простаивает.
+    """
+
+    def __init__(self):
+        self.is_running = True
+        self.logger = get_logger(__name__, settings.log_level)
+        self.poll_slots = asyncio.Semaphore(settings.tenant_poll_concurrency)
+        self.tenants: dict[str, Tenant] = {}
+        self._stopped = asyncio.Event()
+
+    async def _serve(self, tenant: Tenant, browser: PlaywrightBrowser) -> None:
+        # Задача получила копию контекста при создании: подмена видна
+        # только ей и задачам, которые она создаст
+        use_settings(tenant.settings)
+        words = json.loads(tenant.raw_config).get("words") or []
+        use_stop_words(StopWords(words=words))
+        tenant.scraper = Scraper(self.poll_slots)
+        try:
+            await tenant.scraper.serve(browser)
+        finally:
+            await send_message(f"Scraper is closed: {settings.profi_login}")
+
+    def _start(self, job_id: str, raw_config: str, browser: PlaywrightBrowser) -> None:
+        tenant = Tenant(
+            job_id=job_id,
+            raw_config=raw_config,
+            settings=settings.for_tenant(json.loads(raw_config)),
+        )
+        tenant.task = asyncio.create_task(
+            self._serve(tenant, browser), name=f"tenant:{job_id}"
+        )
+        self.tenants[job_id] = tenant
+        self.logger.info(f"Tenant {job_id} started: {tenant.settings.profi_login}")
+
+    async def _stop(self, job_id: str) -> None:
+        tenant = self.tenants.pop(job_id)
+        if tenant.scraper is not None:
+            tenant.scraper.request_stop()
+        done, _ = await asyncio.wait({tenant.task}, timeout=TENANT_STOP_TIMEOUT)
+        if not done:
+            tenant.task.cancel()
+        await asyncio.gather(tenant.task, return_exceptions=True)
+        self.logger.info(f"Tenant {job_id} stopped: {tenant.settings.profi_login}")
+
+    async def _sync(self, browser: PlaywrightBrowser) -> None:
+        configs = await client.get_tenant_configs()
+
+        stale = []
+        for job_id, tenant in self.tenants.items():
+            if tenant.task.done():
+                if not tenant.task.cancelled() and tenant.task.exception():
+                    self.logger.error(
+                        f"Tenant {job_id} failed, restarting: {tenant.task.exception()}"
+                    )
+                stale.append(job_id)
+            elif configs.get(job_id) != tenant.raw_config:
+                stale.append(job_id)
+        await asyncio.gather(*(self._stop(job_id) for job_id in stale))
+
+        logins = {tenant.settings.profi_login for tenant in self.tenants.values()}
+        for job_id, raw_config in sorted(configs.items()):
+            if job_id in self.tenants:
+                continue
+            try:
+                login = json.loads(raw_config)["profi_login"]
+            except (ValueError, KeyError, TypeError):
+                self.logger.warning(f"Tenant {job_id} has invalid config")
+                continue
+            if login in logins:
+                # Один аккаунт в двух контекстах тратил бы отклики дважды
+                self.logger.warning(f"Tenant {job_id} skipped: {login} already runs")
+                continue
+            if len(self.tenants) >= settings.max_tenants:
+                self.logger.warning(
+                    f"Tenant limit {settings.max_tenants} reached, "
+                    f"{len(configs) - len(self.tenants)} configs waiting"
+                )
+                break
+            self._start(job_id, raw_config, browser)
+            logins.add(login)
+
+    async def run(self) -> None:
+        async with async_playwright() as p:
+            browser: PlaywrightBrowser = await launch_browser(p)
+            try:
+                while self.is_running:
+                    try:
+                        await self._sync(browser)
+                    except Exception as e:
+                        self.logger.error(f"Failed to sync tenants: {e}")
+                    try:
+                        await asyncio.wait_for(
+                            self._stopped.wait(), settings.tenant_refresh_interval
+                        )
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                await asyncio.gather(
+                    *(self._stop(job_id) for job_id in list(self.tenants))
+                )
+                await browser.close()
+        await publisher.close()
+
+    async def stop(self) -> None:
+        self.logger.info("Tenant runtime is stopping")
+        self.is_running = False
+        self._stopped.set()
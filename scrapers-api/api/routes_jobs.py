@@ -1,6 +1,8 @@
 from fastapi import APIRouter
 from kubernetes.client import ApiException
 
+from core.config import settings
+from core.redis_client import delete_scraper_config
 from services.k8s import list_jobs, delete_job, get_job_logs
 from services.responses import response_ok, response_error
 
@@ -10,6 +12,13 @@ router = APIRouter(tags=["jobs"])
 @router.delete("/stop-scraper/{job_id}")
 async def stop_scraper(job_id: str):
     job_name = job_id
+    if settings.scraper_mode == "tenant":
+        if not await delete_scraper_config(job_id):
+            response_error(f"Scraper {job_id} not found", 404)
+        return response_ok(
+            job_id=job_id, message=f"Scraper {job_id} stopped successfully"
+        )
+
     try:
         delete_job(job_name)
         return response_ok(
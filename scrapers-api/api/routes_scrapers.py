@@ -14,6 +14,13 @@ router = APIRouter(tags=["scrapers"])
 async def start_scraper(config: ScraperConfig):
     job_id = config.job_id
     try:
+        if settings.scraper_mode == "tenant":
+            # Конфиг живет, пока аккаунт не остановят через stop-scraper
+            await save_scraper_config(job_id, config.model_dump(), ttl=None)
+            return response_ok(
+                job_id=job_id, message=f"Scraper {job_id} scheduled in tenant pod"
+            )
+
         await save_scraper_config(job_id, config.model_dump())
         env_vars = make_env_vars(job_id, config)
 
@@ -23,6 +23,9 @@ class Settings(BaseSettings):
     # Scraper настройки
     scraper_image: str = "profi-scraper:latest"
     scraper_registry: str = "aadbccd8-cute-cygnus.registry.twcstorage.ru"
+    # job — отдельный Job на аккаунт, tenant — аккаунты подхватывает общий
+    # под profi-scraper с MULTI_TENANT=True из scraper:config:*
+    scraper_mode: str = "job"
     
     class Config:
         env_file = ".env"
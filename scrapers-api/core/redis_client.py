@@ -3,18 +3,31 @@ from redis.asyncio import Redis
 from .config import settings
 
 
-async def save_scraper_config(job_id: str, config: dict):
-    """Save scraper config to Redis with TTL."""
-    redis_client = Redis(
+def _redis() -> Redis:
+    return Redis(
         host=settings.redis_host,
         port=settings.redis_port,
         db=settings.redis_db,
         password=settings.redis_password,
         decode_responses=True,
     )
+
+
+async def save_scraper_config(job_id: str, config: dict, ttl: int | None = 3600):
+    """Save scraper config to Redis (without expiry if ttl is None)."""
+    redis_client = _redis()
     try:
-        await redis_client.setex(
-            name=f"scraper:config:{job_id}", time=3600, value=json.dumps(config)
+        await redis_client.set(
+            name=f"scraper:config:{job_id}", value=json.dumps(config), ex=ttl
         )
     finally:
         await redis_client.close()
+
+
+async def delete_scraper_config(job_id: str) -> bool:
+    """Remove scraper config; returns False if it did not exist."""
+    redis_client = _redis()
+    try:
+        return bool(await redis_client.delete(f"scraper:config:{job_id}"))
+    finally:
+        await redis_client.close()
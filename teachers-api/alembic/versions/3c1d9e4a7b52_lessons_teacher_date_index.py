@@ -0,0 +1,32 @@
+"""lessons teacher_id date_time index
+
+Revision ID: 3c1d9e4a7b52
+Revises: 7bb8a5f9c98c
+Create Date: 2026-10-17 10:12:31.218904
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "3c1d9e4a7b52"
+down_revision: Union[str, None] = "7bb8a5f9c98c"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_lessons_teacher_id_date_time",
+        "lessons",
+        ["teacher_id", "date_time"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_lessons_teacher_id_date_time", table_name="lessons")
@@ -0,0 +1,71 @@
+"""teacher monthly stats rollup
+
+Revision ID: 9f2b6c8d1e47
+Revises: 3c1d9e4a7b52
+Create Date: 2026-10-17 11:02:45.730518
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9f2b6c8d1e47"
+down_revision: Union[str, None] = "3c1d9e4a7b52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "teacher_monthly_stats",
+        sa.Column("teacher_id", sa.Integer(), nullable=False),
+        sa.Column("month", sa.Date(), nullable=False),
+        sa.Column("confirmed_lessons", sa.Integer(), nullable=False),
+        sa.Column(
+            "confirmed_value", sa.Numeric(precision=12, scale=2), nullable=False
+        ),
+        sa.Column("paid_invoices", sa.Integer(), nullable=False),
+        sa.Column("unpaid_invoices", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["teacher_id"], ["teachers.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("teacher_id", "month"),
+    )
+    op.execute(
+        """
+        INSERT INTO teacher_monthly_stats (
+            teacher_id, month, confirmed_lessons, confirmed_value,
+            paid_invoices, unpaid_invoices
+        )
+        SELECT teacher_id, month,
+               sum(confirmed_lessons), sum(confirmed_value),
+               sum(paid_invoices), sum(unpaid_invoices)
+        FROM (
+            SELECT teacher_id,
+                   date_trunc('month', date_time AT TIME ZONE 'UTC')::date AS month,
+                   count(*) AS confirmed_lessons,
+                   sum(price) AS confirmed_value,
+                   0 AS paid_invoices,
+                   0 AS unpaid_invoices
+            FROM lessons
+            WHERE status = 'confirmed'
+            GROUP BY 1, 2
+            UNION ALL
+            SELECT teacher_id,
+                   date_trunc('month', created_at AT TIME ZONE 'UTC')::date,
+                   0,
+                   0,
+                   count(*) FILTER (WHERE status = 'paid'),
+                   count(*) FILTER (WHERE status = 'unpaid')
+            FROM invoices
+            GROUP BY 1, 2
+        ) AS monthly
+        GROUP BY teacher_id, month
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("teacher_monthly_stats")
@@ -0,0 +1,73 @@
+"""monthly stats by lesson status
+
+Revision ID: a6d3f8b2c917
+Revises: f2c8e5a1d394
+Create Date: 2026-10-17 17:25:38.904113
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "a6d3f8b2c917"
+down_revision: Union[str, None] = "f2c8e5a1d394"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+STATUSES = ("planned", "cancelled")
+
+
+def upgrade() -> None:
+    for status in STATUSES:
+        op.add_column(
+            "teacher_monthly_stats",
+            sa.Column(
+                f"{status}_lessons", sa.Integer(), server_default="0", nullable=False
+            ),
+        )
+        op.add_column(
+            "teacher_monthly_stats",
+            sa.Column(
+                f"{status}_value",
+                sa.Numeric(precision=12, scale=2),
+                server_default="0",
+                nullable=False,
+            ),
+        )
+    op.execute(
+        """
+        INSERT INTO teacher_monthly_stats (
+            teacher_id, month, confirmed_lessons, confirmed_value,
+            paid_invoices, unpaid_invoices,
+            planned_lessons, planned_value, cancelled_lessons, cancelled_value
+        )
+        SELECT teacher_id,
+               date_trunc('month', date_time AT TIME ZONE 'UTC')::date,
+               0, 0, 0, 0,
+               count(*) FILTER (WHERE status = 'planned'),
+               coalesce(sum(price) FILTER (WHERE status = 'planned'), 0),
+               count(*) FILTER (WHERE status = 'cancelled'),
+               coalesce(sum(price) FILTER (WHERE status = 'cancelled'), 0)
+        FROM lessons
+        WHERE status IN ('planned', 'cancelled')
+        GROUP BY 1, 2
+        ON CONFLICT (teacher_id, month) DO UPDATE SET
+            planned_lessons = excluded.planned_lessons,
+            planned_value = excluded.planned_value,
+            cancelled_lessons = excluded.cancelled_lessons,
+            cancelled_value = excluded.cancelled_value
+        """
+    )
+    for status in STATUSES:
+        for column in (f"{status}_lessons", f"{status}_value"):
+            op.alter_column("teacher_monthly_stats", column, server_default=None)
+
+
+def downgrade() -> None:
+    for status in STATUSES:
+        op.drop_column("teacher_monthly_stats", f"{status}_value")
+        op.drop_column("teacher_monthly_stats", f"{status}_lessons")
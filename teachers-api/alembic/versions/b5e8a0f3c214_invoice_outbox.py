@@ -0,0 +1,58 @@
+"""invoice outbox
+
+Revision ID: b5e8a0f3c214
+Revises: 9f2b6c8d1e47
+Create Date: 2026-10-17 12:20:04.118377
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "b5e8a0f3c214"
+down_revision: Union[str, None] = "9f2b6c8d1e47"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "invoice_outbox",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("lesson_id", sa.Integer(), nullable=False),
+        sa.Column("teacher_id", sa.Integer(), nullable=False),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column(
+            "status",
+            sa.Enum("pending", "sent", "failed", name="outboxstatus"),
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("last_error", sa.Text(), nullable=True),
+        sa.Column("next_attempt_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("processed_at", sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(["lesson_id"], ["lessons.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["teacher_id"], ["teachers.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_invoice_outbox_lesson_id"), "invoice_outbox", ["lesson_id"], unique=False
+    )
+    op.create_index(
+        "ix_invoice_outbox_status_next_attempt_at",
+        "invoice_outbox",
+        ["status", "next_attempt_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_invoice_outbox_status_next_attempt_at", table_name="invoice_outbox")
+    op.drop_index(op.f("ix_invoice_outbox_lesson_id"), table_name="invoice_outbox")
+    op.drop_table("invoice_outbox")
+    sa.Enum(name="outboxstatus").drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,49 @@
+"""event outbox
+
+Revision ID: d7a4c2e9f615
+Revises: b5e8a0f3c214
+Create Date: 2026-10-17 13:05:52.604211
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "d7a4c2e9f615"
+down_revision: Union[str, None] = "b5e8a0f3c214"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "event_outbox",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("event_type", sa.String(length=64), nullable=False),
+        sa.Column("teacher_id", sa.Integer(), nullable=True),
+        sa.Column("payload", sa.JSON(), nullable=False),
+        sa.Column(
+            "status",
+            postgresql.ENUM(
+                "pending", "sent", "failed", name="outboxstatus", create_type=False
+            ),
+            nullable=False,
+        ),
+        sa.Column("attempts", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("sent_at", sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        "ix_event_outbox_status_id", "event_outbox", ["status", "id"], unique=False
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_outbox_status_id", table_name="event_outbox")
+    op.drop_table("event_outbox")
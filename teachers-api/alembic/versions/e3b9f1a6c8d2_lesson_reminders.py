@@ -0,0 +1,42 @@
+"""lesson reminders
+
+Revision ID: e3b9f1a6c8d2
+Revises: d7a4c2e9f615
+Create Date: 2026-10-17 15:41:07.336120
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "e3b9f1a6c8d2"
+down_revision: Union[str, None] = "d7a4c2e9f615"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "lessons",
+        sa.Column("last_reminded_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index(
+        "ix_lessons_planned_date_time",
+        "lessons",
+        ["date_time"],
+        unique=False,
+        postgresql_where=sa.text("status = 'planned'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index(
+        "ix_lessons_planned_date_time",
+        table_name="lessons",
+        postgresql_where=sa.text("status = 'planned'"),
+    )
+    op.drop_column("lessons", "last_reminded_at")
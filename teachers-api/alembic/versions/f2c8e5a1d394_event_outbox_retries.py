@@ -0,0 +1,49 @@
+"""event outbox retries
+
+Revision ID: f2c8e5a1d394
+Revises: e3b9f1a6c8d2
+Create Date: 2026-10-17 16:40:12.318502
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "f2c8e5a1d394"
+down_revision: Union[str, None] = "e3b9f1a6c8d2"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("event_outbox", sa.Column("last_error", sa.Text(), nullable=True))
+    op.add_column(
+        "event_outbox",
+        sa.Column(
+            "next_attempt_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=False,
+        ),
+    )
+    op.alter_column("event_outbox", "next_attempt_at", server_default=None)
+    op.drop_index("ix_event_outbox_status_id", table_name="event_outbox")
+    op.create_index(
+        "ix_event_outbox_status_next_attempt_at",
+        "event_outbox",
+        ["status", "next_attempt_at"],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_event_outbox_status_next_attempt_at", table_name="event_outbox")
+    op.create_index(
+        "ix_event_outbox_status_id", "event_outbox", ["status", "id"], unique=False
+    )
+    op.drop_column("event_outbox", "next_attempt_at")
+    op.drop_column("event_outbox", "last_error")
@@ -15,6 +15,30 @@ class Settings(BaseSettings):
     RABBIT_QUEUE: str
 
     TINKOFF_TOKEN: str
+    TBANK_INVOICE_URL: str = (
+        "https://business.tbank.ru/openapi/sandbox/api/v1/invoice/send"
+    )
+    TBANK_TIMEOUT: float = 20.0
+    TBANK_MAX_CONNECTIONS: int = 20
+    TBANK_MAX_RETRIES: int = 3
+    TBANK_BACKOFF_BASE: float = 0.5
+    TBANK_BACKOFF_MAX: float = 5.0
+    TBANK_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    TBANK_CIRCUIT_RESET_TIMEOUT: float = 30.0
+
+    INVOICE_OUTBOX_BATCH_SIZE: int = 20
+    INVOICE_OUTBOX_POLL_INTERVAL: float = 2.0
+    INVOICE_OUTBOX_LEASE: int = 120
+    INVOICE_OUTBOX_RETRY_BASE: float = 5.0
+    INVOICE_OUTBOX_RETRY_MAX: float = 600.0
+    INVOICE_OUTBOX_MAX_ATTEMPTS: int = 10
+
+    EVENT_OUTBOX_BATCH_SIZE: int = 100
+    EVENT_OUTBOX_POLL_INTERVAL: float = 1.0
+    EVENT_OUTBOX_LEASE: int = 60
+    EVENT_OUTBOX_RETRY_BASE: float = 2.0
+    EVENT_OUTBOX_RETRY_MAX: float = 300.0
+    EVENT_OUTBOX_MAX_ATTEMPTS: int = 20
 
     API_HOST: str = "0.0.0.0"
     API_PORT: int = 8000
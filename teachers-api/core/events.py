@@ -0,0 +1,43 @@
+import enum
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import orjson
+
+# Версия конверта события; увеличивается при несовместимых изменениях
+# состава полей, чтобы потребители могли отличить старые сообщения
+EVENT_SCHEMA_VERSION = 1
+
+EVENT_CONTENT_TYPE = "application/json"
+
+
+class EventType(str, enum.Enum):
+    lesson_created = "lesson_created"
+    lesson_confirmed = "lesson_confirmed"
+    lesson_cancelled = "lesson_cancelled"
+    lesson_updated = "lesson_updated"
+    invoice_paid = "invoice_paid"
+    teacher_registered = "teacher_registered"
+
+
+def build_event(
+    event_id: int,
+    event_type: str,
+    teacher_id: Optional[int],
+    payload: Dict[str, Any],
+    occurred_at: datetime,
+) -> Dict[str, Any]:
+    """Конверт события: тип, учитель, данные и версия схемы"""
+    return {
+        "id": event_id,
+        "type": event_type,
+        "version": EVENT_SCHEMA_VERSION,
+        "teacher_id": teacher_id,
+        "occurred_at": occurred_at,
+        "payload": payload,
+    }
+
+
+def encode_event(event: Dict[str, Any]) -> bytes:
+    """Сериализует конверт в JSON (orjson сам обрабатывает datetime)"""
+    return orjson.dumps(event)
@@ -1,8 +1,13 @@
+import asyncio
 from datetime import datetime, timezone
 from typing import Dict, Any, Optional
+from fastapi.encoders import jsonable_encoder
 from faststream.rabbit import RabbitBroker
-from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import models
 from core.config import settings
+from core.events import EVENT_CONTENT_TYPE, EventType, build_event, encode_event
 
 
 class NotificationService:
@@ -10,94 +15,106 @@ class NotificationService:
         from core.config import settings
         self.rabbitmq_url = rabbitmq_url or settings.rabbit_url
         self._broker = None
+        self._lock = asyncio.Lock()
     
     async def get_broker(self) -> RabbitBroker:
-        """Get or create RabbitMQ broker"""
-        if self._broker is None:
-            self._broker = RabbitBroker(self.rabbitmq_url)
-            await self._broker.connect()
+        """Get or create RabbitMQ broker.
+
+        The broker is cached only after connect() succeeds, so concurrent
+        publishes never see an unconnected broker and a failed connect is
+        retried on the next call.
+        """
+        if self._broker is not None:
+            return self._broker
+        async with self._lock:
+            if self._broker is None:
+                # С подтверждениями publish возвращается только после ack брокера
+                broker = RabbitBroker(self.rabbitmq_url, publisher_confirms=True)
+                await broker.connect()
+                self._broker = broker
         return self._broker
     
-    async def send_notification(self, message_text: str, teacher_id: Optional[int] = None):
-        """Send formatted notification message to RabbitMQ"""
-        try:
-            broker = await self.get_broker()
-            
-            await broker.publish(
-                message_text,
-                settings.RABBIT_QUEUE
+    async def publish(self, event: models.EventOutbox):
+        """Publish event envelope to RabbitMQ and wait for broker confirm.
+
+        Raises on failure, so the outbox relay can retry the event.
+        """
+        broker = await self.get_broker()
+        envelope = build_event(
+            event.id,
+            event.event_type,
+            event.teacher_id,
+            event.payload,
+            event.created_at,
+        )
+        await broker.publish(
+            encode_event(envelope),
+            settings.RABBIT_QUEUE,
+            content_type=EVENT_CONTENT_TYPE,
+            message_id=f"event-{event.id}",
+            headers={"event_type": event.event_type},
+        )
+
+    async def send_notification(
+        self,
+        db: AsyncSession,
+        event_type: EventType,
+        payload: Dict[str, Any],
+        teacher_id: Optional[int] = None,
+    ):
+        """Enqueue event into event_outbox within the caller's transaction.
+
+        Nothing is committed here: the event is stored together with the
+        domain change and published later by the outbox relay. Rendering
+        into a message is done by consumers.
+        """
+        db.add(
+            models.EventOutbox(
+                event_type=event_type.value,
+                teacher_id=teacher_id,
+                payload=jsonable_encoder(payload),
             )
-            
-            logger.info(f"Notification sent for teacher {teacher_id}")
-            
-        except Exception as e:
-            logger.error(f"Failed to send notification: {e}")
-    
-    async def lesson_created(self, lesson_data: Dict[str, Any], teacher_id: int):
+        )
+
+    async def lesson_created(self, db: AsyncSession, lesson_data: Dict[str, Any], teacher_id: int):
         """Notify about lesson creation"""
-        message = f"🎯 <b>Новый урок создан</b>\n\n" \
-                 f"👤 Ученик: {lesson_data.get('student_name')}\n" \
-                 f"📅 Дата и время: {lesson_data.get('date_time')}\n" \
-                 f"💰 Цена: {lesson_data.get('price')} руб\n" \
-                 f"📝 Тип: {lesson_data.get('type')}\n" \
-                 f"🆔 ID урока: {lesson_data.get('id')}"
-        
-        await self.send_notification(message, teacher_id)
-    
-    async def lesson_confirmed(self, lesson_data: Dict[str, Any], teacher_id: int):
+        await self.send_notification(db, EventType.lesson_created, lesson_data, teacher_id)
+
+    async def lesson_confirmed(self, db: AsyncSession, lesson_data: Dict[str, Any], teacher_id: int):
         """Notify about lesson confirmation"""
-        message = f"✅ <b>Урок подтвержден</b>\n\n" \
-                 f"👤 Ученик: {lesson_data.get('student_name')}\n" \
-                 f"📅 Дата и время: {lesson_data.get('date_time')}\n" \
-                 f"💰 Цена: {lesson_data.get('price')} руб\n" \
-                 f"🆔 ID урока: {lesson_data.get('id')}"
-        
-        await self.send_notification(message, teacher_id)
-    
-    async def lesson_cancelled(self, lesson_data: Dict[str, Any], teacher_id: int):
+        await self.send_notification(db, EventType.lesson_confirmed, lesson_data, teacher_id)
+
+    async def lesson_cancelled(self, db: AsyncSession, lesson_data: Dict[str, Any], teacher_id: int):
         """Notify about lesson cancellation"""
-        message = f"❌ <b>Урок отменен</b>\n\n" \
-                 f"👤 Ученик: {lesson_data.get('student_name')}\n" \
-                 f"📅 Дата и время: {lesson_data.get('date_time')}\n" \
-                 f"📝 Причина: {lesson_data.get('reason', 'Причина не указана')}\n" \
-                 f"🆔 ID урока: {lesson_data.get('id')}"
-        
-        await self.send_notification(message, teacher_id)
-    
-    async def lesson_updated(self, lesson_data: Dict[str, Any], teacher_id: int, changes: Dict[str, Any]):
+        await self.send_notification(db, EventType.lesson_cancelled, lesson_data, teacher_id)
+
+    async def lesson_updated(self, db: AsyncSession, lesson_data: Dict[str, Any], teacher_id: int, changes: Dict[str, Any]):
         """Notify about lesson update"""
-        changes_text = "\n".join([f"• {key}: {value}" for key, value in changes.items()])
-        message = f"✏️ <b>Урок обновлен</b>\n\n" \
-                 f"👤 Ученик: {lesson_data.get('student_name')}\n" \
-                 f"🆔 ID урока: {lesson_data.get('id')}\n\n" \
-                 f"📝 <b>Изменения:</b>\n{changes_text}"
-        
-        await self.send_notification(message, teacher_id)
-    
-    async def invoice_paid(self, invoice_data: Dict[str, Any], teacher_id: int):
+        await self.send_notification(
+            db, EventType.lesson_updated, {**lesson_data, "changes": changes}, teacher_id
+        )
+
+    async def invoice_paid(self, db: AsyncSession, invoice_data: Dict[str, Any], teacher_id: int):
         """Notify about invoice payment"""
-        message = f"💸 <b>Счет оплачен</b>\n\n" \
-                 f"🧾 ID счета: {invoice_data.get('id')}\n" \
-                 f"📚 ID урока: {invoice_data.get('lesson_id')}\n" \
-                 f"💰 Сумма: {invoice_data.get('amount')} руб\n" \
-                 f"📅 Дата оплаты: {datetime.now(timezone.utc).strftime('%d.%m.%Y %H:%M')}"
-        
-        await self.send_notification(message, teacher_id)
-    
-    async def teacher_registered(self, teacher_data: Dict[str, Any]):
+        await self.send_notification(
+            db,
+            EventType.invoice_paid,
+            {**invoice_data, "paid_at": datetime.now(timezone.utc)},
+            teacher_id,
+        )
+
+    async def teacher_registered(self, db: AsyncSession, teacher_data: Dict[str, Any]):
         """Notify about teacher registration"""
-        message = f"🎉 <b>Новый преподаватель зарегистрирован</b>\n\n" \
-                 f"👨‍🏫 ФИО: {teacher_data.get('full_name')}\n" \
-                 f"📧 Email: {teacher_data.get('email')}\n" \
-                 f"🆔 Telegram ID: {teacher_data.get('tg_id')}\n" \
-                 f"🆔 ID преподавателя: {teacher_data.get('id')}"
-        
-        await self.send_notification(message, teacher_data.get('id'))
-    
+        await self.send_notification(
+            db, EventType.teacher_registered, teacher_data, teacher_data.get('id')
+        )
+
     async def close(self):
         """Close broker connection"""
-        if self._broker:
-            await self._broker.stop()
+        async with self._lock:
+            if self._broker:
+                await self._broker.stop()
+                self._broker = None
 
 
 # Global notification service instance
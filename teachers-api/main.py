@@ -3,10 +3,25 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 
 
+from core.notifications import notification_service
 from routers import lessons, teachers, invoices
+from services.event_outbox import event_outbox_relay
+from services.invoice_outbox import invoice_outbox_worker
+from tbank.client import tbank_client
 
 
-app = FastAPI(title="Lessons API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    invoice_outbox_worker.start()
+    event_outbox_relay.start()
+    yield
+    await invoice_outbox_worker.stop()
+    await event_outbox_relay.stop()
+    await tbank_client.close()
+    await notification_service.close()
+
+
+app = FastAPI(title="Lessons API", lifespan=lifespan)
 
 app.include_router(teachers.router)
 app.include_router(lessons.router)
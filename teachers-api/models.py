@@ -1,7 +1,18 @@
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
 import enum
 
-from sqlalchemy import DateTime, Enum, ForeignKey, Numeric, String, Text
+from sqlalchemy import (
+    JSON,
+    Date,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Numeric,
+    String,
+    Text,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from core.db import Base
@@ -23,6 +34,12 @@ class InvoiceStatus(str, enum.Enum):
     paid = "paid"  # Оплачен
 
 
+class OutboxStatus(str, enum.Enum):
+    pending = "pending"  # Ожидает отправки
+    sent = "sent"  # Обработано
+    failed = "failed"  # Отклонено без повторов
+
+
 class Teacher(Base):
     __tablename__ = "teachers"
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
@@ -71,6 +88,15 @@ class Invoice(Base):
 
 class Lesson(Base):
     __tablename__ = "lessons"
+    __table_args__ = (
+        Index("ix_lessons_teacher_id_date_time", "teacher_id", "date_time"),
+        # Для lesson-checker: неподтвержденные уроки по времени начала
+        Index(
+            "ix_lessons_planned_date_time",
+            "date_time",
+            postgresql_where=text("status = 'planned'"),
+        ),
+    )
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     student_name: Mapped[str] = mapped_column(String(255), nullable=False)
     teacher_id: Mapped[int] = mapped_column(
@@ -85,6 +111,104 @@ class Lesson(Base):
     type: Mapped[LessonType] = mapped_column(
         Enum(LessonType), default=LessonType.regular, nullable=False
     )
+    # Когда lesson-checker последний раз напоминал о подтверждении
+    last_reminded_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
 
     teacher: Mapped[Teacher] = relationship(back_populates="lessons")
     invoice: Mapped[Invoice] = relationship(back_populates="lesson")
+
+
+class TeacherMonthlyStats(Base):
+    """Инкрементально поддерживаемая помесячная сводка по учителю.
+
+    Уроки учитываются по статусам и месяцу урока, счета — по месяцу
+    выставления (created_at); месяц берется в UTC.
+    """
+
+    __tablename__ = "teacher_monthly_stats"
+    teacher_id: Mapped[int] = mapped_column(
+        ForeignKey("teachers.id", ondelete="CASCADE"), primary_key=True
+    )
+    month: Mapped[date] = mapped_column(Date, primary_key=True)
+    confirmed_lessons: Mapped[int] = mapped_column(default=0, nullable=False)
+    confirmed_value: Mapped[float] = mapped_column(
+        Numeric(12, 2), default=0, nullable=False
+    )
+    planned_lessons: Mapped[int] = mapped_column(default=0, nullable=False)
+    planned_value: Mapped[float] = mapped_column(
+        Numeric(12, 2), default=0, nullable=False
+    )
+    cancelled_lessons: Mapped[int] = mapped_column(default=0, nullable=False)
+    cancelled_value: Mapped[float] = mapped_column(
+        Numeric(12, 2), default=0, nullable=False
+    )
+    paid_invoices: Mapped[int] = mapped_column(default=0, nullable=False)
+    unpaid_invoices: Mapped[int] = mapped_column(default=0, nullable=False)
+
+
+class InvoiceOutbox(Base):
+    """Заявка на выставление счета в Т-Банке, записанная вместе с
+    подтверждением урока и обрабатываемая фоновым воркером"""
+
+    __tablename__ = "invoice_outbox"
+    __table_args__ = (
+        Index("ix_invoice_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+    id: Mapped[int] = mapped_column(primary_key=True)
+    lesson_id: Mapped[int] = mapped_column(
+        ForeignKey("lessons.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    teacher_id: Mapped[int] = mapped_column(
+        ForeignKey("teachers.id", ondelete="CASCADE"), nullable=False
+    )
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    status: Mapped[OutboxStatus] = mapped_column(
+        Enum(OutboxStatus), default=OutboxStatus.pending, nullable=False
+    )
+    attempts: Mapped[int] = mapped_column(default=0, nullable=False)
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    processed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), nullable=True
+    )
+
+
+class EventOutbox(Base):
+    """Событие для RabbitMQ, записанное в одной транзакции с изменением
+    данных и публикуемое фоновым релеем"""
+
+    __tablename__ = "event_outbox"
+    __table_args__ = (
+        Index("ix_event_outbox_status_next_attempt_at", "status", "next_attempt_at"),
+    )
+    id: Mapped[int] = mapped_column(primary_key=True)
+    event_type: Mapped[str] = mapped_column(String(64), nullable=False)
+    teacher_id: Mapped[int] = mapped_column(nullable=True)
+    payload: Mapped[dict] = mapped_column(JSON, nullable=False)
+    status: Mapped[OutboxStatus] = mapped_column(
+        Enum(OutboxStatus), default=OutboxStatus.pending, nullable=False
+    )
+    attempts: Mapped[int] = mapped_column(default=0, nullable=False)
+    last_error: Mapped[str] = mapped_column(Text, nullable=True)
+    next_attempt_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        default=lambda: datetime.now(timezone.utc),
+        nullable=False,
+    )
+    sent_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -1,14 +1,17 @@
-from typing import Annotated
+from datetime import datetime
+from typing import Annotated, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from core.db import get_db
-from schemas.lessons import LessonCreate, LessonOut, LessonUpdate
+from models import LessonStatus, LessonType
+from schemas.lessons import LessonCreate, LessonOrderBy, LessonOut, LessonUpdate
 from services.lessons import (
     confirm_lesson,
     create_lesson,
     delete_lesson,
+    encode_lesson_cursor,
     get_lesson,
     list_lessons,
     update_lesson,
@@ -26,9 +29,33 @@ async def create_lesson_endpoint(
 
 @router.get("")
 async def list_lessons_endpoint(
-    db: Annotated[AsyncSession, Depends(get_db)], teacher_id: int
+    response: Response,
+    db: Annotated[AsyncSession, Depends(get_db)],
+    teacher_id: int,
+    date_from: Annotated[Optional[datetime], Query(alias="from")] = None,
+    date_to: Annotated[Optional[datetime], Query(alias="to")] = None,
+    status: Optional[LessonStatus] = None,
+    lesson_type: Annotated[Optional[LessonType], Query(alias="type")] = None,
+    order_by: LessonOrderBy = LessonOrderBy.date_time,
+    limit: Annotated[Optional[int], Query(ge=1, le=500)] = None,
+    cursor: Optional[str] = None,
 ) -> list[LessonOut]:
-    return await list_lessons(db, teacher_id)
+    """Список уроков учителя; при заполненной странице курсор следующей
+    страницы возвращается в заголовке X-Next-Cursor"""
+    lessons = await list_lessons(
+        db,
+        teacher_id,
+        date_from=date_from,
+        date_to=date_to,
+        status=status,
+        lesson_type=lesson_type,
+        order_by=order_by,
+        limit=limit,
+        cursor=cursor,
+    )
+    if limit is not None and len(lessons) == limit:
+        response.headers["X-Next-Cursor"] = encode_lesson_cursor(lessons[-1])
+    return lessons
 
 
 @router.get("/{lesson_id}")
@@ -1,10 +1,18 @@
 from typing import Annotated
 from fastapi import APIRouter, Depends
 from sqlalchemy.ext.asyncio import AsyncSession
-from schemas.teachers import TeacherOut, TeacherCreate
+from schemas.stats import TeacherStats
+from schemas.teachers import TeacherOut, TeacherCreate, TeacherUpdate
 
 from core.db import get_db
-from services.teachers import create_teacher, list_teachers
+from services.stats import get_teacher_stats
+from services.teachers import (
+    create_teacher,
+    get_teacher,
+    get_teacher_by_tg_id,
+    list_teachers,
+    update_teacher,
+)
 
 router = APIRouter(prefix="/teachers", tags=["teachers"])
 
@@ -21,3 +29,33 @@ async def list_teachers_endpoint(
     db: Annotated[AsyncSession, Depends(get_db)],
 ) -> list[TeacherOut]:
     return await list_teachers(db)
+
+
+@router.get("/by-tg/{tg_id}")
+async def get_teacher_by_tg_id_endpoint(
+    tg_id: str, db: Annotated[AsyncSession, Depends(get_db)]
+) -> TeacherOut:
+    return await get_teacher_by_tg_id(db, tg_id)
+
+
+@router.get("/{teacher_id}")
+async def get_teacher_endpoint(
+    teacher_id: int, db: Annotated[AsyncSession, Depends(get_db)]
+) -> TeacherOut:
+    return await get_teacher(db, teacher_id)
+
+
+@router.patch("/{teacher_id}")
+async def update_teacher_endpoint(
+    teacher_id: int,
+    payload: TeacherUpdate,
+    db: Annotated[AsyncSession, Depends(get_db)],
+) -> TeacherOut:
+    return await update_teacher(db, teacher_id, payload)
+
+
+@router.get("/{teacher_id}/stats")
+async def get_teacher_stats_endpoint(
+    teacher_id: int, db: Annotated[AsyncSession, Depends(get_db)]
+) -> TeacherStats:
+    return await get_teacher_stats(db, teacher_id)
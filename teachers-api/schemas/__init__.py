@@ -1,6 +1,7 @@
 from .teachers import TeacherCreate, TeacherUpdate, TeacherOut
-from .lessons import LessonCreate, LessonUpdate, LessonOut
+from .lessons import LessonCreate, LessonUpdate, LessonOut, LessonOrderBy
 from .invoices import InvoiceCreate, InvoiceUpdate, InvoiceOut
+from .stats import PeriodStats, MonthStats, InvoiceStats, TeacherStats
 
 __all__ = [
     "TeacherCreate",
@@ -9,7 +10,12 @@ __all__ = [
     "LessonCreate",
     "LessonUpdate",
     "LessonOut",
+    "LessonOrderBy",
     "InvoiceCreate",
     "InvoiceUpdate",
     "InvoiceOut",
+    "PeriodStats",
+    "MonthStats",
+    "InvoiceStats",
+    "TeacherStats",
 ]
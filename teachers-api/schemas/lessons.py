@@ -1,4 +1,5 @@
 from datetime import datetime
+import enum
 from typing import Optional
 
 from pydantic import BaseModel, EmailStr, Field
@@ -6,6 +7,11 @@ from pydantic import BaseModel, EmailStr, Field
 import models
 
 
+class LessonOrderBy(str, enum.Enum):
+    date_time = "date_time"
+    date_time_desc = "-date_time"
+
+
 class LessonBase(BaseModel):
     student_name: str
     teacher_id: int
@@ -0,0 +1,30 @@
+from datetime import date
+
+from pydantic import BaseModel
+
+import models
+
+
+class PeriodStats(BaseModel):
+    lessons: int = 0
+    value: float = 0
+
+
+class MonthStats(PeriodStats):
+    month: date
+
+
+class InvoiceStats(BaseModel):
+    paid: int = 0
+    unpaid: int = 0
+    total: int = 0
+
+
+class TeacherStats(BaseModel):
+    teacher_id: int
+    by_status: dict[models.LessonStatus, PeriodStats]
+    this_month: PeriodStats
+    this_week: PeriodStats
+    last_30_days: PeriodStats
+    by_month: list[MonthStats]
+    invoices: InvoiceStats
@@ -0,0 +1,148 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from loguru import logger
+from sqlalchemy import select, update
+
+import models
+from core.config import settings
+from core.db import AsyncSessionLocal
+from core.notifications import notification_service
+
+
+class EventOutboxRelay:
+    """Публикует события из event_outbox в RabbitMQ.
+
+    Пачка забирается через FOR UPDATE SKIP LOCKED, сдвигает
+    next_attempt_at на время аренды и сразу коммитится, так что
+    публикация идет без открытой транзакции, а реплики API не берут одно
+    событие. Строка помечается sent только после подтверждения брокера;
+    при падении до этого событие уйдет повторно после аренды (доставка
+    at-least-once). Неотправленные события ждут с экспоненциальной
+    задержкой и после EVENT_OUTBOX_MAX_ATTEMPTS попыток становятся failed.
+    """
+
+    def __init__(self):
+        self.batch_size = settings.EVENT_OUTBOX_BATCH_SIZE
+        self.poll_interval = settings.EVENT_OUTBOX_POLL_INTERVAL
+        self.lease = timedelta(seconds=settings.EVENT_OUTBOX_LEASE)
+        self._task: asyncio.Task | None = None
+
+    async def _claim_batch(self) -> list[models.EventOutbox]:
+        now = datetime.now(timezone.utc)
+        outbox = models.EventOutbox
+        async with AsyncSessionLocal(expire_on_commit=False) as db:
+            claimable = (
+                select(outbox.id)
+                .where(
+                    outbox.status == models.OutboxStatus.pending,
+                    outbox.next_attempt_at <= now,
+                )
+                .order_by(outbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result = await db.execute(
+                update(outbox)
+                .where(outbox.id.in_(claimable.scalar_subquery()))
+                .values(next_attempt_at=now + self.lease)
+                .returning(outbox)
+                .execution_options(synchronize_session=False)
+            )
+            events = result.scalars().all()
+            await db.commit()
+            return sorted(events, key=lambda event: event.id)
+
+    def _retry_values(self, event: models.EventOutbox, error: str) -> dict:
+        attempts = event.attempts + 1
+        if attempts >= settings.EVENT_OUTBOX_MAX_ATTEMPTS:
+            logger.error(
+                f"Event {event.id} ({event.event_type}) dropped after "
+                f"{attempts} attempts: {error}"
+            )
+            return dict(
+                status=models.OutboxStatus.failed, attempts=attempts, last_error=error
+            )
+        delay = min(
+            settings.EVENT_OUTBOX_RETRY_MAX,
+            settings.EVENT_OUTBOX_RETRY_BASE * 2 ** (attempts - 1),
+        )
+        logger.warning(
+            f"Event {event.id} ({event.event_type}) not published, "
+            f"retry in {delay}s: {error}"
+        )
+        return dict(
+            attempts=attempts,
+            last_error=error,
+            next_attempt_at=datetime.now(timezone.utc) + timedelta(seconds=delay),
+        )
+
+    async def relay_once(self) -> int:
+        """Публикует одну пачку событий, возвращает число отправленных"""
+        events = await self._claim_batch()
+        if not events:
+            return 0
+
+        results = await asyncio.gather(
+            *(notification_service.publish(event) for event in events),
+            return_exceptions=True,
+        )
+
+        outbox = models.EventOutbox
+        sent_ids = []
+        async with AsyncSessionLocal() as db:
+            for event, result in zip(events, results):
+                if isinstance(result, Exception):
+                    await db.execute(
+                        update(outbox)
+                        .where(outbox.id == event.id)
+                        .values(**self._retry_values(event, str(result)))
+                    )
+                else:
+                    sent_ids.append(event.id)
+            if sent_ids:
+                await db.execute(
+                    update(outbox)
+                    .where(outbox.id.in_(sent_ids))
+                    .values(
+                        status=models.OutboxStatus.sent,
+                        attempts=outbox.attempts + 1,
+                        last_error=None,
+                        sent_at=datetime.now(timezone.utc),
+                    )
+                    .execution_options(synchronize_session=False)
+                )
+            await db.commit()
+
+        if sent_ids:
+            logger.info(f"Published {len(sent_ids)} events from outbox")
+        # Неотправленные события не считаются, чтобы при недоступном
+        # брокере релей ждал poll_interval, а не крутился вхолостую
+        return len(sent_ids)
+
+    async def run(self) -> None:
+        logger.info("Event outbox relay started")
+        while True:
+            try:
+                published = await self.relay_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Event outbox relay error: {e}")
+                published = 0
+            if published < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+# Global event outbox relay instance
+event_outbox_relay = EventOutboxRelay()
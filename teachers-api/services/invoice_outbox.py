@@ -0,0 +1,251 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import httpx
+from loguru import logger
+from sqlalchemy import select, update
+
+import models
+from core.config import settings
+from core.db import AsyncSessionLocal
+from core.notifications import notification_service
+from services.lessons import build_invoice_payload
+from services.stats import apply_monthly_stats_delta
+from tbank.client import (
+    RETRYABLE_STATUS_CODES,
+    CircuitOpenError,
+    invoice_request_id,
+    tbank_client,
+)
+
+LESSON_NOT_CONFIRMED = "Lesson was deleted or is no longer confirmed"
+
+
+class InvoiceOutboxWorker:
+    """Выставляет счета из invoice_outbox пачками.
+
+    Заявки забираются через FOR UPDATE SKIP LOCKED и сдвигают
+    next_attempt_at на время аренды, так что запрос к Т-Банку идет без
+    открытой транзакции, а несколько реплик API не берут одну заявку.
+    Неудачные заявки остаются pending с экспоненциальной задержкой и
+    после INVOICE_OUTBOX_MAX_ATTEMPTS попыток помечаются failed. Счет
+    выставляется, только пока урок существует и подтвержден, и по его
+    текущим данным: снимок payload из заявки заменяется отправленным.
+    """
+
+    def __init__(self):
+        self.batch_size = settings.INVOICE_OUTBOX_BATCH_SIZE
+        self.poll_interval = settings.INVOICE_OUTBOX_POLL_INTERVAL
+        self.lease = timedelta(seconds=settings.INVOICE_OUTBOX_LEASE)
+        self._task: asyncio.Task | None = None
+
+    async def _claim_batch(self) -> list[models.InvoiceOutbox]:
+        now = datetime.now(timezone.utc)
+        outbox = models.InvoiceOutbox
+        async with AsyncSessionLocal(expire_on_commit=False) as db:
+            claimable = (
+                select(outbox.id)
+                .where(
+                    outbox.status == models.OutboxStatus.pending,
+                    outbox.next_attempt_at <= now,
+                )
+                .order_by(outbox.id)
+                .limit(self.batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            result = await db.execute(
+                update(outbox)
+                .where(outbox.id.in_(claimable.scalar_subquery()))
+                .values(next_attempt_at=now + self.lease)
+                .returning(outbox)
+                .execution_options(synchronize_session=False)
+            )
+            entries = result.scalars().all()
+            await db.commit()
+            return entries
+
+    async def _current_payloads(
+        self, entries: list[models.InvoiceOutbox]
+    ) -> dict[int, dict]:
+        """Тела запросов по текущим урокам и учителям пачки (по lesson_id).
+
+        Цена урока или реквизиты учителя могли измениться после
+        подтверждения. Уроков, которые update_lesson вернул в planned или
+        delete_lesson удалил, в результате нет.
+        """
+        if not entries:
+            return {}
+        lesson, teacher = models.Lesson, models.Teacher
+        async with AsyncSessionLocal() as db:
+            result = await db.execute(
+                select(lesson, teacher)
+                .join(teacher, lesson.teacher_id == teacher.id)
+                .where(
+                    lesson.id.in_([entry.lesson_id for entry in entries]),
+                    lesson.status == models.LessonStatus.confirmed,
+                )
+            )
+            return {
+                item.id: build_invoice_payload(item, owner)
+                for item, owner in result.all()
+            }
+
+    async def _issue(self, entry: models.InvoiceOutbox, payload: dict) -> None:
+        try:
+            resp = await tbank_client.send_invoice(
+                payload, invoice_request_id(entry.lesson_id)
+            )
+            invoice_data = tbank_client.parse_invoice_response(resp)
+            if not invoice_data["pdf_url"] or not invoice_data["tbank_invoice_id"]:
+                raise ValueError("T-Bank не вернул необходимые данные")
+        except CircuitOpenError as e:
+            await self._reschedule(entry, str(e), count_attempt=False)
+            return
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code in RETRYABLE_STATUS_CODES:
+                await self._reschedule(entry, str(e))
+            else:
+                await self._fail(entry, str(e))
+            return
+        except Exception as e:
+            await self._reschedule(entry, str(e))
+            return
+
+        await self._complete(entry, invoice_data, payload)
+
+    async def _complete(
+        self, entry: models.InvoiceOutbox, invoice_data: dict, payload: dict
+    ) -> None:
+        now = datetime.now(timezone.utc)
+        async with AsyncSessionLocal() as db:
+            # Блокировка урока не дает update_lesson сменить статус, пока
+            # счет записывается
+            lesson = await db.get(models.Lesson, entry.lesson_id, with_for_update=True)
+            if lesson is None or lesson.status != models.LessonStatus.confirmed:
+                await db.rollback()
+                await self._fail(entry, LESSON_NOT_CONFIRMED)
+                return
+
+            db.add(
+                models.Invoice(
+                    lesson_id=entry.lesson_id,
+                    teacher_id=entry.teacher_id,
+                    tbank_invoice_id=invoice_data["tbank_invoice_id"],
+                    pdf_url=invoice_data["pdf_url"],
+                    incoming_invoice_url=invoice_data["incoming_invoice_url"],
+                    created_at=now,
+                )
+            )
+            await apply_monthly_stats_delta(
+                db, entry.teacher_id, now, unpaid_invoices=1
+            )
+            await db.execute(
+                update(models.InvoiceOutbox)
+                .where(models.InvoiceOutbox.id == entry.id)
+                .values(
+                    status=models.OutboxStatus.sent,
+                    payload=payload,
+                    attempts=entry.attempts + 1,
+                    last_error=None,
+                    processed_at=now,
+                )
+            )
+            lesson_data = {
+                "id": lesson.id,
+                "student_name": lesson.student_name,
+                "date_time": lesson.date_time.isoformat(),
+                "price": str(lesson.price),
+            }
+            await notification_service.lesson_confirmed(
+                db, lesson_data, entry.teacher_id
+            )
+            await db.commit()
+
+        logger.info(f"Invoice issued for lesson {entry.lesson_id}")
+
+    async def _reschedule(
+        self, entry: models.InvoiceOutbox, error: str, count_attempt: bool = True
+    ) -> None:
+        attempts = entry.attempts + 1 if count_attempt else entry.attempts
+        if attempts >= settings.INVOICE_OUTBOX_MAX_ATTEMPTS:
+            await self._fail(entry, f"Gave up after {attempts} attempts: {error}")
+            return
+        delay = min(
+            settings.INVOICE_OUTBOX_RETRY_MAX,
+            settings.INVOICE_OUTBOX_RETRY_BASE * 2 ** max(attempts - 1, 0),
+        )
+        logger.warning(
+            f"Invoice for lesson {entry.lesson_id} postponed by {delay}s: {error}"
+        )
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(models.InvoiceOutbox)
+                .where(models.InvoiceOutbox.id == entry.id)
+                .values(
+                    attempts=attempts,
+                    last_error=error,
+                    next_attempt_at=datetime.now(timezone.utc)
+                    + timedelta(seconds=delay),
+                )
+            )
+            await db.commit()
+
+    async def _fail(self, entry: models.InvoiceOutbox, error: str) -> None:
+        logger.error(f"Invoice for lesson {entry.lesson_id} rejected: {error}")
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                update(models.InvoiceOutbox)
+                .where(models.InvoiceOutbox.id == entry.id)
+                .values(
+                    status=models.OutboxStatus.failed,
+                    attempts=entry.attempts + 1,
+                    last_error=error,
+                    processed_at=datetime.now(timezone.utc),
+                )
+            )
+            await db.commit()
+
+    async def drain_once(self) -> int:
+        """Обрабатывает одну пачку заявок, возвращает ее размер"""
+        entries = await self._claim_batch()
+        payloads = await self._current_payloads(entries)
+        results = await asyncio.gather(
+            *(
+                self._issue(entry, payloads[entry.lesson_id])
+                if entry.lesson_id in payloads
+                else self._fail(entry, LESSON_NOT_CONFIRMED)
+                for entry in entries
+            ),
+            return_exceptions=True,
+        )
+        for entry, result in zip(entries, results):
+            if isinstance(result, Exception):
+                logger.error(f"Invoice for lesson {entry.lesson_id} failed: {result}")
+        return len(entries)
+
+    async def run(self) -> None:
+        logger.info("Invoice outbox worker started")
+        while True:
+            try:
+                processed = await self.drain_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Invoice outbox worker error: {e}")
+                processed = 0
+            if processed < self.batch_size:
+                await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+# Global invoice outbox worker instance
+invoice_outbox_worker = InvoiceOutboxWorker()
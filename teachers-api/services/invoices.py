@@ -5,6 +5,7 @@ from fastapi import HTTPException
 
 import models
 from core.notifications import notification_service
+from services.stats import apply_monthly_stats_delta
 
 
 async def get_invoice(db: AsyncSession, invoice_id: int) -> models.Invoice:
@@ -46,18 +47,28 @@ async def update_invoice_status(
     old_status = invoice.status
     invoice.status = status
     db.add(invoice)
-    await db.commit()
-    await db.refresh(invoice)
-    
-    # Send notification if invoice was marked as paid
+
+    if old_status != status:
+        paid_delta = 1 if status == models.InvoiceStatus.paid else -1
+        await apply_monthly_stats_delta(
+            db,
+            invoice.teacher_id,
+            invoice.created_at,
+            paid_invoices=paid_delta,
+            unpaid_invoices=-paid_delta,
+        )
+
+    # Событие оплаты фиксируется вместе со статусом счета
     if old_status != models.InvoiceStatus.paid and status == models.InvoiceStatus.paid:
         invoice_data = {
             "id": invoice.id,
             "lesson_id": invoice.lesson_id,
             "tbank_invoice_id": invoice.tbank_invoice_id
         }
-        await notification_service.invoice_paid(invoice_data, invoice.teacher_id)
+        await notification_service.invoice_paid(db, invoice_data, invoice.teacher_id)
 
+    await db.commit()
+    await db.refresh(invoice)
     return invoice
 
 
@@ -67,6 +78,13 @@ async def delete_invoice(db: AsyncSession, invoice_id: int) -> dict:
     if not invoice:
         raise HTTPException(404, "Invoice not found")
 
+    await apply_monthly_stats_delta(
+        db,
+        invoice.teacher_id,
+        invoice.created_at,
+        paid_invoices=-int(invoice.status == models.InvoiceStatus.paid),
+        unpaid_invoices=-int(invoice.status == models.InvoiceStatus.unpaid),
+    )
     await db.delete(invoice)
     await db.commit()
     return {"ok": True}
@@ -1,14 +1,23 @@
-from datetime import timedelta
-from typing import List
+import base64
+from datetime import datetime, timedelta
+from typing import List, Optional
 
 from fastapi import HTTPException
-from sqlalchemy import select
+from sqlalchemy import select, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from models import Lesson, LessonStatus, Teacher, Invoice
-from schemas.lessons import LessonCreate, LessonUpdate
-from tbank.client import TBankClient
+from models import (
+    Invoice,
+    InvoiceOutbox,
+    Lesson,
+    LessonStatus,
+    LessonType,
+    OutboxStatus,
+    Teacher,
+)
+from schemas.lessons import LessonCreate, LessonOrderBy, LessonUpdate
 from core.notifications import notification_service
+from services.stats import apply_lesson_stats_delta
 
 
 async def create_lesson(db: AsyncSession, payload: LessonCreate) -> Lesson:
@@ -19,12 +28,15 @@ async def create_lesson(db: AsyncSession, payload: LessonCreate) -> Lesson:
     if not teacher:
         raise HTTPException(404, "Teacher not found")
 
-    lesson = Lesson(**payload.model_dump())
+    lesson = Lesson(**payload.model_dump(), status=LessonStatus.planned)
     db.add(lesson)
-    await db.commit()
-    await db.refresh(lesson)
+    await db.flush()
+
+    await apply_lesson_stats_delta(
+        db, lesson.teacher_id, lesson.status, lesson.date_time, lesson.price
+    )
 
-    # Send notification
+    # Событие пишется в event_outbox в той же транзакции
     lesson_data = {
         "id": lesson.id,
         "student_name": lesson.student_name,
@@ -32,8 +44,10 @@ async def create_lesson(db: AsyncSession, payload: LessonCreate) -> Lesson:
         "price": str(lesson.price),
         "type": lesson.type
     }
-    await notification_service.lesson_created(lesson_data, lesson.teacher_id)
+    await notification_service.lesson_created(db, lesson_data, lesson.teacher_id)
 
+    await db.commit()
+    await db.refresh(lesson)
     return lesson
 
 
@@ -45,9 +59,64 @@ async def get_lesson(db: AsyncSession, lesson_id: int) -> Lesson:
     return lesson
 
 
-async def list_lessons(db: AsyncSession, teacher_id: int) -> List[Lesson]:
-    """Получает список уроков для учителя"""
-    result = await db.execute(select(Lesson).filter(Lesson.teacher_id == teacher_id))
+def encode_lesson_cursor(lesson: Lesson) -> str:
+    """Кодирует позицию урока (date_time, id) в курсор для keyset-пагинации"""
+    raw = f"{lesson.date_time.isoformat()}|{lesson.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_lesson_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        date_time, lesson_id = raw.rsplit("|", 1)
+        return datetime.fromisoformat(date_time), int(lesson_id)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+
+
+async def list_lessons(
+    db: AsyncSession,
+    teacher_id: int,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    status: Optional[LessonStatus] = None,
+    lesson_type: Optional[LessonType] = None,
+    order_by: LessonOrderBy = LessonOrderBy.date_time,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> List[Lesson]:
+    """Получает список уроков для учителя.
+
+    Окно по дате [date_from, date_to) и сортировка выполняются в БД по индексу
+    (teacher_id, date_time); cursor продолжает выдачу после последнего урока
+    предыдущей страницы.
+    """
+    query = select(Lesson).where(Lesson.teacher_id == teacher_id)
+
+    if date_from is not None:
+        query = query.where(Lesson.date_time >= date_from)
+    if date_to is not None:
+        query = query.where(Lesson.date_time < date_to)
+    if status is not None:
+        query = query.where(Lesson.status == status)
+    if lesson_type is not None:
+        query = query.where(Lesson.type == lesson_type)
+
+    descending = order_by == LessonOrderBy.date_time_desc
+    if cursor:
+        position = tuple_(Lesson.date_time, Lesson.id)
+        after = tuple_(*_decode_lesson_cursor(cursor))
+        query = query.where(position < after if descending else position > after)
+
+    if descending:
+        query = query.order_by(Lesson.date_time.desc(), Lesson.id.desc())
+    else:
+        query = query.order_by(Lesson.date_time, Lesson.id)
+
+    if limit is not None:
+        query = query.limit(limit)
+
+    result = await db.execute(query)
     return result.scalars().all()
 
 
@@ -61,28 +130,48 @@ async def update_lesson(
 
     data = payload.model_dump(exclude_unset=True)
     date_time_changed = "date_time" in data
+    old_status, old_date_time, old_price = (
+        lesson.status,
+        lesson.date_time,
+        lesson.price,
+    )
 
     # Применяем изменения
     for k, v in data.items():
         setattr(lesson, k, v)
 
-    # Если изменилось время, сбрасываем статус подтверждения
+    # Если изменилось время, сбрасываем статус подтверждения и напоминание
     if date_time_changed:
         lesson.status = LessonStatus.planned
+        lesson.last_reminded_at = None
+
+    # Переносим вклад урока в помесячной сводке
+    if (old_status, old_date_time, old_price) != (
+        lesson.status,
+        lesson.date_time,
+        lesson.price,
+    ):
+        await apply_lesson_stats_delta(
+            db, lesson.teacher_id, old_status, old_date_time, old_price, sign=-1
+        )
+        await apply_lesson_stats_delta(
+            db, lesson.teacher_id, lesson.status, lesson.date_time, lesson.price
+        )
 
     db.add(lesson)
-    await db.commit()
-    await db.refresh(lesson)
 
-    # Send notification
     lesson_data = {
         "id": lesson.id,
         "student_name": lesson.student_name,
         "date_time": lesson.date_time.isoformat(),
         "price": str(lesson.price)
     }
-    await notification_service.lesson_updated(lesson_data, lesson.teacher_id, data)
+    await notification_service.lesson_updated(
+        db, lesson_data, lesson.teacher_id, data
+    )
 
+    await db.commit()
+    await db.refresh(lesson)
     return lesson
 
 
@@ -101,36 +190,20 @@ async def delete_lesson(db: AsyncSession, lesson_id: int) -> dict:
     }
     teacher_id = lesson.teacher_id
 
+    await apply_lesson_stats_delta(
+        db, teacher_id, lesson.status, lesson.date_time, lesson.price, sign=-1
+    )
+
     await db.delete(lesson)
+    await notification_service.lesson_cancelled(db, lesson_data, teacher_id)
     await db.commit()
-    
-    # Send notification
-    await notification_service.lesson_cancelled(lesson_data, teacher_id)
-    
-    return {"ok": True}
-
 
-async def confirm_lesson(db: AsyncSession, lesson_id: int) -> Lesson:
-    """Подтверждает урок и создает счет"""
-    lesson = await db.get(Lesson, lesson_id)
-    if not lesson:
-        raise HTTPException(404, "Lesson not found")
-
-    if lesson.status != LessonStatus.planned:
-        raise HTTPException(409, "Lesson not in confirmable state")
-
-    # Проверяем, не существует ли уже счет для этого урока
-    from sqlalchemy import select
-    existing_invoice = await db.execute(
-        select(Invoice).where(Invoice.lesson_id == lesson_id)
-    )
-    if existing_invoice.scalars().first():
-        raise HTTPException(409, "Invoice already exists for this lesson")
+    return {"ok": True}
 
-    teacher = await db.get(Teacher, lesson.teacher_id)
 
-    # Создаем счет через Т-Банк
-    invoice_payload = {
+def build_invoice_payload(lesson: Lesson, teacher: Teacher) -> dict:
+    """Тело запроса на выставление счета в Т-Банке"""
+    return {
         "invoiceNumber": str(lesson.id),
         "dueDate": (lesson.date_time.date() + timedelta(days=10)).isoformat(),
         "invoiceDate": lesson.date_time.date().isoformat(),
@@ -159,42 +232,63 @@ async def confirm_lesson(db: AsyncSession, lesson_id: int) -> Lesson:
         "customPaymentPurpose": f"тест",
     }
 
-    client = TBankClient()
-    try:
-        resp = client.send_invoice(invoice_payload)
-        invoice_data = client.parse_invoice_response(resp)
-
-        # Проверяем, что получили все необходимые данные
-        if not invoice_data["pdf_url"] or not invoice_data["tbank_invoice_id"]:
-            raise HTTPException(502, "T-Bank не вернул необходимые данные")
-
-    except Exception as e:
-        raise HTTPException(502, f"T-Bank error: {e}")
-
-    # Создаем запись о счете
-    invoice = Invoice(
-        lesson_id=lesson.id,
-        teacher_id=teacher.id,
-        tbank_invoice_id=invoice_data["tbank_invoice_id"],
-        pdf_url=invoice_data["pdf_url"],
-        incoming_invoice_url=invoice_data["incoming_invoice_url"],
+
+async def confirm_lesson(db: AsyncSession, lesson_id: int) -> Lesson:
+    """Подтверждает урок и ставит выставление счета в очередь.
+
+    Статус урока и заявка в invoice_outbox фиксируются одной транзакцией;
+    счет в Т-Банке создает воркер services.invoice_outbox. Повторное
+    подтверждение идемпотентно: уже подтвержденный урок возвращается как
+    есть, а необработанная заявка урока используется повторно.
+    """
+    lesson = await db.get(Lesson, lesson_id)
+    if not lesson:
+        raise HTTPException(404, "Lesson not found")
+
+    if lesson.status == LessonStatus.confirmed:
+        return lesson
+
+    if lesson.status != LessonStatus.planned:
+        raise HTTPException(409, "Lesson not in confirmable state")
+
+    # Проверяем, не существует ли уже счет или заявка для этого урока
+    existing_invoice = await db.execute(
+        select(Invoice.id).where(Invoice.lesson_id == lesson_id)
     )
-    db.add(invoice)
+    if existing_invoice.first():
+        raise HTTPException(409, "Invoice already exists for this lesson")
+
+    pending_invoice = await db.execute(
+        select(InvoiceOutbox.id).where(
+            InvoiceOutbox.lesson_id == lesson_id,
+            InvoiceOutbox.status == OutboxStatus.pending,
+        )
+    )
+    teacher = await db.get(Teacher, lesson.teacher_id)
+
+    # Заявка остается, если урок вернули в planned и подтвердили снова до
+    # ее обработки; тело запроса воркер все равно собирает заново
+    if not pending_invoice.first():
+        db.add(
+            InvoiceOutbox(
+                lesson_id=lesson.id,
+                teacher_id=teacher.id,
+                payload=build_invoice_payload(lesson, teacher),
+            )
+        )
 
     # Обновляем статус урока
     lesson.status = LessonStatus.confirmed
     db.add(lesson)
 
+    await apply_lesson_stats_delta(
+        db, teacher.id, LessonStatus.planned, lesson.date_time, lesson.price, sign=-1
+    )
+    await apply_lesson_stats_delta(
+        db, teacher.id, lesson.status, lesson.date_time, lesson.price
+    )
+
     await db.commit()
     await db.refresh(lesson)
 
-    # Send notification
-    lesson_data = {
-        "id": lesson.id,
-        "student_name": lesson.student_name,
-        "date_time": lesson.date_time.isoformat(),
-        "price": str(lesson.price)
-    }
-    await notification_service.lesson_confirmed(lesson_data, lesson.teacher_id)
-
     return lesson
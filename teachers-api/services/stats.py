@@ -0,0 +1,175 @@
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import models
+from schemas.stats import (
+    InvoiceStats,
+    MonthStats,
+    PeriodStats,
+    TeacherStats,
+)
+from services.teachers import get_teacher
+
+
+def _month_key(moment: datetime) -> date:
+    """Месяц сводки (в UTC), к которому относится момент времени"""
+    if moment.tzinfo is not None:
+        moment = moment.astimezone(timezone.utc)
+    return date(moment.year, moment.month, 1)
+
+
+async def apply_monthly_stats_delta(
+    db: AsyncSession,
+    teacher_id: int,
+    moment: datetime,
+    confirmed_lessons: int = 0,
+    confirmed_value: float = 0,
+    planned_lessons: int = 0,
+    planned_value: float = 0,
+    cancelled_lessons: int = 0,
+    cancelled_value: float = 0,
+    paid_invoices: int = 0,
+    unpaid_invoices: int = 0,
+) -> None:
+    """Добавляет приращение к помесячной сводке учителя.
+
+    Выполняется в текущей транзакции сессии, поэтому сводка фиксируется
+    вместе с изменением урока или счета.
+    """
+    table = models.TeacherMonthlyStats
+    query = insert(table).values(
+        teacher_id=teacher_id,
+        month=_month_key(moment),
+        confirmed_lessons=confirmed_lessons,
+        confirmed_value=confirmed_value,
+        planned_lessons=planned_lessons,
+        planned_value=planned_value,
+        cancelled_lessons=cancelled_lessons,
+        cancelled_value=cancelled_value,
+        paid_invoices=paid_invoices,
+        unpaid_invoices=unpaid_invoices,
+    )
+    columns = (
+        "confirmed_lessons",
+        "confirmed_value",
+        "planned_lessons",
+        "planned_value",
+        "cancelled_lessons",
+        "cancelled_value",
+        "paid_invoices",
+        "unpaid_invoices",
+    )
+    query = query.on_conflict_do_update(
+        index_elements=[table.teacher_id, table.month],
+        set_={
+            column: getattr(table, column) + getattr(query.excluded, column)
+            for column in columns
+        },
+    )
+    await db.execute(query)
+
+
+async def apply_lesson_stats_delta(
+    db: AsyncSession,
+    teacher_id: int,
+    status: models.LessonStatus,
+    moment: datetime,
+    price: float,
+    sign: int = 1,
+) -> None:
+    """Добавляет (sign=1) или убирает (sign=-1) урок из сводки его статуса"""
+    await apply_monthly_stats_delta(
+        db,
+        teacher_id,
+        moment,
+        **{f"{status.value}_lessons": sign, f"{status.value}_value": sign * price},
+    )
+
+
+def _period_columns(name: str, condition):
+    """count/sum уроков, попадающих под condition"""
+    return (
+        func.count().filter(condition).label(f"{name}_lessons"),
+        func.coalesce(func.sum(models.Lesson.price).filter(condition), 0).label(
+            f"{name}_value"
+        ),
+    )
+
+
+async def get_teacher_stats(db: AsyncSession, teacher_id: int) -> TeacherStats:
+    """Считает финансовую статистику учителя.
+
+    Уроки по статусам и счета читаются из помесячной сводки
+    teacher_monthly_stats (O(месяцев)). Из lessons берутся только
+    подтвержденные уроки с начала недели или за последние 30 дней —
+    для окон «неделя» и «30 дней», считаемых через FILTER.
+    """
+    await get_teacher(db, teacher_id)
+
+    now = datetime.now(timezone.utc)
+    week_start = (now - timedelta(days=now.weekday())).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    last_30_days_start = now - timedelta(days=30)
+    window_start = min(week_start, last_30_days_start)
+
+    rollup = models.TeacherMonthlyStats
+    result = await db.execute(
+        select(rollup).where(rollup.teacher_id == teacher_id).order_by(rollup.month)
+    )
+    months = result.scalars().all()
+
+    lesson = models.Lesson
+    result = await db.execute(
+        select(
+            *_period_columns("this_week", lesson.date_time >= week_start),
+            *_period_columns("last_30_days", lesson.date_time >= last_30_days_start),
+        ).where(
+            lesson.teacher_id == teacher_id,
+            lesson.status == models.LessonStatus.confirmed,
+            lesson.date_time >= window_start,
+        )
+    )
+    row = result.one()
+    this_week = PeriodStats(lessons=row.this_week_lessons, value=row.this_week_value)
+    last_30_days = PeriodStats(
+        lessons=row.last_30_days_lessons, value=row.last_30_days_value
+    )
+
+    by_status = {
+        status: PeriodStats(
+            lessons=sum(getattr(item, f"{status.value}_lessons") for item in months),
+            value=sum(getattr(item, f"{status.value}_value") for item in months),
+        )
+        for status in models.LessonStatus
+    }
+    by_month = [
+        MonthStats(
+            month=item.month,
+            lessons=item.confirmed_lessons,
+            value=item.confirmed_value,
+        )
+        for item in months
+        if item.confirmed_lessons
+    ]
+
+    current_month = _month_key(now)
+    this_month = next(
+        (item for item in by_month if item.month == current_month), PeriodStats()
+    )
+
+    paid = sum(item.paid_invoices for item in months)
+    unpaid = sum(item.unpaid_invoices for item in months)
+
+    return TeacherStats(
+        teacher_id=teacher_id,
+        by_status=by_status,
+        this_month=PeriodStats(lessons=this_month.lessons, value=this_month.value),
+        this_week=this_week,
+        last_30_days=last_30_days,
+        by_month=by_month,
+        invoices=InvoiceStats(paid=paid, unpaid=unpaid, total=paid + unpaid),
+    )
@@ -20,18 +20,19 @@ async def create_teacher(db: AsyncSession, payload: TeacherCreate) -> models.Tea
 
     teacher = models.Teacher(**payload.model_dump())
     db.add(teacher)
-    await db.commit()
-    await db.refresh(teacher)
-    
-    # Send notification
+    await db.flush()
+
+    # Событие пишется в event_outbox в той же транзакции
     teacher_data = {
         "id": teacher.id,
         "full_name": teacher.full_name,
         "email": teacher.email,
         "tg_id": teacher.tg_id
     }
-    await notification_service.teacher_registered(teacher_data)
-    
+    await notification_service.teacher_registered(db, teacher_data)
+
+    await db.commit()
+    await db.refresh(teacher)
     return teacher
 
 
@@ -43,6 +44,17 @@ async def get_teacher(db: AsyncSession, teacher_id: int) -> models.Teacher:
     return teacher
 
 
+async def get_teacher_by_tg_id(db: AsyncSession, tg_id: str) -> models.Teacher:
+    """Получает учителя по Telegram ID (уникальный индекс ix_teachers_tg_id)"""
+    result = await db.execute(
+        select(models.Teacher).where(models.Teacher.tg_id == tg_id)
+    )
+    teacher = result.scalar_one_or_none()
+    if not teacher:
+        raise HTTPException(404, "Teacher not found")
+    return teacher
+
+
 async def list_teachers(db: AsyncSession) -> List[models.Teacher]:
     """Получает список всех учителей"""
     result = await db.execute(select(models.Teacher))
@@ -1,24 +1,144 @@
-import httpx
+import asyncio
+import random
+import time
 import uuid
 
+import httpx
+from loguru import logger
+
 from core.config import settings
 
+# Пространство имен для детерминированных X-Request-Id: повтор запроса
+# по тому же уроку получает тот же ключ и не создает второй счет
+INVOICE_REQUEST_NAMESPACE = uuid.UUID("6f1c2a4e-3b7d-4c55-9a8e-2d4b0f7c1e93")
+
+RETRYABLE_STATUS_CODES = {408, 425, 429, 500, 502, 503, 504}
+
+
+def invoice_request_id(lesson_id: int) -> str:
+    """Стабильный ключ идемпотентности счета для урока"""
+    return str(uuid.uuid5(INVOICE_REQUEST_NAMESPACE, f"lesson-invoice:{lesson_id}"))
+
+
+class CircuitOpenError(Exception):
+    """Т-Банк временно недоступен, запросы не отправляются"""
+
+
+class CircuitBreaker:
+    """Размыкается после failure_threshold подряд неудачных запросов и
+    через reset_timeout секунд пропускает один пробный запрос. Пока проба
+    не завершилась, остальные вызовы отклоняются, как при разомкнутой цепи.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        if self._opened_at is None:
+            return False
+        return time.monotonic() - self._opened_at < self.reset_timeout
+
+    def before_call(self) -> bool:
+        """Пропускает вызов или бросает CircuitOpenError; True — это проба"""
+        if self._opened_at is None:
+            return False
+        if self.is_open or self._probing:
+            raise CircuitOpenError("T-Bank circuit is open")
+        self._probing = True
+        return True
+
+    def after_call(self, probe: bool) -> None:
+        """Освобождает пробу, закончившуюся без вердикта (4xx, отмена)"""
+        if probe:
+            self._probing = False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._probing = False
+        self._failures += 1
+        if self._failures >= self.failure_threshold:
+            if not self.is_open:
+                logger.warning(
+                    f"T-Bank circuit opened after {self._failures} failures"
+                )
+            self._opened_at = time.monotonic()
+
 
 class TBankClient:
-    def __init__(self, token: str | None = None):
-        self.base_url = "https://business.tbank.ru/openapi/sandbox/api/v1/invoice/send"
+    def __init__(self, token: str | None = None, base_url: str | None = None):
+        self.base_url = base_url or settings.TBANK_INVOICE_URL
         self.token = token or settings.TINKOFF_TOKEN
-        self._client = httpx.Client(timeout=20.0)
+        self.max_retries = settings.TBANK_MAX_RETRIES
+        self.breaker = CircuitBreaker(
+            settings.TBANK_CIRCUIT_FAILURE_THRESHOLD,
+            settings.TBANK_CIRCUIT_RESET_TIMEOUT,
+        )
+        self._client = httpx.AsyncClient(
+            timeout=settings.TBANK_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=settings.TBANK_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.TBANK_MAX_CONNECTIONS,
+            ),
+        )
+
+    def _backoff(self, attempt: int) -> float:
+        """Экспоненциальная задержка с полным джиттером"""
+        cap = min(settings.TBANK_BACKOFF_MAX, settings.TBANK_BACKOFF_BASE * 2**attempt)
+        return random.uniform(0, cap)
 
-    def send_invoice(self, payload: dict) -> dict:
+    async def send_invoice(self, payload: dict, request_id: str) -> dict:
+        """Отправляет счет; повторы идут с тем же X-Request-Id"""
+        probe = self.breaker.before_call()
+        try:
+            return await self._send_invoice(payload, request_id)
+        finally:
+            self.breaker.after_call(probe)
+
+    async def _send_invoice(self, payload: dict, request_id: str) -> dict:
         headers = {
             "Authorization": f"Bearer {self.token}",
             "Content-Type": "application/json",
-            "X-Request-Id": str(uuid.uuid4()),
+            "X-Request-Id": request_id,
         }
-        resp = self._client.post(self.base_url, json=payload, headers=headers)
-        resp.raise_for_status()
-        return resp.json()
+        for attempt in range(self.max_retries + 1):
+            try:
+                resp = await self._client.post(
+                    self.base_url, json=payload, headers=headers
+                )
+                if (
+                    resp.status_code in RETRYABLE_STATUS_CODES
+                    and attempt < self.max_retries
+                ):
+                    logger.warning(
+                        f"T-Bank returned {resp.status_code} for {request_id}, retrying"
+                    )
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                resp.raise_for_status()
+            except httpx.TransportError as e:
+                if attempt < self.max_retries:
+                    logger.warning(f"T-Bank transport error for {request_id}: {e}")
+                    await asyncio.sleep(self._backoff(attempt))
+                    continue
+                self.breaker.record_failure()
+                raise
+            except httpx.HTTPStatusError as e:
+                # Ошибки клиента (4xx) не говорят о недоступности банка
+                if e.response.status_code in RETRYABLE_STATUS_CODES:
+                    self.breaker.record_failure()
+                raise
+
+            self.breaker.record_success()
+            return resp.json()
 
     def parse_invoice_response(self, response: dict) -> dict:
         """Парсит ответ от Т-Банка и возвращает структурированные данные"""
@@ -27,3 +147,10 @@ class TBankClient:
             "tbank_invoice_id": response.get("invoiceId", ""),
             "incoming_invoice_url": response.get("incomingInvoiceUrl", ""),
         }
+
+    async def close(self):
+        await self._client.aclose()
+
+
+# Общий клиент на время жизни приложения
+tbank_client = TBankClient()
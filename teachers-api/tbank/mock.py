@@ -0,0 +1,160 @@
+"""Локальная заглушка Т-Банка для проверки клиента под нагрузкой.
+
+Запуск заглушки:
+    python -m tbank.mock serve --port 8090 --latency 0.5 --failure-rate 0.2
+
+Параллельные подтверждения через API (у запущенного teachers-api
+TBANK_INVOICE_URL должен указывать на заглушку, например
+http://127.0.0.1:8090/invoice/send):
+    python -m tbank.mock load --api http://127.0.0.1:8000 --lessons 200 \
+        --concurrency 50 --repeats 2
+
+load создает учителя и уроки, подтверждает их через POST
+/lessons/{id}/confirm и ждет, пока воркер invoice_outbox выставит счета,
+то есть проходит весь путь подтверждение → outbox → Т-Банк. Повторные
+подтверждения (--repeats) идемпотентны, а заглушка отвечает одинаковым
+invoiceId на повтор с тем же X-Request-Id, поэтому invoices в отчете
+должно совпадать с числом уроков. Учитель и уроки остаются в базе.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import httpx
+
+from fastapi import FastAPI, Header, HTTPException
+
+app = FastAPI(title="T-Bank mock")
+app.state.latency = 0.0
+app.state.failure_rate = 0.0
+app.state.invoices = {}
+app.state.requests = 0
+
+
+@app.post("/invoice/send")
+async def send_invoice(payload: dict, x_request_id: str = Header(...)):
+    app.state.requests += 1
+    await asyncio.sleep(app.state.latency)
+    if random.random() < app.state.failure_rate:
+        raise HTTPException(503, "Service unavailable")
+
+    invoice_id = app.state.invoices.setdefault(x_request_id, str(uuid.uuid4()))
+    return {
+        "invoiceId": invoice_id,
+        "pdfUrl": f"https://tbank.local/invoices/{invoice_id}.pdf",
+        "incomingInvoiceUrl": f"https://tbank.local/incoming/{invoice_id}",
+    }
+
+
+@app.get("/stats")
+async def stats():
+    return {"requests": app.state.requests, "invoices": len(app.state.invoices)}
+
+
+async def _load(
+    api: str, lessons: int, concurrency: int, repeats: int, timeout: float
+) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async with httpx.AsyncClient(base_url=api, timeout=60) as client:
+        resp = await client.post(
+            "/teachers",
+            json={
+                "full_name": "T-Bank Load",
+                "tg_id": f"tbank-mock-load-{os.getpid()}-{int(time.time())}",
+                "bank_account": "40802810000000000000",
+            },
+        )
+        resp.raise_for_status()
+        teacher_id = resp.json()["id"]
+
+        date_time = (datetime.now(timezone.utc) - timedelta(hours=2)).isoformat()
+        lesson_ids = []
+        for index in range(lessons):
+            resp = await client.post(
+                "/lessons",
+                json={
+                    "student_name": f"Student {index}",
+                    "teacher_id": teacher_id,
+                    "price": 1000,
+                    "date_time": date_time,
+                },
+            )
+            resp.raise_for_status()
+            lesson_ids.append(resp.json()["id"])
+
+        async def confirm(lesson_id: int) -> None:
+            nonlocal errors
+            async with semaphore:
+                started = time.perf_counter()
+                resp = await client.post(f"/lessons/{lesson_id}/confirm")
+                if resp.is_error:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(confirm(lesson_id) for _ in range(repeats) for lesson_id in lesson_ids)
+        )
+        confirmed = time.perf_counter() - started
+
+        # Счета выставляет фоновый воркер API, ждем их появления
+        invoices = 0
+        deadline = time.monotonic() + timeout
+        while invoices < lessons and time.monotonic() < deadline:
+            resp = await client.get(f"/invoices/teacher/{teacher_id}")
+            resp.raise_for_status()
+            invoices = len(resp.json())
+            if invoices < lessons:
+                await asyncio.sleep(0.5)
+        issued = time.perf_counter() - started
+
+    latencies.sort()
+    print(f"teacher:  {teacher_id}")
+    print(f"confirms: {len(latencies)} in {confirmed:.2f}s")
+    print(f"errors:   {errors}")
+    print(f"p50:      {latencies[len(latencies) // 2]:.3f}s")
+    print(f"p95:      {latencies[int(len(latencies) * 0.95)]:.3f}s")
+    print(f"invoices: {invoices}/{lessons} in {issued:.2f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve")
+    serve.add_argument("--port", type=int, default=8090)
+    serve.add_argument("--latency", type=float, default=0.0)
+    serve.add_argument("--failure-rate", type=float, default=0.0)
+
+    load = commands.add_parser("load")
+    load.add_argument("--api", default="http://127.0.0.1:8000")
+    load.add_argument("--lessons", type=int, default=100)
+    load.add_argument("--concurrency", type=int, default=20)
+    load.add_argument("--repeats", type=int, default=1)
+    load.add_argument(
+        "--timeout", type=float, default=300, help="сколько ждать выставления счетов"
+    )
+
+    args = parser.parse_args()
+    if args.command == "serve":
+        import uvicorn
+
+        app.state.latency = args.latency
+        app.state.failure_rate = args.failure_rate
+        uvicorn.run(app, host="127.0.0.1", port=args.port)
+    else:
+        asyncio.run(
+            _load(args.api, args.lessons, args.concurrency, args.repeats, args.timeout)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,7 @@ class Settings(BaseSettings):
     # Teachers API Configuration
     TEACHERS_API_URL: str = "http://localhost:8080"
     TEACHERS_API_TIMEOUT: int = 30
+    TEACHER_CACHE_TTL: int = 300
     
     # RabbitMQ Configuration (for receiving notifications from lesson-checker)
     RABBIT_HOST: str = "localhost"
@@ -1,8 +1,7 @@
 from aiogram import Router, F
 from aiogram.types import CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
-from datetime import datetime, timedelta, timezone
 from loguru import logger
-from typing import List, Dict, Any
+from typing import Dict, Any
 
 from services.api_client import api_client, APIError
 from keyboards.finance import FinanceKeyboards
@@ -22,12 +21,8 @@ async def callback_finance_dashboard(callback: CallbackQuery):
             await callback.answer("❌ Вы не зарегистрированы", show_alert=True)
             return
         
-        # Get teacher's financial data
-        lessons = await api_client.get_lessons(teacher["id"])
-        invoices = await api_client.get_invoices_by_teacher(teacher["id"])
-        
-        # Calculate statistics
-        stats = _calculate_financial_stats(lessons, invoices)
+        # Get teacher's aggregated financial data
+        stats = _financial_stats(await api_client.get_teacher_stats(teacher["id"]))
         
         text = _format_finance_dashboard(stats)
         keyboard = FinanceKeyboards.get_finance_dashboard()
@@ -142,11 +137,7 @@ async def callback_finance_stats(callback: CallbackQuery):
             await callback.answer("❌ Вы не зарегистрированы", show_alert=True)
             return
         
-        lessons = await api_client.get_lessons(teacher["id"])
-        invoices = await api_client.get_invoices_by_teacher(teacher["id"])
-        
-        # Calculate detailed statistics
-        stats = _calculate_detailed_stats(lessons, invoices)
+        stats = _detailed_stats(await api_client.get_teacher_stats(teacher["id"]))
         text = _format_detailed_stats(stats)
         
         keyboard_buttons = [
@@ -173,10 +164,7 @@ async def callback_finance_earnings(callback: CallbackQuery):
             await callback.answer("❌ Вы не зарегистрированы", show_alert=True)
             return
         
-        lessons = await api_client.get_lessons(teacher["id"])
-        
-        # Calculate earnings by period
-        earnings = _calculate_earnings_by_period(lessons)
+        earnings = await api_client.get_teacher_stats(teacher["id"])
         text = _format_earnings_overview(earnings)
         
         keyboard = FinanceKeyboards.get_earnings_period()
@@ -188,36 +176,18 @@ async def callback_finance_earnings(callback: CallbackQuery):
         await callback.answer("⚠️ Ошибка получения доходов", show_alert=True)
 
 
-def _calculate_financial_stats(lessons: List[Dict[str, Any]], invoices: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Calculate financial statistics"""
-    confirmed_lessons = [l for l in lessons if l["status"] == "confirmed"]
-    unpaid_invoices = [i for i in invoices if i["status"] == "unpaid"]
-    paid_invoices = [i for i in invoices if i["status"] == "paid"]
-    
-    # Calculate lesson values (we need to get actual values from lessons)
-    total_confirmed_value = sum(float(lesson["price"]) for lesson in confirmed_lessons)
-    
-    # This month's lessons
-    now = datetime.now(timezone.utc)
-    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    this_month_lessons = []
-    
-    for lesson in confirmed_lessons:
-        lesson_date = datetime.fromisoformat(lesson['date_time'].replace('Z', '+00:00'))
-        if lesson_date >= month_start:
-            this_month_lessons.append(lesson)
-    
-    this_month_value = sum(float(lesson["price"]) for lesson in this_month_lessons)
-    
+def _financial_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Map API stats onto dashboard fields"""
+    confirmed = stats["by_status"]["confirmed"]
     return {
-        "total_lessons": len(lessons),
-        "confirmed_lessons": len(confirmed_lessons),
-        "total_confirmed_value": total_confirmed_value,
-        "this_month_lessons": len(this_month_lessons),
-        "this_month_value": this_month_value,
-        "unpaid_invoices": len(unpaid_invoices),
-        "paid_invoices": len(paid_invoices),
-        "total_invoices": len(invoices)
+        "total_lessons": sum(item["lessons"] for item in stats["by_status"].values()),
+        "confirmed_lessons": confirmed["lessons"],
+        "total_confirmed_value": confirmed["value"],
+        "this_month_lessons": stats["this_month"]["lessons"],
+        "this_month_value": stats["this_month"]["value"],
+        "unpaid_invoices": stats["invoices"]["unpaid"],
+        "paid_invoices": stats["invoices"]["paid"],
+        "total_invoices": stats["invoices"]["total"]
     }
 
 
@@ -240,22 +210,17 @@ def _format_finance_dashboard(stats: Dict[str, Any]) -> str:
     return text
 
 
-def _calculate_detailed_stats(lessons: List[Dict[str, Any]], invoices: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Calculate detailed financial statistics"""
-    # Group lessons by status
-    lesson_stats = {"planned": 0, "confirmed": 0, "cancelled": 0}
-    lesson_values = {"planned": 0, "confirmed": 0, "cancelled": 0}
-    
-    for lesson in lessons:
-        status = lesson["status"]
-        lesson_stats[status] += 1
-        lesson_values[status] += float(lesson["price"])
+def _detailed_stats(stats: Dict[str, Any]) -> Dict[str, Any]:
+    """Map API stats onto detailed statistics fields"""
+    by_status = stats["by_status"]
+    lesson_stats = {status: item["lessons"] for status, item in by_status.items()}
+    lesson_values = {status: item["value"] for status, item in by_status.items()}
     
     # Calculate average lesson price
     avg_price = lesson_values["confirmed"] / max(lesson_stats["confirmed"], 1)
     
     # Payment rate
-    payment_rate = (len([i for i in invoices if i["status"] == "paid"]) / max(len(invoices), 1)) * 100
+    payment_rate = (stats["invoices"]["paid"] / max(stats["invoices"]["total"], 1)) * 100
     
     return {
         "lesson_stats": lesson_stats,
@@ -285,53 +250,21 @@ def _format_detailed_stats(stats: Dict[str, Any]) -> str:
     return text
 
 
-def _calculate_earnings_by_period(lessons: List[Dict[str, Any]]) -> Dict[str, Any]:
-    """Calculate earnings by different periods"""
-    now = datetime.now(timezone.utc)
-    
-    # This month
-    month_start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-    
-    # This week
-    week_start = now - timedelta(days=now.weekday())
-    week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
-    
-    periods = {
-        "this_month": {"start": month_start, "lessons": [], "value": 0},
-        "this_week": {"start": week_start, "lessons": [], "value": 0},
-        "last_30_days": {"start": now - timedelta(days=30), "lessons": [], "value": 0}
-    }
-    
-    for lesson in lessons:
-        if lesson["status"] != "confirmed":
-            continue
-            
-        lesson_date = datetime.fromisoformat(lesson['date_time'].replace('Z', '+00:00'))
-        lesson_value = float(lesson["price"])
-        
-        for period_name, period_data in periods.items():
-            if lesson_date >= period_data["start"]:
-                period_data["lessons"].append(lesson)
-                period_data["value"] += lesson_value
-    
-    return periods
-
-
 def _format_earnings_overview(earnings: Dict[str, Any]) -> str:
     """Format earnings overview"""
     text = "💵 <b>Обзор доходов</b>\n\n"
     
     text += f"📅 <b>За текущий месяц:</b>\n"
     text += f"💰 {earnings['this_month']['value']:,.0f} ₽\n"
-    text += f"📚 {len(earnings['this_month']['lessons'])} уроков\n\n"
+    text += f"📚 {earnings['this_month']['lessons']} уроков\n\n"
     
     text += f"📊 <b>За неделю:</b>\n"
     text += f"💰 {earnings['this_week']['value']:,.0f} ₽\n"
-    text += f"📚 {len(earnings['this_week']['lessons'])} уроков\n\n"
+    text += f"📚 {earnings['this_week']['lessons']} уроков\n\n"
     
     text += f"🗓️ <b>За последние 30 дней:</b>\n"
     text += f"💰 {earnings['last_30_days']['value']:,.0f} ₽\n"
-    text += f"📚 {len(earnings['last_30_days']['lessons'])} уроков\n"
+    text += f"📚 {earnings['last_30_days']['lessons']} уроков\n"
     
     # Calculate daily average for last 30 days
     daily_avg = earnings['last_30_days']['value'] / 30
@@ -1,7 +1,7 @@
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.fsm.context import FSMContext
-from datetime import datetime, date, time
+from datetime import datetime, date, time, timedelta, timezone
 from loguru import logger
 
 from models.states import LessonStates
@@ -81,15 +81,14 @@ async def callback_lessons_today(callback: CallbackQuery):
             await callback.answer("❌ Вы не зарегистрированы", show_alert=True)
             return
         
-        # Get all lessons and filter for today
-        all_lessons = await api_client.get_lessons(teacher["id"])
-        today = date.today()
-        today_lessons = []
-        
-        for lesson in all_lessons:
-            lesson_date = datetime.fromisoformat(lesson['date_time'].replace('Z', '+00:00')).date()
-            if lesson_date == today:
-                today_lessons.append(lesson)
+        # Fetch only today's window, filtered and sorted by the API
+        day_start = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
+        today_lessons = await api_client.get_lessons(
+            teacher["id"],
+            date_from=day_start,
+            date_to=day_start + timedelta(days=1),
+            order_by="date_time",
+        )
         
         text = format_lessons_list(today_lessons, f"Уроки на {format_today_date()}")
         
@@ -126,24 +125,19 @@ async def callback_lessons_week(callback: CallbackQuery):
             await callback.answer("❌ Вы не зарегистрированы", show_alert=True)
             return
         
-        # Get all lessons and filter for this week
-        from datetime import datetime, timedelta, timezone
-        all_lessons = await api_client.get_lessons(teacher["id"])
-        
         # Calculate week start (Monday) and end (Sunday)
         now = datetime.now(timezone.utc)
         week_start = now - timedelta(days=now.weekday())
         week_start = week_start.replace(hour=0, minute=0, second=0, microsecond=0)
         week_end = week_start + timedelta(days=7)
         
-        week_lessons = []
-        for lesson in all_lessons:
-            lesson_date = datetime.fromisoformat(lesson['date_time'].replace('Z', '+00:00'))
-            if week_start <= lesson_date < week_end:
-                week_lessons.append(lesson)
-        
-        # Sort by date
-        week_lessons.sort(key=lambda x: x['date_time'])
+        # Fetch only this week's window, filtered and sorted by the API
+        week_lessons = await api_client.get_lessons(
+            teacher["id"],
+            date_from=week_start,
+            date_to=week_end,
+            order_by="date_time",
+        )
         
         text = format_lessons_list(week_lessons, f"Уроки на неделю ({week_start.strftime('%d.%m')} - {week_end.strftime('%d.%m')})")
         
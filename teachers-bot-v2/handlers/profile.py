@@ -1,6 +1,7 @@
 from aiogram import Router, F
 from aiogram.types import Message, CallbackQuery, InlineKeyboardButton, InlineKeyboardMarkup
 from aiogram.fsm.context import FSMContext
+from datetime import datetime
 from loguru import logger
 
 from models.states import ProfileStates
@@ -91,8 +92,9 @@ async def process_name_edit(message: Message, state: FSMContext):
             await state.clear()
             return
         
-        # Update teacher name via API (we need to implement update endpoint)
-        # For now, we'll show success message
+        await api_client.update_teacher(
+            teacher["id"], {"full_name": new_name}, tg_id=teacher["tg_id"]
+        )
         await state.clear()
         
         text = (
@@ -139,6 +141,15 @@ async def process_phone_edit(message: Message, state: FSMContext):
             await message.answer("❌ Неверный формат телефона. Попробуйте еще раз:")
             return
         
+        teacher = await api_client.get_teacher_by_tg_id(str(message.from_user.id))
+        if not teacher:
+            await message.answer("❌ Ошибка: профиль не найден")
+            await state.clear()
+            return
+        
+        await api_client.update_teacher(
+            teacher["id"], {"phone": new_phone}, tg_id=teacher["tg_id"]
+        )
         await state.clear()
         
         text = (
@@ -185,6 +196,15 @@ async def process_email_edit(message: Message, state: FSMContext):
             await message.answer("❌ Неверный формат email. Попробуйте еще раз:")
             return
         
+        teacher = await api_client.get_teacher_by_tg_id(str(message.from_user.id))
+        if not teacher:
+            await message.answer("❌ Ошибка: профиль не найден")
+            await state.clear()
+            return
+        
+        await api_client.update_teacher(
+            teacher["id"], {"email": new_email}, tg_id=teacher["tg_id"]
+        )
         await state.clear()
         
         text = (
@@ -226,6 +246,15 @@ async def process_bank_edit(message: Message, state: FSMContext):
             await message.answer("❌ Неверный формат банковского счета. Попробуйте еще раз:")
             return
         
+        teacher = await api_client.get_teacher_by_tg_id(str(message.from_user.id))
+        if not teacher:
+            await message.answer("❌ Ошибка: профиль не найден")
+            await state.clear()
+            return
+        
+        await api_client.update_teacher(
+            teacher["id"], {"bank_account": new_bank}, tg_id=teacher["tg_id"]
+        )
         await state.clear()
         
         # Show masked account number for security
@@ -255,19 +284,14 @@ async def callback_profile_stats(callback: CallbackQuery):
             await callback.answer("❌ Вы не зарегистрированы", show_alert=True)
             return
         
-        # Get teacher's lessons and calculate stats
-        lessons = await api_client.get_lessons(teacher["id"])
-        
-        # Calculate basic statistics
-        total_lessons = len(lessons)
-        confirmed_lessons = len([l for l in lessons if l["status"] == "confirmed"])
-        total_earnings = sum(float(l["price"]) for l in lessons if l["status"] == "confirmed")
+        # Get aggregated stats and the most recent lesson
+        stats = await api_client.get_teacher_stats(teacher["id"])
+        recent = await api_client.get_lessons(teacher["id"], order_by="-date_time", limit=1)
         
-        # Find most recent lesson
-        recent_lesson = None
-        if lessons:
-            lessons_sorted = sorted(lessons, key=lambda x: x["date_time"], reverse=True)
-            recent_lesson = lessons_sorted[0]
+        total_lessons = sum(item["lessons"] for item in stats["by_status"].values())
+        confirmed_lessons = stats["by_status"]["confirmed"]["lessons"]
+        total_earnings = stats["by_status"]["confirmed"]["value"]
+        recent_lesson = recent[0] if recent else None
         
         text = f"📊 <b>Ваша статистика</b>\n\n"
         text += f"👤 <b>Учитель:</b> {teacher['full_name']}\n"
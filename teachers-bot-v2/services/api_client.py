@@ -1,14 +1,19 @@
 import httpx
+from datetime import datetime
 from typing import Optional, List, Dict, Any
 from loguru import logger
 from pydantic import BaseModel
 
 from core.config import settings
+from services.teacher_cache import teacher_cache
 
 
 class APIError(Exception):
     """API communication error"""
-    pass
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
 
 
 class TeachersAPIClient:
@@ -27,6 +32,9 @@ class TeachersAPIClient:
                 response = await client.request(method, url, **kwargs)
                 response.raise_for_status()
                 return response.json()
+            except httpx.HTTPStatusError as e:
+                logger.error(f"API request failed: {method} {url} - {e}")
+                raise APIError(f"API request failed: {e}", e.response.status_code)
             except httpx.HTTPError as e:
                 logger.error(f"API request failed: {method} {url} - {e}")
                 raise APIError(f"API request failed: {e}")
@@ -37,31 +45,80 @@ class TeachersAPIClient:
     # Teacher endpoints
     async def create_teacher(self, teacher_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create new teacher"""
-        return await self._make_request("POST", "/teachers", json=teacher_data)
+        teacher = await self._make_request("POST", "/teachers", json=teacher_data)
+        await teacher_cache.set(teacher)
+        return teacher
     
     async def get_teachers(self) -> List[Dict[str, Any]]:
         """Get all teachers"""
         return await self._make_request("GET", "/teachers")
     
     async def get_teacher_by_tg_id(self, tg_id: str) -> Optional[Dict[str, Any]]:
-        """Get teacher by Telegram ID"""
+        """Get teacher by Telegram ID (cached)"""
+        teacher = await teacher_cache.get(tg_id)
+        if teacher:
+            return teacher
+
         try:
-            teachers = await self.get_teachers()
-            for teacher in teachers:
-                if teacher.get("tg_id") == tg_id:
-                    return teacher
-            return None
+            teacher = await self._make_request("GET", f"/teachers/by-tg/{tg_id}")
         except APIError:
             return None
+
+        await teacher_cache.set(teacher)
+        return teacher
+
+    async def update_teacher(
+        self,
+        teacher_id: int,
+        teacher_data: Dict[str, Any],
+        tg_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """Update teacher and invalidate cached profile.
+
+        tg_id is the Telegram ID before the update; it is fetched when not
+        given, so a changed tg_id does not leave the old entry cached.
+        """
+        if tg_id is None:
+            current = await self._make_request("GET", f"/teachers/{teacher_id}")
+            tg_id = current["tg_id"]
+        teacher = await self._make_request("PATCH", f"/teachers/{teacher_id}", json=teacher_data)
+        for cached_tg_id in {tg_id, teacher["tg_id"]}:
+            await teacher_cache.invalidate(cached_tg_id)
+        return teacher
+    
+    async def get_teacher_stats(self, teacher_id: int) -> Dict[str, Any]:
+        """Get aggregated lesson and invoice statistics for teacher"""
+        return await self._make_request("GET", f"/teachers/{teacher_id}/stats")
     
     # Lesson endpoints
     async def create_lesson(self, lesson_data: Dict[str, Any]) -> Dict[str, Any]:
         """Create new lesson"""
         return await self._make_request("POST", "/lessons", json=lesson_data)
     
-    async def get_lessons(self, teacher_id: int) -> List[Dict[str, Any]]:
-        """Get lessons for teacher"""
-        return await self._make_request("GET", f"/lessons?teacher_id={teacher_id}")
+    async def get_lessons(
+        self,
+        teacher_id: int,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        status: Optional[str] = None,
+        lesson_type: Optional[str] = None,
+        order_by: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """Get lessons for teacher, filtered on the API side"""
+        params = {
+            "teacher_id": teacher_id,
+            "from": date_from.isoformat() if date_from else None,
+            "to": date_to.isoformat() if date_to else None,
+            "status": status,
+            "type": lesson_type,
+            "order_by": order_by,
+            "limit": limit,
+            "cursor": cursor,
+        }
+        params = {k: v for k, v in params.items() if v is not None}
+        return await self._make_request("GET", "/lessons", params=params)
     
     async def get_lesson(self, lesson_id: int) -> Dict[str, Any]:
         """Get specific lesson"""
@@ -0,0 +1,50 @@
+import json
+from typing import Optional, Dict, Any
+
+from loguru import logger
+from redis.asyncio import Redis
+
+from core.bot import redis
+from core.config import settings
+
+
+class TeacherCache:
+    """Redis-backed cache of teacher profiles keyed by Telegram ID"""
+
+    KEY_PREFIX = "teacher:tg:"
+
+    def __init__(self, redis: Redis, ttl: int):
+        self.redis = redis
+        self.ttl = ttl
+
+    def _key(self, tg_id: str) -> str:
+        return f"{self.KEY_PREFIX}{tg_id}"
+
+    async def get(self, tg_id: str) -> Optional[Dict[str, Any]]:
+        """Get cached teacher or None on miss"""
+        try:
+            raw = await self.redis.get(self._key(tg_id))
+        except Exception as e:
+            logger.warning(f"Teacher cache read failed for {tg_id}: {e}")
+            return None
+        return json.loads(raw) if raw else None
+
+    async def set(self, teacher: Dict[str, Any]) -> None:
+        """Store teacher under its tg_id with TTL"""
+        try:
+            await self.redis.set(
+                self._key(teacher["tg_id"]), json.dumps(teacher), ex=self.ttl
+            )
+        except Exception as e:
+            logger.warning(f"Teacher cache write failed for {teacher.get('tg_id')}: {e}")
+
+    async def invalidate(self, tg_id: str) -> None:
+        """Drop cached teacher"""
+        try:
+            await self.redis.delete(self._key(tg_id))
+        except Exception as e:
+            logger.warning(f"Teacher cache invalidation failed for {tg_id}: {e}")
+
+
+# Global teacher cache instance
+teacher_cache = TeacherCache(redis, settings.TEACHER_CACHE_TTL)